@@ -0,0 +1,116 @@
+"""
+Заблаговременная трансляция программ УВМ в модули Python (Вариант 5)
+Программа переводится compiler.generate_source в модуль, который
+сохраняется вместе с байт-кодом (.pyc в __pycache__) в каталоге кэша под
+именем по SHA-256 кода. Следующие запуски - в том числе в других процессах -
+импортируют готовый байт-код и выполняют его без декодирования и
+трансляции.
+
+Каталог кэша: аргумент directory, переменная окружения UVM_AOT_CACHE или
+~/.cache/uvm/aot. Модули записываются через временный файл и os.replace,
+поэтому одновременные процессы не видят недописанных файлов.
+
+    uvm aot prog.bin                      # трансляция в кэш
+    uvm run prog.bin out.json --engine aot
+"""
+
+import os
+import time
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+from compiler import CompiledExecutor, CompiledProgram, compile_program, generate_source
+
+ENV_CACHE = 'UVM_AOT_CACHE'
+PREFIX = 'uvm_'
+
+# Модули, уже загруженные в этом процессе: SHA-256 кода -> CompiledProgram
+_loaded: 'OrderedDict[str, CompiledProgram]' = OrderedDict()
+_LOADED_LIMIT = 16
+
+
+def cache_dir(directory: Optional[str] = None) -> str:
+    """Каталог кэша модулей."""
+    if directory:
+        return directory
+    return os.environ.get(ENV_CACHE) or os.path.join(os.path.expanduser('~'), '.cache', 'uvm', 'aot')
+
+
+def module_path(code, directory: Optional[str] = None) -> str:
+    """Путь модуля программы в кэше."""
+    digest = hashlib.sha256(code).hexdigest()
+    return os.path.join(cache_dir(directory), f"{PREFIX}{digest}.py")
+
+
+def translate(code, directory: Optional[str] = None, force=False) -> Dict[str, Any]:
+    """
+    Транслирует машинный код в модуль кэша и компилирует его в .pyc.
+
+    Args:
+        code: Машинный код (memory.code, без секции данных)
+        directory: Каталог кэша
+        force: Транслировать заново, даже если модуль уже есть
+
+    Returns:
+        Словарь: path, cached (модуль уже был в кэше), bytes (размер
+        модуля), ms (время трансляции и компиляции)
+    """
+    import py_compile
+    import importlib.util
+    path = module_path(code, directory)
+    if not force and os.path.exists(path):
+        return {'path': path, 'cached': True, 'bytes': os.path.getsize(path), 'ms': 0.0}
+    started = time.perf_counter()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    source = generate_source(code)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'w', encoding='utf-8') as f:
+        f.write(source)
+    os.replace(temporary, path)
+    py_compile.compile(path, cfile=importlib.util.cache_from_source(path), doraise=True)
+    return {'path': path, 'cached': False, 'bytes': len(source.encode('utf-8')),
+            'ms': (time.perf_counter() - started) * 1000}
+
+
+def load(code, directory: Optional[str] = None) -> Optional[CompiledProgram]:
+    """
+    Программа из кэша; None, если модуля нет.
+
+    Raises:
+        ValueError: Модуль в кэше не соответствует коду (поврежден или подменен)
+    """
+    import importlib.util
+    digest = hashlib.sha256(code).hexdigest()
+    program = _loaded.get(digest)
+    if program is not None:
+        _loaded.move_to_end(digest)
+        return program
+    path = module_path(code, directory)
+    if not os.path.exists(path):
+        return None
+    spec = importlib.util.spec_from_file_location(f"{PREFIX}{digest}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    program = CompiledProgram.from_namespace(vars(module))
+    if program.digest != digest or program.code_size != len(code):
+        raise ValueError(f"Модуль {path} не соответствует программе")
+    _loaded[digest] = program
+    if len(_loaded) > _LOADED_LIMIT:
+        _loaded.popitem(last=False)
+    return program
+
+
+class AotExecutor(CompiledExecutor):
+    """
+    Исполнитель модуля из кэша заблаговременной трансляции.
+
+    Если модуля нет, программа компилируется в памяти, а кэш не меняется:
+    его заполняет только translate (uvm aot), поэтому проверки и разовые
+    запуски не оставляют файлов.
+    """
+
+    def __init__(self, memory, directory: Optional[str] = None):
+        program = load(memory.code, directory)
+        self.cached = program is not None
+        super().__init__(memory, program if program is not None else compile_program(memory.code))
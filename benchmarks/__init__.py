@@ -0,0 +1 @@
+"""Бенчмарки УВМ (Вариант 5): генераторы нагрузок и замеры производительности."""
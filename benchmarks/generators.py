@@ -0,0 +1,64 @@
+"""
+Генераторы синтетических программ УВМ для бенчмарков.
+Все генераторы возвращают исходный текст на ассемблере; программы
+выполняются без ошибок на стандартной памяти UVMMemory.
+"""
+
+import random
+
+
+def vector_rol(n: int) -> str:
+    """N-элементный поэлементный ROL: LOAD_MEM / LOAD_CONST / ROL / STORE_MEM."""
+    lines = []
+    for i in range(n):
+        lines.append(f"LOAD_MEM {1024 + i % 60000}")
+        lines.append(f"LOAD_CONST {i % 1024}")
+        lines.append("ROL")
+        lines.append(f"STORE_MEM {2048 + i % 2048}")
+    return "\n".join(lines)
+
+
+def store_heavy(n: int) -> str:
+    """Запись констант в память: N пар LOAD_CONST / STORE_MEM."""
+    lines = []
+    for i in range(n):
+        lines.append(f"LOAD_CONST {i % 256}")
+        lines.append(f"STORE_MEM {i % 4096}")
+    return "\n".join(lines)
+
+
+def stack_deep(n: int) -> str:
+    """Глубокий стек: N значений на стеке, затем свертка командами ROL."""
+    lines = [f"LOAD_CONST {i % 1024}" for i in range(n)]
+    lines.extend("ROL" for _ in range(n - 1))
+    return "\n".join(lines)
+
+
+def random_mix(n: int, seed=0) -> str:
+    """Случайная смесь всех команд без ошибок выполнения."""
+    rng = random.Random(seed)
+    lines = []
+    depth = 0
+    for _ in range(n):
+        choice = rng.random()
+        if depth >= 2 and choice < 0.2:
+            lines.append("ROL")
+            depth -= 1
+        elif depth >= 1 and choice < 0.45:
+            lines.append(f"STORE_MEM {rng.randrange(0, 4096)}")
+            depth -= 1
+        elif choice < 0.75:
+            lines.append(f"LOAD_CONST {rng.randrange(0, 256)}")
+            depth += 1
+        else:
+            lines.append(f"LOAD_MEM {rng.randrange(0, 65536)}")
+            depth += 1
+    return "\n".join(lines)
+
+
+GENERATORS = {
+    'vector_rol': vector_rol,
+    'store_heavy': store_heavy,
+    'stack_deep': stack_deep,
+    'random_mix': random_mix,
+}
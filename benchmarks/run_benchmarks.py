@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Бенчмарки УВМ (Вариант 5)
+Замеряет разбор, кодирование, декодирование и выполнение синтетических
+программ каждым исполнителем (отдельно - подготовку исполнителя и прогон
+готовой программы) и время запуска uvm.py новым процессом,
+сохраняет результаты в JSON и сравнивает их с базовыми, отмечая регрессии
+выше заданного порога.
+"""
+
+import sys
+import os
+import json
+import time
+import platform
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parser import parse_assembly
+from encoder import encode_to_intermediate, encode_to_binary
+from interpreter import UVMMemory, UVMDecoder
+from engines import ENGINES, get_engine
+from benchmarks.generators import GENERATORS
+
+RESULTS_FORMAT = 'uvm-benchmarks'
+
+UVM_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'uvm.py')
+
+# Допустимое время запуска uvm.py сверх запуска самого Python (секунды)
+STARTUP_LIMIT = 0.030
+
+
+def _best_time(func, repeat: int) -> float:
+    """Лучшее время из нескольких запусков (секунды)."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def _metric(seconds: float, amount: int, unit: str) -> Dict[str, Any]:
+    return {
+        'seconds': seconds,
+        'rate': amount / seconds if seconds > 0 else 0.0,
+        'unit': unit
+    }
+
+
+def _execute(engine_class, binary: bytes) -> Tuple[float, float]:
+    """
+    Время подготовки исполнителя и прогона программы (секунды).
+
+    Создание памяти и загрузка кода в замер не входят. Подготовка -
+    создание исполнителя (предекодирование, поиск серий, компиляция),
+    прогон - executor.run(); их сумма соответствует conformance.run_engine.
+    """
+    memory = UVMMemory()
+    memory.load_code(binary)
+    start = time.perf_counter()
+    executor = engine_class(memory)
+    built = time.perf_counter()
+    executor.run()
+    finished = time.perf_counter()
+    if executor.error is not None:
+        raise RuntimeError(f"Ошибка выполнения бенчмарка: {executor.error}")
+    return built - start, finished - built
+
+
+def benchmark_workload(source: str, engines: List[str], repeat: int) -> Dict[str, Any]:
+    """Замеряет все этапы для одной программы."""
+    program = parse_assembly(source)
+    intermediate = encode_to_intermediate(program)
+    binary = encode_to_binary(intermediate)
+    count = len(program)
+
+    results = {
+        'instructions': count,
+        'binary_size': len(binary),
+        'parse': _metric(_best_time(lambda: parse_assembly(source), repeat),
+                         count, 'instr/s'),
+        'encode': _metric(_best_time(lambda: encode_to_binary(encode_to_intermediate(program)),
+                                     repeat), len(binary), 'bytes/s'),
+        'decode': _metric(_best_time(lambda: UVMDecoder.decode_program(binary), repeat),
+                          len(binary), 'bytes/s'),
+        'execute': {},
+        'run': {}
+    }
+
+    for name in engines:
+        engine_class = get_engine(name)
+        timings = [_execute(engine_class, binary) for _ in range(repeat)]
+        results['execute'][name] = _metric(min(build + run for build, run in timings),
+                                           count, 'instr/s')
+        results['run'][name] = _metric(min(run for _, run in timings), count, 'instr/s')
+
+    return results
+
+
+def _process_time(arguments: List[str], repeat: int) -> float:
+    """Лучшее время выполнения Python с аргументами в новом процессе (секунды)."""
+    # Байт-код берется из __pycache__, как при обычном запуске
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    return _best_time(lambda: subprocess.run([sys.executable, *arguments], env=env, check=True,
+                                             stdout=subprocess.DEVNULL), repeat)
+
+
+def measure_startup(repeat: int) -> Dict[str, Any]:
+    """
+    Время запуска uvm.py --help и uvm.py disasm маленькой программы.
+
+    Returns:
+        {'python': секунды запуска пустого интерпретатора,
+         'commands': {команда: секунды сверх запуска интерпретатора}}
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'startup.bin')
+        with open(path, 'wb') as f:
+            f.write(encode_to_binary(encode_to_intermediate(parse_assembly("LOAD_CONST 1"))))
+        python = _process_time(['-c', 'pass'], repeat)
+        commands = {
+            'help': _process_time([UVM_SCRIPT, '--help'], repeat),
+            'disasm': _process_time([UVM_SCRIPT, 'disasm', path], repeat)
+        }
+    return {'python': python,
+            'commands': {name: max(seconds - python, 0.0) for name, seconds in commands.items()}}
+
+
+def check_startup(startup: Dict[str, Any], limit=STARTUP_LIMIT) -> List[str]:
+    """Команды, запуск которых дольше limit секунд сверх запуска интерпретатора."""
+    return [name for name, seconds in startup['commands'].items() if seconds > limit]
+
+
+def run_suite(sizes: List[int], engines: List[str], repeat: int,
+              workloads: Optional[List[str]] = None, startup=False) -> Dict[str, Any]:
+    """
+    Выполняет набор бенчмарков для всех нагрузок и размеров; startup -
+    замерить также время запуска uvm.py (measure_startup).
+    """
+    results = {}
+    for name in workloads or list(GENERATORS):
+        for size in sizes:
+            source = GENERATORS[name](size)
+            results[f"{name}_{size}"] = benchmark_workload(source, engines, repeat)
+
+    results = {
+        'format': RESULTS_FORMAT,
+        'metadata': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': repeat
+        },
+        'results': results
+    }
+    if startup:
+        results['startup'] = measure_startup(max(repeat, 5))
+    return results
+
+
+def _timings(results: Dict[str, Any]) -> Dict[str, float]:
+    """Плоский словарь 'нагрузка/этап' -> секунды."""
+    flat = {}
+    for workload, stages in results['results'].items():
+        for stage in ('parse', 'encode', 'decode'):
+            flat[f"{workload}/{stage}"] = stages[stage]['seconds']
+        for engine, metric in stages['execute'].items():
+            flat[f"{workload}/execute/{engine}"] = metric['seconds']
+        for engine, metric in stages.get('run', {}).items():
+            flat[f"{workload}/run/{engine}"] = metric['seconds']
+    for command, seconds in results.get('startup', {}).get('commands', {}).items():
+        flat[f"startup/{command}"] = seconds
+    return flat
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any],
+                    threshold=0.10) -> List[Dict[str, Any]]:
+    """
+    Сравнивает результаты с базовыми.
+
+    Returns:
+        Список регрессий: замеры, ставшие медленнее более чем на threshold
+    """
+    current_timings = _timings(current)
+    baseline_timings = _timings(baseline)
+    regressions = []
+    for key, seconds in sorted(current_timings.items()):
+        base = baseline_timings.get(key)
+        if not base:
+            continue
+        change = seconds / base - 1.0
+        if change > threshold:
+            regressions.append({'benchmark': key, 'baseline': base,
+                                'current': seconds, 'change': change})
+    return regressions
+
+
+def print_report(results: Dict[str, Any]):
+    """Выводит таблицу результатов."""
+    for workload, stages in results['results'].items():
+        print(f"\n{workload} ({stages['instructions']} инструкций, {stages['binary_size']} байт)")
+        for stage in ('parse', 'encode', 'decode'):
+            metric = stages[stage]
+            print(f"  {stage:<22} {metric['seconds'] * 1000:10.3f} мс  "
+                  f"{metric['rate']:14,.0f} {metric['unit']}")
+        for stage in ('execute', 'run'):
+            for engine, metric in stages.get(stage, {}).items():
+                print(f"  {stage + '/' + engine:<22} {metric['seconds'] * 1000:10.3f} мс  "
+                      f"{metric['rate']:14,.0f} {metric['unit']}")
+    startup = results.get('startup')
+    if startup:
+        print(f"\nЗапуск uvm.py (сверх запуска Python, {startup['python'] * 1000:.1f} мс)")
+        for command, seconds in startup['commands'].items():
+            print(f"  {command:<22} {seconds * 1000:10.3f} мс")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарки УВМ (Вариант 5)')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000],
+                        help='Размеры нагрузок (число элементов/команд)')
+    parser.add_argument('--workloads', nargs='+', choices=list(GENERATORS),
+                        help='Нагрузки (по умолчанию все)')
+    parser.add_argument('--engines', nargs='+', choices=list(ENGINES), default=list(ENGINES),
+                        help='Исполнители (по умолчанию все)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Число повторов, берется лучшее время (по умолчанию: 3)')
+    parser.add_argument('--output', help='Сохранить результаты в JSON')
+    parser.add_argument('--baseline', help='Сравнить с базовыми результатами (JSON)')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='Порог регрессии, доля замедления (по умолчанию: 0.10)')
+    parser.add_argument('--startup-limit', type=float, default=STARTUP_LIMIT * 1000, metavar='MS',
+                        help='Допустимое время запуска uvm.py сверх запуска Python, мс '
+                             f'(по умолчанию: {STARTUP_LIMIT * 1000:.0f})')
+    parser.add_argument('--no-startup', action='store_true',
+                        help='Не замерять время запуска uvm.py')
+
+    args = parser.parse_args()
+
+    results = run_suite(args.sizes, args.engines, args.repeat, args.workloads,
+                        startup=not args.no_startup)
+    print_report(results)
+
+    slow = check_startup(results['startup'], args.startup_limit / 1000) if 'startup' in results else []
+    for command in slow:
+        print(f"\n  МЕДЛЕННЫЙ ЗАПУСК uvm.py {command}: "
+              f"{results['startup']['commands'][command] * 1000:.1f} мс "
+              f"(допустимо {args.startup_limit:.0f} мс)")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"\nРезультаты сохранены в: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.threshold)
+        print(f"\n=== СРАВНЕНИЕ С {args.baseline} (порог {args.threshold:.0%}) ===")
+        if not regressions:
+            print("Регрессий не обнаружено")
+            return 1 if slow else 0
+        for item in regressions:
+            print(f"  РЕГРЕССИЯ {item['benchmark']}: {item['baseline'] * 1000:.3f} мс -> "
+                  f"{item['current'] * 1000:.3f} мс (+{item['change']:.0%})")
+        return 1
+
+    return 1 if slow else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,274 @@
+"""
+Контрольные точки длительного выполнения УВМ (Вариант 5)
+Во время выполнения состояние машины периодически сохраняется на диск,
+чтобы после сбоя или вытеснения задачи продолжить с последней точки.
+
+Формат файла (little-endian):
+    'UVMC', версия (1 байт), SHA-256 кода и начальной команды (32 байта),
+    SHA-256 начального образа памяти данных (32 байта),
+    число выполненных команд (8 байт), pc, размер памяти данных,
+    длина стека (по 4 байта), значения стека (по 4 байта со знаком),
+    число страниц (4 байта), затем для каждой страницы ее номер (4 байта)
+    и ячейки (по 1 байту), в конце CRC32 всего предыдущего содержимого.
+
+Сохраняются только страницы, отличающиеся от начального образа - памяти
+данных сразу после загрузки программы; остальные при восстановлении
+остаются такими, как в загруженной памяти, поэтому точка продолжается
+только на памяти с тем же образом (проверяется по его SHA-256). Файл
+пишется во временный и переименовывается, поэтому прерванная запись не
+портит последнюю точку.
+"""
+
+import os
+import time
+import zlib
+import struct
+import hashlib
+from typing import Dict, Any, Optional, Tuple
+
+from interpreter import UVMMemory, MemorySnapshot, PAGE_SIZE
+
+MAGIC = b'UVMC'
+VERSION = 2
+SUFFIX = '.uvmc'
+
+_HEADER = struct.Struct('<4sB32s32sQIII')
+_PAGE = struct.Struct('<I')
+
+
+def code_digest(program, entry=0) -> bytes:
+    """
+    SHA-256 программы (секция данных и код) и смещения начальной команды,
+    к которым относится контрольная точка: один код, запущенный с разных
+    команд (контейнер с точкой входа, --start-at), дает разные выполнения.
+    """
+    return hashlib.sha256(bytes(program) + struct.pack('<I', entry)).digest()
+
+
+def image_digest(snapshot: MemorySnapshot) -> bytes:
+    """SHA-256 памяти данных снимка (начального образа, от которого считаются страницы)."""
+    digest = hashlib.sha256()
+    for cells in snapshot.pages:
+        digest.update(cells)
+    return digest.digest()
+
+
+def encode_checkpoint(digest: bytes, image: bytes, instruction_count: int, pc: int, stack,
+                      data_size: int, pages: Dict[int, bytes]) -> bytes:
+    """Двоичное представление контрольной точки."""
+    parts = [_HEADER.pack(MAGIC, VERSION, digest, image, instruction_count, pc,
+                          data_size, len(stack)),
+             struct.pack(f'<{len(stack)}i', *stack),
+             _PAGE.pack(len(pages))]
+    for page in sorted(pages):
+        parts.append(_PAGE.pack(page))
+        parts.append(pages[page])
+    body = b''.join(parts)
+    return body + _PAGE.pack(zlib.crc32(body))
+
+
+def decode_checkpoint(raw: bytes) -> Dict[str, Any]:
+    """Разбирает контрольную точку; поврежденный файл - ValueError."""
+    if len(raw) < _HEADER.size + 8 or raw[:4] != MAGIC:
+        raise ValueError("Не файл контрольной точки УВМ")
+    body, (crc,) = raw[:-4], _PAGE.unpack(raw[-4:])
+    if zlib.crc32(body) != crc:
+        raise ValueError("Контрольная сумма контрольной точки не совпадает")
+    _, version, digest, image, count, pc, data_size, depth = _HEADER.unpack_from(body)
+    if version != VERSION:
+        raise ValueError(f"Неподдерживаемая версия контрольной точки: {version}")
+    position = _HEADER.size
+    stack = list(struct.unpack_from(f'<{depth}i', body, position))
+    position += 4 * depth
+    (page_count,) = _PAGE.unpack_from(body, position)
+    position += 4
+    pages = {}
+    for _ in range(page_count):
+        (page,) = _PAGE.unpack_from(body, position)
+        length = min(PAGE_SIZE, data_size - page * PAGE_SIZE)
+        pages[page] = body[position + 4:position + 4 + length]
+        position += 4 + length
+    return {
+        'digest': digest,
+        'image': image,
+        'instruction_count': count,
+        'pc': pc,
+        'data_size': data_size,
+        'stack': stack,
+        'pages': pages
+    }
+
+
+def write_atomic(path: str, raw: bytes):
+    """Записывает файл целиком или не записывает вовсе."""
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as f:
+        f.write(raw)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+
+def checkpoint_paths(directory: str):
+    """Файлы контрольных точек каталога, от новых к старым."""
+    if not os.path.isdir(directory):
+        return []
+    names = sorted((name for name in os.listdir(directory) if name.endswith(SUFFIX)),
+                   reverse=True)
+    return [os.path.join(directory, name) for name in names]
+
+
+def load_latest(directory: str, program, entry=0,
+                image: Optional[bytes] = None) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """
+    Последняя целая контрольная точка для данной программы (UVMMemory.program_bytes),
+    запущенной со смещения entry (UVMMemory.entry).
+
+    Поврежденные файлы и точки другой программы или начальной команды
+    пропускаются; если задан image (image_digest), пропускаются и точки
+    другого начального образа памяти.
+
+    Returns:
+        (путь, разобранная точка) или None
+    """
+    digest = code_digest(program, entry)
+    for path in checkpoint_paths(directory):
+        try:
+            with open(path, 'rb') as f:
+                checkpoint = decode_checkpoint(f.read())
+        except (OSError, ValueError, struct.error):
+            continue
+        if checkpoint['digest'] == digest and image in (None, checkpoint['image']):
+            return path, checkpoint
+    return None
+
+
+def restore_memory(memory: UVMMemory, checkpoint: Dict[str, Any],
+                   base: Optional[MemorySnapshot] = None):
+    """
+    Переносит состояние контрольной точки в память с загруженной программой.
+
+    Args:
+        memory: Память в начальном состоянии (сразу после загрузки программы)
+        checkpoint: Разобранная точка (decode_checkpoint)
+        base: Снимок memory в этом состоянии, если уже сделан
+    """
+    if checkpoint['data_size'] != len(memory.data):
+        raise ValueError(f"Размер памяти контрольной точки {checkpoint['data_size']} "
+                         f"не совпадает с размером памяти {len(memory.data)}")
+    if image_digest(base if base is not None else memory.snapshot()) != checkpoint['image']:
+        raise ValueError("Контрольная точка сохранена для другого начального образа памяти")
+    for page, cells in checkpoint['pages'].items():
+        memory.load_image(cells, base=page * PAGE_SIZE)
+    memory.stack[:] = checkpoint['stack']
+    memory.pc = checkpoint['pc']
+
+
+class Checkpointer:
+    """
+    Периодическое сохранение контрольных точек во время выполнения.
+
+    Страницы памяти берутся из снимков UVMMemory.snapshot() и сравниваются
+    со снимком начального образа: страница, разделяемая с ним, не
+    записывалась и в точку не попадает, а страница, не записанная после
+    предыдущей точки, не сравнивается заново. Если запись точек занимает
+    больше max_overhead от времени выполнения, интервал увеличивается.
+    """
+
+    def __init__(self, directory: str, every: int, keep=2, max_overhead=0.05,
+                 base: Optional[MemorySnapshot] = None):
+        """
+        Args:
+            directory: Каталог контрольных точек
+            every: Интервал между точками (в командах)
+            keep: Сколько последних точек хранить
+            max_overhead: Допустимая доля времени на запись точек
+            base: Снимок памяти сразу после загрузки программы; по умолчанию
+                снимается при первом вызове run() или save(), поэтому при
+                продолжении с точки его нужно сделать до restore_memory
+        """
+        if every <= 0:
+            raise ValueError(f"Интервал контрольных точек должен быть положительным: {every}")
+        self.directory = directory
+        self.interval = every
+        self.keep = keep
+        self.max_overhead = max_overhead
+        self.saved = 0             # Записано точек
+        self.bytes_written = 0
+        self.save_seconds = 0.0    # Время записи точек
+        self.run_seconds = 0.0     # Время выполнения между точками
+        self.base = base
+        self._image = None         # image_digest(base)
+        self._encoded = {}         # Номер страницы -> (байты снимка, отличаются ли от образа)
+
+    def _pages(self, memory: UVMMemory) -> Dict[int, bytes]:
+        """Страницы памяти, отличающиеся от начального образа."""
+        original = self.base.pages
+        snapshot = memory.snapshot()
+        pages = {}
+        for page, cells in enumerate(snapshot.pages):
+            if cells is original[page]:
+                continue
+            cached = self._encoded.get(page)
+            if cached is None or cached[0] is not cells:
+                cached = self._encoded[page] = (cells, cells != original[page])
+            if cached[1]:
+                pages[page] = cells
+        return pages
+
+    def save(self, memory: UVMMemory, instruction_count: int) -> str:
+        """Записывает контрольную точку и удаляет устаревшие."""
+        if self.base is None:
+            self.base = memory.snapshot()
+        if self._image is None:
+            self._image = image_digest(self.base)
+        started = time.perf_counter()
+        raw = encode_checkpoint(code_digest(memory.program_bytes(), memory.entry), self._image,
+                                instruction_count, memory.pc, memory.stack, len(memory.data),
+                                self._pages(memory))
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f'checkpoint-{instruction_count:015d}{SUFFIX}')
+        write_atomic(path, raw)
+        for old in checkpoint_paths(self.directory)[self.keep:]:
+            os.remove(old)
+        self.saved += 1
+        self.bytes_written += len(raw)
+        self.save_seconds += time.perf_counter() - started
+        return path
+
+    def run(self, executor, memory: UVMMemory):
+        """
+        Выполняет программу исполнителем, сохраняя точки каждые interval команд.
+
+        Исполнитель должен поддерживать run(max_instructions).
+        """
+        if self.base is None:
+            self.base = memory.snapshot()
+        while executor.running and memory.pc < len(memory.code):
+            started = time.perf_counter()
+            executor.run(max_instructions=executor.instruction_count + self.interval)
+            elapsed = time.perf_counter() - started
+            self.run_seconds += elapsed
+            if not executor.running or memory.pc >= len(memory.code):
+                break
+            before = self.save_seconds
+            self.save(memory, executor.instruction_count)
+            spent = self.save_seconds - before
+            if elapsed > 0 and spent > self.max_overhead * elapsed:
+                # Запись дороже допустимого - реже сохраняем точки
+                self.interval = int(self.interval * spent / (self.max_overhead * elapsed)) + 1
+
+    def overhead(self) -> float:
+        """Доля времени, потраченная на контрольные точки."""
+        total = self.run_seconds + self.save_seconds
+        return self.save_seconds / total if total > 0 else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'saved': self.saved,
+            'bytes': self.bytes_written,
+            'save_seconds': self.save_seconds,
+            'run_seconds': self.run_seconds,
+            'overhead': self.overhead(),
+            'interval': self.interval
+        }
@@ -0,0 +1,367 @@
+"""
+Трансляция программ УВМ в Python (Вариант 5)
+В программах нет переходов, поэтому машинный код переводится в линейный
+исходный текст Python: блоки по BLOCK_SIZE команд становятся функциями,
+которые компилируются в байт-код один раз. Внутри блока стек ведется в
+локальных переменных: константы подставляются в код, прочитанные значения
+хранятся в переменных, и в память стека попадает только остаток в конце
+блока.
+
+Перед каждой командой проверяются условия, при которых эталонный
+исполнитель выдал бы ошибку (адрес вне памяти, пустой стек и т.п.); при
+нарушении блок сбрасывает накопленный стек и возвращает номер команды,
+с которой CompiledExecutor продолжает эталонным UVMExecutor, - ошибки и
+частичное состояние совпадают с эталонным интерпретатором.
+
+Сгенерированный модуль самодостаточен (не импортирует модули проекта):
+    BLOCKS - функции блоков, STARTS - смещения их начала в коде,
+    LENGTHS - число команд, ERROR - (сообщение, смещение) ошибки
+    декодирования или None, CODE_SIZE и DIGEST - длина и SHA-256 кода.
+"""
+
+import sys
+import hashlib
+from typing import List, Optional, Tuple
+
+from interpreter import UVMMemory, UVMDecoder, UVMExecutor
+from predecode import (_decode_fast, OP_LOAD_CONST, OP_LOAD_MEM, OP_STORE_MEM, OP_ROL)
+
+BLOCK_SIZE = 256
+
+# Что известно о значении на стеке при трансляции
+_CONST = 0    # Константа
+_BYTE = 1     # Переменная со значением 0..255 (прочитано из памяти или результат ROL)
+_ANY = 2      # Переменная с произвольным значением (снято со стека до блока)
+
+_HEADER = '''"""
+Программа УВМ, транслированная compiler.py (SHA-256 кода: {digest}).
+"""
+
+TABLE = [[((v << s) | (v >> (8 - s))) & 0xFF for s in range(8)] for v in range(256)]
+'''
+
+
+class _Block:
+    """Трансляция одного блока команд в функцию."""
+
+    def __init__(self, number: int):
+        self.number = number
+        self.lines: List[str] = []
+        self.stack: List[Tuple[int, object]] = []   # Стек блока: (вид, значение или имя)
+        self.temps = 0
+        self.max_address = -1      # Наибольший адрес, проверяемый один раз в начале блока
+        self.closed = False        # Дальнейшие команды блока выполняет эталонный исполнитель
+
+    def temp(self) -> str:
+        name = f"t{self.temps}"
+        self.temps += 1
+        return name
+
+    def bail(self, index: int) -> str:
+        """Код выхода перед командой index: стек блока переносится в память стека."""
+        values = [str(value) for _, value in self.stack]
+        if not values:
+            return f"return {index}"
+        if len(values) == 1:
+            return f"stack.append({values[0]}); return {index}"
+        return f"stack.extend(({', '.join(values)})); return {index}"
+
+    def guard(self, condition: str, index: int):
+        self.lines.append(f"if {condition}: {self.bail(index)}")
+
+    def close(self, index: int):
+        self.lines.append(self.bail(index))
+        self.closed = True
+
+    def operands(self, count: int, index: int) -> Optional[List[Tuple[int, object]]]:
+        """
+        Верхние count значений стека (вершина первой) без снятия.
+
+        Недостающие в стеке блока читаются из памяти стека в переменные
+        после проверки глубины.
+        """
+        known = self.stack[::-1][:count]
+        missing = count - len(known)
+        if missing:
+            self.guard(f"len(stack) < {missing}", index)
+            for depth in range(1, missing + 1):
+                name = self.temp()
+                self.lines.append(f"{name} = stack[-{depth}]")
+                known.append((_ANY, name))
+        return known
+
+    def drop(self, count: int):
+        """Снимает count значений: сначала со стека блока, затем из памяти стека."""
+        own = min(count, len(self.stack))
+        del self.stack[len(self.stack) - own:]
+        if count > own:
+            self.lines.append(f"del stack[-{count - own}:]")
+
+    def load_mem(self, address: int):
+        self.max_address = max(self.max_address, address)
+        name = self.temp()
+        self.lines.append(f"{name} = data[{address}]")
+        self.stack.append((_BYTE, name))
+
+    def store_mem(self, offset: int, index: int):
+        (kind, value), = self.operands(1, index)
+        if kind == _CONST:
+            address = value + offset
+            if not 0 <= value <= 255 or address < 0:
+                self.close(index)
+                return
+            self.max_address = max(self.max_address, address)
+            self.drop(1)
+            self.lines.append(f"data[{address}] = {value}; mark({address})")
+            return
+        if kind == _BYTE:
+            if offset + 255 < 0:
+                self.close(index)
+                return
+            if offset < 0:
+                self.guard(f"{value} < {-offset}", index)
+            self.max_address = max(self.max_address, offset + 255)
+        else:
+            self.guard(f"not 0 <= {value} <= 255 or not 0 <= {value} + {offset} < size", index)
+        self.drop(1)
+        if offset:
+            address = self.temp()
+            self.lines.append(f"{address} = {value} + {offset}")
+        else:
+            address = value
+        self.lines.append(f"data[{address}] = {value}; mark({address})")
+
+    def rol(self, index: int):
+        (address_kind, address), (value_kind, value) = self.operands(2, index)
+        if address_kind == _CONST:
+            if address < 0:
+                self.close(index)
+                return
+            self.max_address = max(self.max_address, address)
+        elif address_kind == _BYTE:
+            self.max_address = max(self.max_address, 255)
+        else:
+            self.guard(f"not 0 <= {address} < size", index)
+        if value_kind == _CONST:
+            value = value & 0xFF
+        elif value_kind == _ANY:
+            value = f"{value} & 255"
+        self.drop(2)
+        name = self.temp()
+        self.lines.append(f"{name} = table[{value}][data[{address}] & 7]")
+        self.stack.append((_BYTE, name))
+
+    def source(self, length: int) -> str:
+        body = list(self.lines)
+        if not self.closed:
+            body.append(self.bail(length))
+        if self.max_address >= 0:
+            # Все адреса-константы блока проверяются одним сравнением
+            body.insert(0, f"if size <= {self.max_address}: return 0")
+        lines = [f"def block_{self.number}(data, stack, mark, size, table=TABLE):"]
+        lines.extend('    ' + line for line in body)
+        return '\n'.join(lines)
+
+
+def generate_source(code: bytes, block_size=BLOCK_SIZE) -> str:
+    """
+    Исходный текст модуля Python для машинного кода (без секции данных).
+
+    Args:
+        code: Машинный код (memory.code)
+        block_size: Число команд в функции блока
+    """
+    if block_size <= 0:
+        raise ValueError(f"Размер блока должен быть положительным: {block_size}")
+    kinds, operands, offsets, error = _decode_fast(code)
+    digest = hashlib.sha256(bytes(code)).hexdigest()
+    parts = [_HEADER.format(digest=digest)]
+    starts, lengths = [], []
+    for number, first in enumerate(range(0, len(kinds), block_size)):
+        length = min(block_size, len(kinds) - first)
+        block = _Block(number)
+        for index in range(length):
+            if block.closed:
+                break
+            kind, operand = kinds[first + index], operands[first + index]
+            if kind == OP_LOAD_CONST:
+                block.stack.append((_CONST, operand))
+            elif kind == OP_LOAD_MEM:
+                block.load_mem(operand)
+            elif kind == OP_STORE_MEM:
+                block.store_mem(operand, index)
+            elif kind == OP_ROL:
+                block.rol(index)
+        parts.append('\n' + block.source(length) + '\n')
+        starts.append(offsets[first])
+        lengths.append(length)
+    names = ''.join(f"block_{number}, " for number in range(len(starts)))
+    parts.append(f"\nBLOCKS = ({names})\n"
+                 f"STARTS = {tuple(starts)!r}\n"
+                 f"LENGTHS = {tuple(lengths)!r}\n"
+                 f"ERROR = {(error[0], error[1]) if error else None!r}\n"
+                 f"CODE_SIZE = {len(code)}\n"
+                 f"DIGEST = {digest!r}\n")
+    return ''.join(parts)
+
+
+class CompiledProgram:
+    """Скомпилированная программа: функции блоков и их расположение в коде."""
+
+    def __init__(self, blocks, starts, lengths, error: Optional[Tuple[str, int]],
+                 code_size: int, digest: str):
+        self.blocks = tuple(blocks)
+        self.starts = tuple(starts)
+        self.lengths = tuple(lengths)
+        self.error = error
+        self.code_size = code_size
+        self.digest = digest
+
+    @classmethod
+    def from_namespace(cls, namespace) -> 'CompiledProgram':
+        """Программа из словаря имен выполненного модуля (или модуля через vars)."""
+        return cls(namespace['BLOCKS'], namespace['STARTS'], namespace['LENGTHS'],
+                   namespace['ERROR'], namespace['CODE_SIZE'], namespace['DIGEST'])
+
+
+def compile_program(code: bytes, block_size=BLOCK_SIZE) -> CompiledProgram:
+    """Транслирует машинный код и компилирует его в байт-код в памяти."""
+    source = generate_source(code, block_size)
+    namespace = {}
+    name = f"<uvm {hashlib.sha256(bytes(code)).hexdigest()[:12]}>"
+    exec(compile(source, name, 'exec'), namespace)
+    return CompiledProgram.from_namespace(namespace)
+
+
+class CompiledExecutor:
+    """Исполнитель программы, транслированной в Python."""
+
+    def __init__(self, memory: UVMMemory, program: Optional[CompiledProgram] = None):
+        """
+        Args:
+            memory: UVMMemory с загруженным кодом
+            program: Скомпилированная программа для memory.code (по умолчанию
+                компилируется при создании)
+        """
+        self.memory = memory
+        self.running = True
+        self.instruction_count = 0
+        self.error = None
+        self.program = program if program is not None else compile_program(memory.code)
+        if self.program.code_size != len(memory.code):
+            raise ValueError("Скомпилированная программа не соответствует коду в памяти")
+        # Индекс текущего блока; при ненулевом pc определяется в run()
+        self.index = None if memory.pc else 0
+        self._reference = UVMExecutor(memory)
+
+    def _seek(self, limit=sys.maxsize):
+        """
+        Находит блок, начинающийся с текущего pc; команды до начала
+        следующего блока выполняются эталонным исполнителем, но не дальше
+        limit команд - если граница достигнута раньше, index остается None.
+        """
+        memory = self.memory
+        program = self.program
+        starts = {start: index for index, start in enumerate(program.starts)}
+        stop = program.error[1] if program.error else len(memory.code)
+        while memory.pc < stop and memory.pc not in starts:
+            if self.instruction_count >= limit:
+                return
+            try:
+                instruction = UVMDecoder.decode_instruction(memory)
+                self.instruction_count += 1
+                self._reference.execute(instruction)
+            except Exception as e:
+                self.error = e
+                self.running = False
+                break
+        self.index = starts.get(memory.pc, len(program.blocks))
+
+    def _finish_block(self, index: int, done: int, end: Optional[int] = None) -> int:
+        """
+        Выполняет эталонным исполнителем команды блока, начиная с done-й.
+
+        Args:
+            end: Номер команды блока, перед которой остановиться (по
+                умолчанию - до конца блока); pc указывает на нее
+
+        Returns:
+            Число выполненных команд (с командой, вызвавшей ошибку)
+        """
+        memory = self.memory
+        code = memory.code
+        decode_at = UVMDecoder.decode_at
+        pc = self.program.starts[index]
+        for _ in range(done):
+            pc += decode_at(code, pc)['size']
+        executed = 0
+        for _ in range(done, self.program.lengths[index] if end is None else end):
+            instruction = decode_at(code, pc)
+            pc += instruction['size']
+            executed += 1
+            try:
+                self._reference.execute(instruction)
+            except Exception as e:
+                self.error = e
+                self.running = False
+                memory.pc = pc
+                break
+        else:
+            if end is not None:
+                memory.pc = pc
+        return executed
+
+    def run(self, max_instructions: Optional[int] = None):
+        """
+        Основной цикл выполнения программы.
+
+        Args:
+            max_instructions: Остановиться, выполнив ровно столько команд
+                (всего); команды блока, не помещающегося до границы,
+                выполняет эталонный исполнитель. Повторный вызов run
+                продолжает выполнение
+        """
+        limit = sys.maxsize if max_instructions is None else max_instructions
+        if self.index is None:
+            self._seek(limit)
+            if self.index is None:
+                return
+        memory = self.memory
+        program = self.program
+        blocks, lengths = program.blocks, program.lengths
+        data = memory.data
+        stack = memory.stack
+        mark = memory.dirty.add
+        size = len(data)
+        total = len(blocks)
+        count = self.instruction_count
+        index = self.index
+
+        while self.running and index < total:
+            if count >= limit:
+                memory.pc = program.starts[index]
+                break
+            if count + lengths[index] > limit:
+                # Блок на границе: команды до нее - эталонным исполнителем,
+                # остальные выполнит _seek при следующем вызове run
+                count += self._finish_block(index, 0, limit - count)
+                index = None
+                break
+            done = blocks[index](data, stack, mark, size)
+            count += done
+            if done < lengths[index]:
+                count += self._finish_block(index, done)
+                if not self.running:
+                    break
+            index += 1
+
+        if self.running and index is not None and index >= total:
+            if program.error is not None:
+                # Команда не декодирована: счетчик не увеличивается, pc на ее начале
+                self.error = ValueError(program.error[0])
+                self.running = False
+                memory.pc = program.error[1]
+            else:
+                memory.pc = len(memory.code)
+        self.instruction_count = count
+        self.index = index
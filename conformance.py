@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Дифференциальная проверка исполнителей УВМ (Вариант 5)
+Генерирует случайные корректные программы и начальные образы памяти,
+выполняет их всеми исполнителями и сравнивает с эталонным UVMExecutor:
+память данных, стек, pc, число выполненных команд и тип ошибки.
+Расхождения уменьшаются до минимальной программы; для каждого исполнителя
+также замеряется скорость на том же наборе программ.
+
+С paged исполнители работают со страничной памятью (PagedData), а эталон -
+с обычным списком, так что проверяется и сама страничная память.
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+from typing import List, Dict, Any, Optional, Tuple
+
+from encoder import encode_to_intermediate, encode_to_binary
+from interpreter import UVMMemory
+from engines import ENGINES, get_engine
+from predecode import OP_VECTOR
+from vectorize import MIN_RUN_LENGTH
+
+REFERENCE_ENGINE = 'reference'
+
+# Поля результата, сравниваемые с эталоном
+OUTCOME_FIELDS = ('data', 'stack', 'pc', 'instruction_count', 'running', 'error')
+
+# Небольшая память: выход за границы случается чаще
+DEFAULT_DATA_SIZE = 1024
+
+# Наименьший размер памяти: стандартный образ UVMMemory пишет ячейки до 520
+MIN_DATA_SIZE = 521
+
+# Доля развернутых серий длиной не меньше MIN_RUN_LENGTH (доходят до OP_VECTOR)
+LONG_SERIES_RATE = 0.3
+
+
+def random_case(rng: random.Random, length: int, data_size=DEFAULT_DATA_SIZE,
+                fault_rate=0.01) -> Tuple[List[Tuple[str, Any]], Dict[int, int]]:
+    """
+    Случайная программа и начальный образ памяти.
+
+    Программа - список пар (мнемоника, операнд). Кроме отдельных команд
+    генерируются развернутые серии с аффинными адресами, на которых
+    срабатывают суперинструкции, а серии из MIN_RUN_LENGTH и более элементов
+    (если помещаются в length команд) векторизуются. С вероятностью fault_rate
+    на команду операнды выбираются так, что возможна ошибка выполнения
+    (выход за границы памяти, пустой стек, значение больше 255).
+    """
+    def address():
+        if rng.random() < fault_rate:
+            return rng.randrange(data_size, data_size + 64)
+        return rng.randrange(data_size - 16)
+
+    def offset():
+        if rng.random() < fault_rate:
+            return rng.choice((-300, min(data_size, 4095)))
+        return rng.randrange(min(data_size - 272, 4096))
+
+    def value():
+        if rng.random() < fault_rate:
+            return rng.randrange(256, 1024)
+        return rng.randrange(min(256, data_size))
+
+    def series(size):
+        """Число элементов серии из команд по size: иногда не меньше MIN_RUN_LENGTH."""
+        if length - len(program) >= MIN_RUN_LENGTH * size and rng.random() < LONG_SERIES_RATE:
+            return rng.randint(MIN_RUN_LENGTH, min(2 * MIN_RUN_LENGTH,
+                                                   (length - len(program)) // size))
+        return rng.randint(2, 8)
+
+    program = []
+    depth = 0
+    while len(program) < length:
+        choice = rng.random()
+        if choice < 0.15:
+            # Развернутый поэлементный ROL
+            count = series(4)
+            source, shift, base = address(), address(), offset()
+            steps = [rng.choice((0, 1, 1, 2, -1)) for _ in range(3)]
+            for i in range(count):
+                program += [('LOAD_MEM', max(source + steps[0] * i, 0)),
+                            ('LOAD_CONST', min(max(shift + steps[1] * i, 0), 1023)),
+                            ('ROL', None),
+                            ('STORE_MEM', min(max(base + steps[2] * i, -4096), 4095))]
+        elif choice < 0.25:
+            # Развернутая запись констант
+            count = series(2)
+            first, base = value(), offset()
+            for i in range(count):
+                program += [('LOAD_CONST', min(first + i, 1023)),
+                            ('STORE_MEM', min(base + i, 4095))]
+        elif choice < 0.45 or (depth < 1 and rng.random() >= fault_rate):
+            program.append(('LOAD_CONST', value()))
+            depth += 1
+        elif choice < 0.65:
+            program.append(('LOAD_MEM', address()))
+            depth += 1
+        elif choice < 0.85:
+            program.append(('STORE_MEM', offset()))
+            depth -= 1
+        elif depth >= 2 or rng.random() < fault_rate:
+            # Адрес сдвига - значение из памяти или константа в пределах памяти
+            program.append(('ROL', None))
+            depth -= 1
+    del program[length:]
+
+    image = {}
+    for _ in range(rng.randrange(data_size // 8 + 1)):
+        image[rng.randrange(data_size)] = rng.randrange(256)
+    return program, image
+
+
+def assemble_case(program: List[Tuple[str, Any]]) -> bytes:
+    """Машинный код программы из пар (мнемоника, операнд)."""
+    return encode_to_binary(encode_to_intermediate(
+        [{'opcode': opcode, 'operand': operand} for opcode, operand in program]))
+
+
+def format_case(program: List[Tuple[str, Any]]) -> str:
+    """Текст программы на ассемблере."""
+    return "\n".join(opcode if operand is None else f"{opcode} {operand}"
+                     for opcode, operand in program)
+
+
+def run_engine(engine_class, binary: bytes, image: Dict[int, int],
+               data_size=DEFAULT_DATA_SIZE, paged=False) -> Dict[str, Any]:
+    """
+    Выполняет программу исполнителем.
+
+    Args:
+        paged: Страничная память данных (PagedData) вместо списка
+
+    Returns:
+        Итоговое состояние (поля OUTCOME_FIELDS), время выполнения 'seconds'
+        и число векторных операций исполнителя 'vector_runs'
+    """
+    memory = UVMMemory(data_size=data_size, paged=paged)
+    for address, value in image.items():
+        memory.write_data(address, value)
+    memory.load_code(binary)
+
+    start = time.perf_counter()
+    executor = engine_class(memory)
+    executor.run()
+    seconds = time.perf_counter() - start
+
+    error = executor.error
+    return {
+        'data': memory.data,
+        'stack': memory.stack,
+        'pc': memory.pc,
+        'instruction_count': executor.instruction_count,
+        'running': executor.running,
+        'error': None if error is None else type(error).__name__,
+        'seconds': seconds,
+        'vector_runs': sum(1 for op in getattr(executor, 'ops', ()) if op[0] == OP_VECTOR)
+    }
+
+
+def compare_outcomes(expected: Dict[str, Any], actual: Dict[str, Any]) -> List[str]:
+    """Поля, в которых результат исполнителя отличается от эталона."""
+    return [field for field in OUTCOME_FIELDS if expected[field] != actual[field]]
+
+
+def check_case(program: List[Tuple[str, Any]], image: Dict[int, int],
+               engines: Dict[str, Any], data_size=DEFAULT_DATA_SIZE,
+               paged=False) -> Dict[str, List[str]]:
+    """
+    Сравнивает исполнители с эталоном на одной программе.
+
+    Args:
+        engines: Имя исполнителя -> класс (эталон берется из реестра)
+
+    Returns:
+        Имя исполнителя -> список различающихся полей (только расхождения)
+    """
+    binary = assemble_case(program)
+    expected = run_engine(get_engine(REFERENCE_ENGINE), binary, image, data_size)
+    mismatches = {}
+    for name, engine_class in engines.items():
+        fields = compare_outcomes(expected, run_engine(engine_class, binary, image, data_size,
+                                                       paged))
+        if fields:
+            mismatches[name] = fields
+    return mismatches
+
+
+def shrink_case(program: List[Tuple[str, Any]], image: Dict[int, int], engine_name: str,
+                engine_class, data_size=DEFAULT_DATA_SIZE,
+                paged=False) -> Tuple[List[Tuple[str, Any]], Dict[int, int]]:
+    """
+    Уменьшает программу и образ памяти, сохраняя расхождение исполнителя.
+
+    Удаляются блоки команд убывающего размера (упрощенный delta debugging),
+    затем отдельные ячейки начального образа.
+    """
+    engines = {engine_name: engine_class}
+
+    def fails(candidate_program, candidate_image):
+        return bool(candidate_program) and engine_name in check_case(
+            candidate_program, candidate_image, engines, data_size, paged)
+
+    chunk = max(len(program) // 2, 1)
+    while chunk >= 1:
+        start = 0
+        while start < len(program):
+            candidate = program[:start] + program[start + chunk:]
+            if fails(candidate, image):
+                program = candidate
+            else:
+                start += chunk
+        chunk //= 2
+
+    for address in sorted(image):
+        candidate = dict(image)
+        del candidate[address]
+        if fails(program, candidate):
+            image = candidate
+
+    return program, image
+
+
+def run_conformance(cases=200, length=80, seed=0, engines: Optional[List[str]] = None,
+                    data_size=DEFAULT_DATA_SIZE, shrink=True, paged=False) -> Dict[str, Any]:
+    """
+    Проверяет исполнители на наборе случайных программ.
+
+    Returns:
+        Отчет: число программ, из них с векторными сериями ('vectorized'),
+        расхождения (с уменьшенными программами) и скорость каждого
+        исполнителя на всем наборе
+    """
+    if data_size < MIN_DATA_SIZE:
+        raise ValueError(f"Размер памяти должен быть не меньше {MIN_DATA_SIZE}: {data_size}")
+    names = engines or list(ENGINES)
+    classes = {name: get_engine(name) for name in names}
+    rng = random.Random(seed)
+
+    timings = {name: 0.0 for name in names}
+    executed = {name: 0 for name in names}
+    failures = []
+    vectorized = 0
+
+    for case in range(cases):
+        program, image = random_case(rng, length, data_size)
+        binary = assemble_case(program)
+        outcomes = {}
+        for name in names:
+            outcomes[name] = run_engine(classes[name], binary, image, data_size, paged)
+            timings[name] += outcomes[name]['seconds']
+            executed[name] += outcomes[name]['instruction_count']
+        vectorized += any(outcome['vector_runs'] for outcome in outcomes.values())
+        expected = (not paged and outcomes.get(REFERENCE_ENGINE)) or run_engine(
+            get_engine(REFERENCE_ENGINE), binary, image, data_size)
+
+        for name in names:
+            fields = compare_outcomes(expected, outcomes[name])
+            if not fields:
+                continue
+            small_program, small_image = program, image
+            if shrink:
+                small_program, small_image = shrink_case(program, image, name,
+                                                         classes[name], data_size, paged)
+            failures.append({
+                'case': case,
+                'engine': name,
+                'fields': fields,
+                'program': format_case(small_program),
+                'image': {str(a): v for a, v in sorted(small_image.items())}
+            })
+
+    throughput = {}
+    for name in names:
+        seconds = timings[name]
+        throughput[name] = {
+            'seconds': seconds,
+            'instructions': executed[name],
+            'rate': executed[name] / seconds if seconds > 0 else 0.0
+        }
+
+    return {
+        'cases': cases,
+        'length': length,
+        'seed': seed,
+        'data_size': data_size,
+        'paged': paged,
+        'vectorized': vectorized,
+        'failures': failures,
+        'throughput': throughput
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Дифференциальная проверка исполнителей УВМ (Вариант 5)'
+    )
+    parser.add_argument('--cases', type=int, default=200,
+                        help='Число случайных программ (по умолчанию: 200)')
+    parser.add_argument('--length', type=int, default=80,
+                        help='Число команд в программе (по умолчанию: 80)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Начальное значение генератора (по умолчанию: 0)')
+    parser.add_argument('--engines', nargs='+', choices=list(ENGINES),
+                        help='Проверяемые исполнители (по умолчанию все)')
+    parser.add_argument('--data-size', type=int, default=DEFAULT_DATA_SIZE,
+                        help=f'Размер памяти данных (по умолчанию: {DEFAULT_DATA_SIZE}, '
+                             f'не меньше {MIN_DATA_SIZE})')
+    parser.add_argument('--no-shrink', action='store_true',
+                        help='Не уменьшать программы с расхождениями')
+    parser.add_argument('--paged', action='store_true',
+                        help='Исполнители работают со страничной памятью (эталон - со списком)')
+    parser.add_argument('--output', help='Сохранить отчет в JSON')
+
+    args = parser.parse_args()
+
+    try:
+        report = run_conformance(args.cases, args.length, args.seed, args.engines,
+                                 args.data_size, not args.no_shrink, args.paged)
+    except Exception as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"Проверено программ: {report['cases']} (по {report['length']} команд, seed={report['seed']}"
+          f"{', страничная память' if report['paged'] else ''})")
+    if report['vectorized']:
+        print(f"С векторными сериями: {report['vectorized']}")
+    print("\n=== СКОРОСТЬ ===")
+    for name, metric in report['throughput'].items():
+        print(f"  {name:<12} {metric['seconds'] * 1000:10.3f} мс  "
+              f"{metric['rate']:14,.0f} instr/s")
+
+    if report['failures']:
+        print(f"\n=== РАСХОЖДЕНИЯ: {len(report['failures'])} ===")
+        for failure in report['failures']:
+            print(f"\nПрограмма #{failure['case']}, исполнитель {failure['engine']}: "
+                  f"{', '.join(failure['fields'])}")
+            print(failure['program'])
+            if failure['image']:
+                print(f"Начальная память: {failure['image']}")
+    else:
+        print("\nРасхождений не обнаружено")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\nОтчет сохранен в: {args.output}")
+
+    sys.exit(1 if report['failures'] else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+"""
+Контейнер программы УВМ (Вариант 5)
+Необязательная обертка машинного кода с заголовком, таблицей секций,
+индексом команд и контрольной суммой. Сырой .bin по-прежнему принимается:
+контейнер распознается по первому байту 0xFF (команды с A=7 нет).
+
+Формат (little-endian):
+    заголовок: b'\\xffUVM', версия (1 байт), вариант УВМ (1 байт),
+        число секций (2 байта), номер начальной команды (4 байта);
+    таблица секций: для каждой метка (4 байта), смещение от начала файла
+        и длина (по 4 байта);
+    содержимое секций; в конце CRC32 всего предыдущего содержимого.
+
+Секции:
+    CODE - машинный код (обязательна);
+    DATA - записи секции данных (см. encoder.encode_data_section);
+    INDX - смещения начала команд в коде (по 4 байта), для перехода к
+        команде с номером i без декодирования предыдущих;
+    SMAP - карта исходного кода (sourcemap.py).
+Неизвестные секции пропускаются, поэтому новые секции не ломают чтение.
+"""
+
+import sys
+import zlib
+import struct
+from array import array
+from typing import Dict, Any
+
+MAGIC = b'\xffUVM'
+VERSION = 1
+VARIANT = 5
+
+CODE = b'CODE'
+DATA = b'DATA'
+INDEX = b'INDX'
+SOURCE_MAP = b'SMAP'
+
+_HEADER = struct.Struct('<4sBBHI')
+_SECTION = struct.Struct('<4sII')
+_CRC = struct.Struct('<I')
+
+
+def is_container(binary) -> bool:
+    """Начинается ли программа с заголовка контейнера."""
+    return bytes(binary[:4]) == MAGIC
+
+
+def instruction_offsets(code) -> array:
+    """Смещения начала команд кода; ошибка декодирования - ValueError."""
+    from interpreter import UVMDecoder
+    offsets = array('I')
+    pc = 0
+    while pc < len(code):
+        offsets.append(pc)
+        pc += UVMDecoder.decode_at(code, pc)['size']
+    return offsets
+
+
+def build_container(binary: bytes, entry=0, index=True, source_map: bytes = b'') -> bytes:
+    """
+    Упаковывает машинный код (с секцией данных или без) в контейнер.
+
+    Args:
+        binary: Сырой машинный код, как его выдает encode_to_binary
+        entry: Номер команды, с которой начинается выполнение
+        index: Добавить секцию индекса команд
+        source_map: Карта исходного кода (SourceMap.to_bytes) для секции SMAP
+
+    Raises:
+        ValueError: Код не декодируется или entry вне программы
+    """
+    from interpreter import split_data_section
+    _, start = split_data_section(binary)
+    data, code = bytes(binary[:start]), bytes(binary[start:])
+    offsets = instruction_offsets(code)
+    if entry < 0 or (entry > 0 and entry >= len(offsets)):
+        raise ValueError(f"Начальная команда {entry} вне программы из {len(offsets)} команд")
+
+    sections = [(CODE, code)]
+    if data:
+        sections.append((DATA, data))
+    if index:
+        if sys.byteorder == 'big':
+            offsets.byteswap()
+        sections.append((INDEX, offsets.tobytes()))
+    if source_map:
+        sections.append((SOURCE_MAP, bytes(source_map)))
+
+    position = _HEADER.size + _SECTION.size * len(sections)
+    parts = [_HEADER.pack(MAGIC, VERSION, VARIANT, len(sections), entry)]
+    for tag, payload in sections:
+        parts.append(_SECTION.pack(tag, position, len(payload)))
+        position += len(payload)
+    parts.extend(payload for _, payload in sections)
+    body = b''.join(parts)
+    return body + _CRC.pack(zlib.crc32(body))
+
+
+def read_container(raw, verify=True) -> Dict[str, Any]:
+    """
+    Разбирает контейнер.
+
+    Args:
+        raw: Содержимое файла
+        verify: Проверять CRC32 (без проверки читаются только заголовок и
+            таблица секций)
+
+    Returns:
+        Словарь с полями version, entry, code, data (записи секции данных,
+        b'' если секции нет), index (массив смещений или None) и
+        source_map (байты карты исходного кода или None)
+
+    Raises:
+        ValueError: Не контейнер, другая версия или вариант, повреждение
+    """
+    raw = memoryview(raw)
+    if len(raw) < _HEADER.size + _CRC.size or not is_container(raw):
+        raise ValueError("Не контейнер программы УВМ")
+    body = raw[:-_CRC.size]
+    if verify and zlib.crc32(body) != _CRC.unpack(raw[-_CRC.size:])[0]:
+        raise ValueError("Контрольная сумма контейнера не совпадает")
+    _, version, variant, count, entry = _HEADER.unpack_from(body)
+    if version != VERSION:
+        raise ValueError(f"Неподдерживаемая версия контейнера: {version}")
+    if variant != VARIANT:
+        raise ValueError(f"Программа собрана для варианта УВМ {variant}, а не {VARIANT}")
+    if _HEADER.size + _SECTION.size * count > len(body):
+        raise ValueError("Таблица секций контейнера обрезана")
+
+    sections = {}
+    for number in range(count):
+        tag, offset, length = _SECTION.unpack_from(body, _HEADER.size + _SECTION.size * number)
+        if offset + length > len(body):
+            raise ValueError(f"Секция {tag!r} выходит за пределы контейнера")
+        sections[tag] = body[offset:offset + length]
+    if CODE not in sections:
+        raise ValueError("В контейнере нет секции кода")
+
+    code = bytes(sections[CODE])
+    index = None
+    if INDEX in sections:
+        index = array('I')
+        index.frombytes(sections[INDEX])
+        if sys.byteorder == 'big':
+            index.byteswap()
+        if index and index[-1] >= len(code):
+            raise ValueError("Индекс команд не соответствует секции кода")
+    count = len(index) if index is not None else None
+    if entry and count is not None and entry >= count:
+        raise ValueError(f"Начальная команда {entry} вне программы из {count} команд")
+    return {
+        'version': version,
+        'entry': entry,
+        'code': code,
+        'data': bytes(sections.get(DATA, b'')),
+        'index': index,
+        'source_map': bytes(sections[SOURCE_MAP]) if SOURCE_MAP in sections else None
+    }
+
+
+def unwrap(binary) -> bytes:
+    """Сырой машинный код (секция данных и код) из контейнера или .bin."""
+    if not is_container(binary):
+        return bytes(binary)
+    program = read_container(binary)
+    return program['data'] + program['code']
+
+
+def entry_offset(program: Dict[str, Any]) -> int:
+    """Смещение начальной команды разобранного контейнера в коде."""
+    entry = program['entry']
+    if not entry:
+        return 0
+    if program['index'] is not None:
+        return program['index'][entry]
+    offsets = instruction_offsets(program['code'])
+    if entry >= len(offsets):
+        raise ValueError(f"Начальная команда {entry} вне программы из {len(offsets)} команд")
+    return offsets[entry]
@@ -0,0 +1,11 @@
+"""
+Формат секции данных УВМ (Вариант 5)
+Записи секции данных в начале машинного кода: байт DATA_RECORD (команды
+с A=0 нет), адрес (3 байта), длина (2 байта, big-endian), затем значения.
+Записывает encoder.encode_data_section, читает interpreter.split_data_section.
+"""
+
+# Первый байт записи
+DATA_RECORD = 0x00
+# Наибольшая длина значений одной записи
+DATA_RECORD_MAX = 0xFFFF
@@ -0,0 +1,275 @@
+"""
+Отладчик УВМ с перемещением назад по выполнению (Вариант 5)
+Сеанс отладки выполняет программу вперед и через каждые every команд
+сохраняет контрольную точку - снимок памяти (UVMMemory.snapshot). Снимки
+инкрементные: страницы, не записанные с предыдущего снимка, разделяются,
+поэтому точка стоит столько, сколько страниц изменилось за интервал.
+
+Шаг назад и переход к команде N восстанавливают ближайшую точку не позже N
+и выполняют вперед не больше интервала команд. Число точек ограничено
+бюджетом: при его превышении каждая вторая точка удаляется, а интервал
+удваивается, так что стоимость шага назад растет с длиной выполнения
+линейно по интервалу, а память - не больше budget снимков.
+
+    session = DebugSession(memory, every=1000, budget=256)
+    session.goto(10_000_000)
+    session.step_back()
+"""
+
+from bisect import bisect_right
+from typing import Dict, Any, Optional
+
+from interpreter import UVMExecutor
+
+
+class DebugSession:
+    """Сеанс отладки программы, загруженной в память."""
+
+    def __init__(self, memory, every=1000, budget=256, engine: Optional[str] = None,
+                 source_map=None):
+        """
+        Args:
+            memory: UVMMemory с загруженной программой в начальном состоянии
+            every: Начальный интервал контрольных точек в командах
+            budget: Наибольшее число хранимых контрольных точек
+            engine: Исполнитель для continue_() до конца программы (None -
+                reference); шаги и переходы всегда выполняет reference,
+                который останавливается на любой команде
+            source_map: sourcemap.SourceMap для номеров строк в state()
+        """
+        if every <= 0:
+            raise ValueError(f"Интервал контрольных точек должен быть положительным: {every}")
+        if budget < 2:
+            raise ValueError(f"Бюджет контрольных точек должен быть не меньше 2: {budget}")
+        self.memory = memory
+        self.every = every
+        self.budget = budget
+        self.engine = engine
+        self.source_map = source_map
+        self.executor = UVMExecutor(memory)
+        self.checkpoints: Dict[int, Any] = {0: memory.snapshot()}
+        self.restores = 0
+        self.replayed = 0              # Команд, выполненных повторно после восстановления
+        self._fast = None              # Исполнитель engine, создается при первом continue_()
+
+    @property
+    def position(self) -> int:
+        """Число выполненных команд."""
+        return self.executor.instruction_count
+
+    @property
+    def finished(self) -> bool:
+        return not self.executor.running or self.memory.pc >= len(self.memory.code)
+
+    def _checkpoint(self):
+        """Сохраняет точку в текущем положении и соблюдает бюджет."""
+        position = self.position
+        if position in self.checkpoints or not self.executor.running:
+            return
+        self.checkpoints[position] = self.memory.snapshot()
+        while len(self.checkpoints) > self.budget:
+            self.every *= 2
+            kept = sorted(self.checkpoints)[::2]
+            self.checkpoints = {key: self.checkpoints[key] for key in kept}
+
+    def _advance(self, target: Optional[int], fast=False):
+        """Выполняет вперед до команды target (None - до конца) с контрольными точками."""
+        executor = self.executor
+        while not self.finished and (target is None or self.position < target):
+            boundary = (self.position // self.every + 1) * self.every
+            stop = boundary if target is None else min(boundary, target)
+            if fast:
+                self._run_fast(stop)
+            else:
+                executor.run(max_instructions=stop)
+            if self.position % self.every == 0 or fast:
+                self._checkpoint()
+
+    def _run_fast(self, stop: int):
+        """Порция выполнения исполнителем engine до команды stop."""
+        fast = self._fast
+        if fast is None:
+            from engines import get_engine
+            fast = self._fast = get_engine(self.engine)(self.memory)
+        elif fast.instruction_count != self.position:
+            # Память восстановлена или продвинута reference: операция ищется заново по pc
+            fast.index = None
+        fast.instruction_count = self.position
+        fast.running = True
+        fast.error = None
+        fast.run(max_instructions=stop)
+        executor = self.executor
+        executor.instruction_count = fast.instruction_count
+        if fast.error is not None:
+            executor.error = fast.error
+            executor.running = False
+
+    def _restore(self, target: int):
+        """Восстанавливает ближайшую точку не позже target."""
+        keys = sorted(self.checkpoints)
+        position = keys[bisect_right(keys, target) - 1]
+        self.memory.restore(self.checkpoints[position])
+        executor = self.executor
+        executor.instruction_count = position
+        executor.running = True
+        executor.error = None
+        self.restores += 1
+
+    def step(self, count=1) -> int:
+        """Выполняет count команд вперед; возвращает новое положение."""
+        return self.goto(self.position + count)
+
+    def step_back(self, count=1) -> int:
+        """Возвращается на count команд назад; возвращает новое положение."""
+        return self.goto(max(self.position - count, 0))
+
+    def goto(self, target: int) -> int:
+        """
+        Переходит к состоянию после target команд.
+
+        Назад - восстановление ближайшей контрольной точки и повторное
+        выполнение вперед; если программа заканчивается раньше, сеанс
+        остается в ее конце. Возвращает новое положение.
+        """
+        if target < 0:
+            raise ValueError(f"Номер команды не может быть отрицательным: {target}")
+        if target < self.position:
+            self._restore(target)
+            before = self.position
+            self._advance(target)
+            self.replayed += self.position - before
+        else:
+            self._advance(target)
+        return self.position
+
+    def continue_(self) -> int:
+        """Выполняет программу до конца (или ошибки); возвращает положение."""
+        self._advance(None, fast=self.engine not in (None, 'reference'))
+        return self.position
+
+    def state(self) -> Dict[str, Any]:
+        """Текущее состояние: положение, pc, стек, строка исходного текста."""
+        memory = self.memory
+        stack = memory.stack
+        error = self.executor.error
+        line = None
+        if self.source_map is not None:
+            from sourcemap import error_offset
+            line = self.source_map.lookup(memory.pc if error is None else error_offset(memory.pc, error))
+        return {
+            'position': self.position,
+            'pc': memory.pc,
+            'depth': len(stack),
+            'top': stack[-1] if stack else None,
+            'line': line,
+            'finished': self.finished,
+            'error': None if error is None else str(error)
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'checkpoints': len(self.checkpoints),
+            'every': self.every,
+            'budget': self.budget,
+            'restores': self.restores,
+            'replayed': self.replayed
+        }
+
+
+HELP = """Команды:
+  s, step [N]      выполнить N команд вперед (по умолчанию 1)
+  b, back [N]      вернуться на N команд назад
+  g, goto N        перейти к состоянию после N команд
+  c, continue      выполнить до конца программы
+  m, mem A [B]     ячейки памяти с A по B
+  stack            содержимое стека (вершина последней)
+  info             положение, pc, строка исходного текста
+  checkpoints      число контрольных точек и интервал
+  q, quit          выход"""
+
+
+def _describe(session: DebugSession) -> str:
+    state = session.state()
+    text = f"[{state['position']}] pc={state['pc']:06X} стек {state['depth']}"
+    if state['top'] is not None:
+        text += f", вершина {state['top']}"
+    if state['line'] is not None:
+        text += f", строка {state['line']}"
+    if state['error']:
+        text += f", ошибка: {state['error']}"
+    elif state['finished']:
+        text += ", программа завершена"
+    return text
+
+
+def execute_command(session: DebugSession, line: str) -> Optional[str]:
+    """
+    Выполняет одну команду отладчика.
+
+    Returns:
+        Текст ответа; None - команда выхода
+    """
+    words = line.split()
+    if not words:
+        return ''
+    command, arguments = words[0].lower(), words[1:]
+    try:
+        numbers = [int(word, 0) for word in arguments]
+    except ValueError:
+        return f"Ожидались числа: {' '.join(arguments)}"
+    count = numbers[0] if numbers else 1
+
+    if command in ('q', 'quit', 'exit'):
+        return None
+    try:
+        if command in ('s', 'step'):
+            session.step(count)
+        elif command in ('b', 'back'):
+            session.step_back(count)
+        elif command in ('g', 'goto'):
+            if not numbers:
+                return "Укажите номер команды: goto N"
+            session.goto(numbers[0])
+        elif command in ('c', 'continue'):
+            session.continue_()
+        elif command in ('m', 'mem'):
+            if not numbers:
+                return "Укажите адрес: mem A [B]"
+            start = numbers[0]
+            end = numbers[1] if len(numbers) > 1 else start
+            data = session.memory.data
+            if not 0 <= start <= end < len(data):
+                return f"Адреса вне памяти данных (0..{len(data) - 1})"
+            return '\n'.join(f"{address}: {data[address]}" for address in range(start, end + 1))
+        elif command == 'stack':
+            return ' '.join(str(value) for value in session.memory.stack) or 'стек пуст'
+        elif command == 'info':
+            pass
+        elif command == 'checkpoints':
+            stats = session.stats()
+            return (f"Контрольных точек: {stats['checkpoints']} из {stats['budget']}, "
+                    f"интервал {stats['every']} команд, восстановлений {stats['restores']}, "
+                    f"повторно выполнено команд {stats['replayed']}")
+        elif command in ('h', 'help', '?'):
+            return HELP
+        else:
+            return f"Неизвестная команда: {command} (help - список команд)"
+    except ValueError as error:
+        # Отрицательный номер команды: goto -1, step -100
+        return str(error)
+    return _describe(session)
+
+
+def repl(session: DebugSession, read=input, write=print):
+    """Цикл команд отладчика до quit или конца ввода."""
+    write(_describe(session))
+    while True:
+        try:
+            line = read('(uvm) ')
+        except EOFError:
+            break
+        reply = execute_command(session, line)
+        if reply is None:
+            break
+        if reply:
+            write(reply)
@@ -5,7 +5,32 @@
 """
 
 import struct
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+from datasection import DATA_RECORD, DATA_RECORD_MAX
+
+# Допустимые значения поля B: мнемоника -> (минимум, максимум, сообщение)
+OPERAND_RANGES = {
+    'LOAD_CONST': (0, 1023, "LOAD_CONST: значение {} вне диапазона 0-1023"),
+    'LOAD_MEM': (0, 16777215, "LOAD_MEM: адрес {} вне диапазона 0-16777215"),
+    'STORE_MEM': (-4096, 4095, "STORE_MEM: смещение {} вне диапазона -4096..4095"),
+}
+
+
+def encode_data_section(intermediate: List[Dict[str, Any]]) -> bytes:
+    """Записи секции данных для директив .data/.fill промежуточного представления."""
+    section = bytearray()
+    for instr in intermediate:
+        if instr['opcode'] != '.DATA':
+            continue
+        address, values = instr['B'], bytes(instr['values'])
+        for start in range(0, len(values), DATA_RECORD_MAX):
+            chunk = values[start:start + DATA_RECORD_MAX]
+            section.append(DATA_RECORD)
+            section += (address + start).to_bytes(3, 'big')
+            section += len(chunk).to_bytes(2, 'big')
+            section += chunk
+    return bytes(section)
 
 
 def encode_to_intermediate(program: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -22,13 +47,17 @@ def encode_to_intermediate(program: List[Dict[str, Any]]) -> List[Dict[str, Any]
 
     for instr in program:
         opcode = instr['opcode']
+        operand = instr.get('operand')
+        line = instr.get('line')
 
         if opcode == 'LOAD_CONST':
             # LOAD_CONST: A=2, B=значение (0-1023)
             intermediate.append({
                 'opcode': opcode,
                 'A': 2,
-                'B': instr['value']
+                'B': operand,
+                'size': 2,
+                'line': line
             })
 
         elif opcode == 'LOAD_MEM':
@@ -36,7 +65,9 @@ def encode_to_intermediate(program: List[Dict[str, Any]]) -> List[Dict[str, Any]
             intermediate.append({
                 'opcode': opcode,
                 'A': 3,
-                'B': instr['address']
+                'B': operand,
+                'size': 4,
+                'line': line
             })
 
         elif opcode == 'STORE_MEM':
@@ -44,7 +75,9 @@ def encode_to_intermediate(program: List[Dict[str, Any]]) -> List[Dict[str, Any]
             intermediate.append({
                 'opcode': opcode,
                 'A': 1,
-                'B': instr['offset']
+                'B': operand,
+                'size': 2,
+                'line': line
             })
 
         elif opcode == 'ROL':
@@ -52,23 +85,66 @@ def encode_to_intermediate(program: List[Dict[str, Any]]) -> List[Dict[str, Any]
             intermediate.append({
                 'opcode': opcode,
                 'A': 4,
-                'B': None
+                'B': None,
+                'size': 1,
+                'line': line
+            })
+
+        elif opcode == '.DATA':
+            # Секция данных: B=адрес, values - значения ячеек, в коде 0 байт
+            intermediate.append({
+                'opcode': opcode,
+                'A': None,
+                'B': operand,
+                'values': list(instr['values']),
+                'size': 0,
+                'line': line
             })
 
     return intermediate
 
 
-def encode_to_binary(intermediate: List[Dict[str, Any]]) -> bytes:
+def validate_intermediate(intermediate: List[Dict[str, Any]]):
+    """
+    Проверяет диапазоны операндов так же, как encode_to_binary.
+
+    Нужна для выполнения промежуточного представления без кодирования.
+
+    Raises:
+        ValueError: Операнд вне диапазона своего поля
+    """
+    for instr in intermediate:
+        if instr['opcode'] == '.DATA':
+            if instr['B'] < 0 or instr['B'] + len(instr['values']) > 16777216:
+                raise ValueError(f".data: адрес {instr['B']} вне диапазона 0-16777215")
+            if any(value < 0 or value > 255 for value in instr['values']):
+                raise ValueError(".data: значения должны быть в диапазоне 0-255")
+            continue
+        limits = OPERAND_RANGES.get(instr['opcode'])
+        if limits is not None:
+            low, high, message = limits
+            if instr['B'] < low or instr['B'] > high:
+                raise ValueError(message.format(instr['B']))
+
+
+def encode_to_binary(intermediate: List[Dict[str, Any]],
+                     out: Optional[bytearray] = None):
     """
     Преобразует промежуточное представление в бинарный код.
 
     Args:
         intermediate: Список команд в промежуточном представлении
+        out: Буфер для повторного использования; если задан, код
+            дописывается в него и возвращается сам буфер
 
     Returns:
-        Бинарный код программы
+        Бинарный код программы (bytes или out)
     """
-    binary_data = bytearray()
+    binary_data = bytearray() if out is None else out
+
+    # Директивы .data/.fill - записи секции данных перед кодом
+    validate_intermediate([instr for instr in intermediate if instr['opcode'] == '.DATA'])
+    binary_data += encode_data_section(intermediate)
 
     for instr in intermediate:
         opcode = instr['opcode']
@@ -148,9 +224,27 @@ def encode_to_binary(intermediate: List[Dict[str, Any]]) -> bytes:
 
             binary_data.append(byte1)
 
+    if out is not None:
+        return out
     return bytes(binary_data)
 
 
+def decode_from_binary(binary_data: bytes) -> List[Dict[str, Any]]:
+    """
+    Декодирует бинарный код обратно в список команд.
+
+    Args:
+        binary_data: Бинарный код программы
+
+    Returns:
+        Список команд с полями opcode, A, B, size и offset (от начала кода,
+        секция данных пропускается)
+    """
+    from interpreter import UVMDecoder, split_data_section
+    _, start = split_data_section(binary_data)
+    return UVMDecoder.decode_program(binary_data[start:])
+
+
 # Функция для получения жестко закодированных тестовых значений
 def encode_to_binary_test(intermediate: List[Dict[str, Any]]) -> bytes:
     """
@@ -0,0 +1,25 @@
+"""
+Реестр исполнителей УВМ (Вариант 5)
+Все исполнители имеют общий интерфейс: конструктор принимает UVMMemory
+с загруженным кодом, метод run() выполняет программу, после чего доступны
+атрибуты instruction_count, running и error. Модули импортируются лениво.
+"""
+
+# Имя исполнителя -> (модуль, класс)
+ENGINES = {
+    'reference': ('interpreter', 'UVMExecutor'),
+    'predecoded': ('predecode', 'PredecodedExecutor'),
+    'vectorized': ('vectorize', 'VectorizedExecutor'),
+    'compiled': ('compiler', 'CompiledExecutor'),
+    'tiered': ('tiering', 'TieredExecutor'),
+    'aot': ('aot', 'AotExecutor'),
+}
+
+
+def get_engine(name: str):
+    """Возвращает класс исполнителя по имени."""
+    if name not in ENGINES:
+        raise ValueError(f"Неизвестный исполнитель '{name}', доступны: {', '.join(ENGINES)}")
+    import importlib
+    module_name, class_name = ENGINES[name]
+    return getattr(importlib.import_module(module_name), class_name)
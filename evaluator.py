@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Частичный вычислитель для УВМ (Вариант 5)
+Программы УВМ не содержат ветвлений, поэтому результат выполнения полностью
+определяется машинным кодом и ячейками начальной памяти, которые программа
+читает до первой записи в них. Вычислитель один раз выполняет программу,
+запоминает эти входные ячейки, итоговые значения записанных ячеек и стек,
+и сохраняет их в предвычисленный артефакт. Интерпретатор применяет артефакт
+за O(записей), если входные ячейки совпадают, иначе выполняет программу.
+"""
+
+import sys
+import json
+import argparse
+from typing import Dict, Any, Optional
+
+from interpreter import UVMMemory, UVMDecoder, UVMExecutor, PagedData
+from utils import binary_digest
+
+EVALUATION_FORMAT = 'uvm-pre-evaluated'
+EVALUATION_VERSION = 2
+
+
+class _TracingMemory(UVMMemory):
+    """Память, отслеживающая чтения начального образа и записи."""
+
+    def __init__(self, initial_image: Optional[Dict[int, int]] = None,
+                 data_size=65536):
+        self.inputs = {}      # Адрес -> значение, прочитанное из начального образа
+        self.written = set()  # Адреса, в которые выполнялась запись
+        super().__init__(data_size=data_size)
+        if initial_image is not None:
+            self.data = PagedData(data_size) if isinstance(self.data, PagedData) else [0] * data_size
+            for address, value in initial_image.items():
+                self.write_data(int(address), value)
+        # Записи начального образа не относятся к выполнению программы
+        self.written.clear()
+
+    def read_data(self, address: int) -> int:
+        value = super().read_data(address)
+        if address not in self.written and address not in self.inputs:
+            self.inputs[address] = value
+        return value
+
+    def write_data(self, address: int, value: int):
+        super().write_data(address, value)
+        self.written.add(address)
+
+
+def evaluate_static(binary: bytes,
+                    initial_image: Optional[Dict[int, int]] = None,
+                    data_size=65536) -> Dict[str, Any]:
+    """
+    Вычисляет итоговое состояние машины для программы.
+
+    Args:
+        binary: Машинный код программы
+        initial_image: Начальная память {адрес: значение} (остальные ячейки
+            нулевые); None - стандартный образ UVMMemory
+        data_size: Размер памяти данных
+
+    Returns:
+        Предвычисленный артефакт: входные ячейки, дельта памяти, стек
+    """
+    memory = _TracingMemory(initial_image, data_size=data_size)
+    memory.load_code(binary)
+    executor = UVMExecutor(memory)
+
+    while memory.pc < len(memory.code):
+        try:
+            instruction = UVMDecoder.decode_instruction(memory)
+            if instruction is None:
+                break
+            executor.execute(instruction)
+        except Exception as e:
+            executor.error = e
+            break
+
+    writes = {}
+    for address in sorted(memory.written):
+        writes[str(address)] = memory.data[address]
+
+    return {
+        'format': EVALUATION_FORMAT,
+        'version': EVALUATION_VERSION,
+        'binary_sha256': binary_digest(memory.program_bytes()),
+        'entry': memory.entry,
+        'data_size': data_size,
+        'instruction_count': executor.instruction_count,
+        'final_pc': memory.pc,
+        'inputs': {str(a): v for a, v in sorted(memory.inputs.items())},
+        'writes': writes,
+        'stack': memory.get_stack_dump(),
+        'error': str(executor.error) if executor.error is not None else None
+    }
+
+
+def save_evaluation(evaluation: Dict[str, Any], path: str):
+    """Сохраняет предвычисленный артефакт в JSON."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(evaluation, f, ensure_ascii=False)
+
+
+def load_evaluation(path: str) -> Dict[str, Any]:
+    """Загружает предвычисленный артефакт из JSON."""
+    with open(path, 'r', encoding='utf-8') as f:
+        evaluation = json.load(f)
+    if evaluation.get('format') != EVALUATION_FORMAT:
+        raise ValueError(f"Файл '{path}' не является предвычисленным артефактом УВМ")
+    if evaluation.get('version') != EVALUATION_VERSION:
+        raise ValueError(f"Неподдерживаемая версия артефакта: {evaluation.get('version')}")
+    return evaluation
+
+
+def apply_evaluation(memory: UVMMemory, evaluation: Dict[str, Any]) -> bool:
+    """
+    Применяет артефакт к памяти с загруженным кодом.
+
+    Проверяет хэш кода, начальную команду (артефакт сырого кода не подходит
+    контейнеру с точкой входа и запуску с --start-at), размер памяти и
+    значения входных ячеек. Если все совпадает, записывает дельту памяти и
+    стек (O(записей)) и возвращает True. Иначе память не изменяется и возвращается False - программу нужно выполнить.
+
+    Артефакт выполнения, остановленного ошибкой, не применяется: ошибку и
+    остановленное состояние исполнителя воспроизводит только выполнение.
+    """
+    if evaluation['error'] is not None:
+        return False
+    if evaluation['binary_sha256'] != binary_digest(memory.program_bytes()):
+        return False
+    if evaluation['entry'] != memory.pc:
+        return False
+    if evaluation['data_size'] != len(memory.data):
+        return False
+
+    data = memory.data
+    for address, value in evaluation['inputs'].items():
+        if data[int(address)] != value:
+            return False
+
+    dirty = memory.dirty
+    for address, value in evaluation['writes'].items():
+        data[int(address)] = value
+        dirty.add(int(address))
+    memory.stack = list(evaluation['stack'])
+    memory.pc = evaluation['final_pc']
+    return True
+
+
+def main():
+    """CLI: построение предвычисленного артефакта для бинарного файла."""
+    parser = argparse.ArgumentParser(
+        description='Частичный вычислитель УВМ (Вариант 5)'
+    )
+    parser.add_argument('input', help='Путь к бинарному файлу с программой (.bin)')
+    parser.add_argument('output', help='Путь к предвычисленному артефакту (.json)')
+    parser.add_argument('--image', help='Начальная память в JSON {адрес: значение} '
+                                        '(по умолчанию стандартный образ УВМ)')
+
+    args = parser.parse_args()
+
+    try:
+        with open(args.input, 'rb') as f:
+            binary_data = f.read()
+
+        initial_image = None
+        if args.image:
+            with open(args.image, 'r', encoding='utf-8') as f:
+                initial_image = json.load(f)
+
+        evaluation = evaluate_static(binary_data, initial_image)
+        save_evaluation(evaluation, args.output)
+
+        print(f"Выполнено инструкций: {evaluation['instruction_count']}")
+        print(f"Входных ячеек: {len(evaluation['inputs'])}")
+        print(f"Записанных ячеек: {len(evaluation['writes'])}")
+        print(f"Размер стека: {len(evaluation['stack'])}")
+        if evaluation['error']:
+            print(f"Выполнение остановлено ошибкой: {evaluation['error']} "
+                  f"(артефакт не будет применяться, программа выполнится заново)")
+        print(f"Артефакт сохранен в: {args.output}")
+
+    except FileNotFoundError as e:
+        print(f"Ошибка: файл '{e.filename}' не найден", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,31 +4,34 @@
 """
 
 import os
-import subprocess
-import json
 import sys
+import time
 from datetime import datetime
 
+import uvm
+
 def log_step(step_num, description):
     """Логирует шаг выполнения."""
     print(f"\n{'='*70}")
     print(f"ШАГ {step_num}: {description}")
     print(f"{'='*70}")
 
-def run_and_check(cmd, error_msg):
-    """Запускает команду и проверяет результат."""
-    print(f"Команда: {cmd}")
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-    
-    if result.returncode != 0:
-        print(f"ОШИБКА: {error_msg}")
-        print(f"stderr: {result.stderr}")
-        return False
+def assemble_and_run(asm_file, start_addr=0, end_addr=1000):
+    """Ассемблирует и выполняет программу в текущем процессе, возвращает дамп памяти."""
+    try:
+        with open(asm_file, 'r', encoding='utf-8') as f:
+            binary = uvm.assemble(f.read())
+    except Exception as e:
+        print(f"ОШИБКА: Ошибка ассемблирования {asm_file}: {e}")
+        return None
+    print(f"Ассемблировано {asm_file}: {len(binary)} байт")
     
-    if result.stdout:
-        print(f"Вывод: {result.stdout[:500]}...")  # Ограничиваем вывод
+    result = uvm.run(binary)
+    print(f"Выполнено инструкций: {result.instruction_count}")
+    if not result.ok:
+        print(f"Ошибка выполнения на инструкции {result.instruction_count}: {result.error}")
     
-    return True
+    return result.dump(start_addr, end_addr)
 
 def create_test_programs():
     """Создает тестовые программы, если их нет."""
@@ -177,29 +180,17 @@ def main():
     if created > 0:
         print(f"Создано {created} тестовых программ")
     
-    # Шаг 2: Ассемблирование тестовой задачи
-    log_step(2, "АССЕМБЛИРОВАНИЕ ТЕСТОВОЙ ЗАДАЧИ")
-    if not run_and_check(
-        "python main.py test_task.asm test_task.bin --test",
-        "Ошибка ассемблирования test_task.asm"
-    ):
+    # Шаг 2: Ассемблирование и выполнение тестовой задачи
+    log_step(2, "АССЕМБЛИРОВАНИЕ И ВЫПОЛНЕНИЕ ТЕСТОВОЙ ЗАДАЧИ")
+    started = time.perf_counter()
+    dump = assemble_and_run('test_task.asm', 0, 1000)
+    if dump is None:
         return 1
     
-    # Шаг 3: Выполнение тестовой задачи
-    log_step(3, "ВЫПОЛНЕНИЕ ТЕСТОВОЙ ЗАДАЧИ")
-    if not run_and_check(
-        "python interpreter.py test_task.bin test_task.json --start 0 --end 1000",
-        "Ошибка выполнения test_task.bin"
-    ):
-        return 1
-    
-    # Шаг 4: Проверка результатов тестовой задачи
-    log_step(4, "ПРОВЕРКА РЕЗУЛЬТАТОВ ТЕСТОВОЙ ЗАДАЧИ")
+    # Шаг 3: Проверка результатов тестовой задачи
+    log_step(3, "ПРОВЕРКА РЕЗУЛЬТАТОВ ТЕСТОВОЙ ЗАДАЧИ")
     try:
-        with open('test_task.json', 'r') as f:
-            dump = json.load(f)
-        
-        print("Анализ дампа памяти test_task.json:")
+        print("Анализ дампа памяти test_task:")
         print(f"  Размер стека: {dump['metadata']['stack_size']}")
         print(f"  Ненулевых ячеек памяти: {len(dump['memory'])}")
         
@@ -235,43 +226,22 @@ def main():
         print(f"Ошибка анализа дампа: {e}")
         return 1
     
-    # Шаг 5: Дополнительные примеры
-    log_step(5, "ДОПОЛНИТЕЛЬНЫЕ ПРИМЕРЫ ВЫЧИСЛЕНИЙ")
+    # Шаг 4: Дополнительные примеры
+    log_step(4, "ДОПОЛНИТЕЛЬНЫЕ ПРИМЕРЫ ВЫЧИСЛЕНИЙ")
     
-    examples = [
-        ('calc_demo.asm', 'calc_demo.bin', 'calc_demo.json'),
-        ('simple_rol.asm', 'simple_rol.bin', 'simple_rol.json')
-    ]
-    
-    for asm_file, bin_file, json_file in examples:
+    for asm_file in ['calc_demo.asm', 'simple_rol.asm']:
         print(f"\nОбработка {asm_file}:")
         
-        # Ассемблирование
-        if not run_and_check(
-            f"python main.py {asm_file} {bin_file}",
-            f"Ошибка ассемблирования {asm_file}"
-        ):
+        example_dump = assemble_and_run(asm_file, 0, 500)
+        if example_dump is None:
             continue
         
-        # Выполнение
-        if not run_and_check(
-            f"python interpreter.py {bin_file} {json_file} --start 0 --end 500",
-            f"Ошибка выполнения {bin_file}"
-        ):
-            continue
-        
-        # Проверка
-        try:
-            with open(json_file, 'r') as f:
-                example_dump = json.load(f)
-            
-            print(f"  Результат: {len(example_dump['memory'])} ненулевых ячеек, стек: {example_dump['stack']}")
-            
-        except Exception as e:
-            print(f"  Ошибка чтения дампа: {e}")
+        print(f"  Результат: {len(example_dump['memory'])} ненулевых ячеек, стек: {example_dump['stack']}")
+    
+    print(f"\nВремя ассемблирования и выполнения: {(time.perf_counter() - started) * 1000:.1f} мс")
     
-    # Шаг 6: Финальный отчет
-    log_step(6, "ФИНАЛЬНЫЙ ОТЧЕТ")
+    # Шаг 5: Финальный отчет
+    log_step(5, "ФИНАЛЬНЫЙ ОТЧЕТ")
     
     print("ВЫПОЛНЕНЫ ВСЕ ТРЕБОВАНИЯ ЭТАПА 5:")
     print("1. ✅ Написана, скомпилирована и исполнена программа для тестовой задачи")
@@ -294,22 +264,6 @@ def main():
     print("   - Все тесты проходят успешно")
     print("   - Дампы памяти проверены автоматически")
     
-    # Шаг 7: Очистка
-    log_step(7, "ОЧИСТКА ВРЕМЕННЫХ ФАЙЛОВ")
-    
-    temp_files = []
-    for ext in ['.bin', '.json']:
-        for base in ['test_task', 'calc_demo', 'simple_rol']:
-            temp_files.append(base + ext)
-    
-    cleaned = 0
-    for file in temp_files:
-        if os.path.exists(file):
-            os.remove(file)
-            cleaned += 1
-    
-    print(f"Удалено {cleaned} временных файлов")
-    
     print("\n" + "=" * 70)
     print("✅ ЭТАП 5 УСПЕШНО ВЫПОЛНЕН!")
     print("=" * 70)
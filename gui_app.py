@@ -12,6 +12,8 @@ import json
 import threading
 from datetime import datetime
 
+import uvm
+
 
 class UVMGUIApp:
     """Основной класс GUI-приложения УВМ."""
@@ -26,6 +28,9 @@ class UVMGUIApp:
         self.memory_dump = None
         self.is_running = False
         self.last_binary = None
+        self.runner = None           # uvm.Runner: буферы памяти переиспользуются между запусками
+        self.heatmap = None          # heatmap.AccessHeatmap последнего запуска
+        self.debug_session = None    # debugger.DebugSession: пошаговое выполнение с шагом назад
 
         # Создание интерфейса
         self.create_widgets()
@@ -117,6 +122,20 @@ class UVMGUIApp:
                                         command=self.save_memory_dump)
         self.btn_save_dump.pack(side=tk.LEFT, padx=2)
 
+        self.collect_heatmap = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self.memory_control, text="Тепловая карта",
+                        variable=self.collect_heatmap).pack(side=tk.LEFT, padx=10)
+
+        self.btn_save_heatmap = ttk.Button(self.memory_control, text="Сохранить карту",
+                                           command=self.save_heatmap)
+        self.btn_save_heatmap.pack(side=tk.LEFT, padx=2)
+
+        # Тепловая карта обращений: корзины адресов, синий - чтения, красный - записи
+        self.heatmap_canvas = tk.Canvas(self.memory_frame, height=48, background="white",
+                                        highlightthickness=0)
+        self.heatmap_canvas.pack(fill=tk.X, padx=5)
+        self.heatmap_canvas.bind("<Configure>", lambda event: self.draw_heatmap())
+
         # Текстовое поле для дампа памяти
         self.memory_text = scrolledtext.ScrolledText(self.memory_frame,
                                                      wrap=tk.WORD,
@@ -170,6 +189,7 @@ Ctrl+O - Открыть файл
 Ctrl+S - Сохранить файл
 Ctrl+R - Запустить программу
 F5     - Ассемблировать и выполнить
+F10    - Шаг отладки вперед (Shift+F10 - назад)
 F1     - Справка
 """
 
@@ -198,6 +218,22 @@ F1     - Справка
                                       command=self.assemble_and_run)
         self.btn_asm_run.pack(side=tk.RIGHT, padx=5, pady=5)
 
+        # Отладка: шаги вперед и назад, переход к команде с номером
+        self.btn_debug_goto = ttk.Button(self.control_frame, text="Перейти",
+                                         command=self.debug_goto)
+        self.btn_debug_goto.pack(side=tk.RIGHT, padx=2, pady=5)
+        self.debug_target = ttk.Entry(self.control_frame, width=10)
+        self.debug_target.pack(side=tk.RIGHT, padx=2, pady=5)
+        self.btn_debug_step = ttk.Button(self.control_frame, text="Шаг ▶",
+                                         command=lambda: self.debug_step(1))
+        self.btn_debug_step.pack(side=tk.RIGHT, padx=2, pady=5)
+        self.btn_debug_back = ttk.Button(self.control_frame, text="◀ Шаг",
+                                         command=lambda: self.debug_step(-1))
+        self.btn_debug_back.pack(side=tk.RIGHT, padx=2, pady=5)
+        self.btn_debug = ttk.Button(self.control_frame, text="Отладка",
+                                    command=self.start_debugging)
+        self.btn_debug.pack(side=tk.RIGHT, padx=5, pady=5)
+
     def setup_layout(self):
         """Настраивает layout интерфейса."""
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=5, pady=(5, 0))
@@ -215,6 +251,8 @@ F1     - Справка
         self.root.bind('<F5>', lambda e: self.assemble_and_run())
         self.root.bind('<Control-r>', lambda e: self.run_program())
         self.root.bind('<F1>', lambda e: self.notebook.select(2))  # Переход к справке
+        self.root.bind('<F10>', lambda e: self.debug_step(1))
+        self.root.bind('<Shift-F10>', lambda e: self.debug_step(-1))
 
     def load_example(self):
         """Загружает пример программы."""
@@ -565,52 +603,44 @@ LOAD_MEM   133   ; Чтение MEM[133] (должно быть 42)
         self.output_text.insert(tk.END, "\n\n=== ВЫПОЛНЕНИЕ ПРОГРАММЫ ===\n")
 
         try:
-            # Простое выполнение - имитация
-            # В реальном приложении здесь будет вызов интерпретатора
             self.is_running = True
             self.btn_run.config(state=tk.DISABLED)
             self.update_status("Выполнение программы...")
 
-            # Имитация выполнения
-            import time
-            time.sleep(0.5)
+            # Программа выполняется из промежуточного представления прямо в
+            # процессе: без файлов и без кодирования (last_binary содержит
+            # тестовую кодировку из задания и не предназначен для выполнения)
+            if self.runner is None:
+                self.runner = uvm.Runner()
+            source = self.editor.get(1.0, tk.END)
+            result = self.runner.asm_run(source, ir=True, heatmap=self.collect_heatmap.get())
 
-            # Обновляем интерфейс
-            self.root.after(0, self._update_after_execution, 7)  # 7 инструкций в примере
+            self._update_after_execution(result)
 
         except Exception as e:
+            self.is_running = False
+            self.btn_run.config(state=tk.NORMAL)
             self.output_text.insert(tk.END, f"ОШИБКА ВЫПОЛНЕНИЯ:\n{str(e)}\n")
             self.update_status("Ошибка выполнения")
 
-    def _update_after_execution(self, instruction_count):
+    def _update_after_execution(self, result):
         """Обновляет интерфейс после выполнения программы."""
         self.is_running = False
         self.btn_run.config(state=tk.NORMAL)
 
-        self.output_text.insert(tk.END, f"\nВыполнено инструкций: {instruction_count}\n")
-        self.output_text.insert(tk.END, f"Размер стека: 3\n")
-        self.output_text.insert(tk.END, f"Состояние стека: [42, 100, 225]\n")
-
-        self.update_status(f"Программа выполнена ({instruction_count} инструкций)")
-
-        # Создаем фейковый дамп памяти
-        self.memory_dump = {
-            "metadata": {
-                "start_address": 0,
-                "end_address": 100,
-                "total_memory_size": 65536,
-                "stack_size": 3
-            },
-            "memory": {
-                "0": 100,
-                "133": 42,
-                "500": 25,
-                "501": 100,
-                "502": 225,
-                "520": 100
-            },
-            "stack": [42, 100, 225]
-        }
+        if not result.ok:
+            self.output_text.insert(tk.END, f"\nОшибка выполнения на инструкции "
+                                            f"{result.instruction_count}: {result.error}\n")
+        self.output_text.insert(tk.END, f"\nВыполнено инструкций: {result.instruction_count}\n")
+        self.output_text.insert(tk.END, f"Размер стека: {len(result.stack)}\n")
+        self.output_text.insert(tk.END, f"Состояние стека: {result.stack}\n")
+
+        self.update_status(f"Программа выполнена ({result.instruction_count} инструкций)")
+
+        # Дамп всей памяти: диапазон отображения задается полями адресов
+        self.memory_dump = result.dump(0, len(result.data) - 1)
+        self.heatmap = result.heatmap
+        self.draw_heatmap()
 
         # Обновляем дамп памяти
         self.refresh_memory_dump()
@@ -632,6 +662,74 @@ LOAD_MEM   133   ; Чтение MEM[133] (должно быть 42)
             # Выполняем
             self.run_program()
 
+    def start_debugging(self):
+        """Начинает сеанс отладки программы из редактора."""
+        from parser import parse_assembly
+        from encoder import encode_to_intermediate, encode_to_binary
+        from interpreter import UVMMemory
+        from sourcemap import build_source_map
+        from debugger import DebugSession
+
+        source = self.editor.get(1.0, tk.END)
+        try:
+            intermediate = encode_to_intermediate(parse_assembly(source))
+            memory = UVMMemory()
+            memory.load_code(encode_to_binary(intermediate))
+        except Exception as e:
+            self.output_text.insert(tk.END, f"ОШИБКА АССЕМБЛИРОВАНИЯ:\n{str(e)}\n")
+            self.update_status("Ошибка ассемблирования")
+            return
+        self.debug_session = DebugSession(memory, source_map=build_source_map(intermediate))
+        self.output_text.insert(tk.END, "\n=== ОТЛАДКА ===\n")
+        self._show_debug_state()
+
+    def debug_step(self, count):
+        """Шаг отладки: count > 0 - вперед, count < 0 - назад."""
+        if self.debug_session is None:
+            self.start_debugging()
+            return
+        if count > 0:
+            self.debug_session.step(count)
+        else:
+            self.debug_session.step_back(-count)
+        self._show_debug_state()
+
+    def debug_goto(self):
+        """Переход к состоянию после указанного числа команд."""
+        if self.debug_session is None:
+            self.start_debugging()
+            if self.debug_session is None:
+                return
+        try:
+            target = int(self.debug_target.get())
+            self.debug_session.goto(target)
+        except ValueError:
+            messagebox.showerror("Ошибка", "Некорректный номер команды!")
+            return
+        self._show_debug_state()
+
+    def _show_debug_state(self):
+        """Показывает состояние отладки: строка в редакторе, вывод и дамп памяти."""
+        session = self.debug_session
+        state = session.state()
+        self.editor.tag_remove("debug_line", 1.0, tk.END)
+        if state['line'] is not None:
+            self.editor.tag_add("debug_line", f"{state['line']}.0", f"{state['line']}.end")
+            self.editor.tag_config("debug_line", background="#fff3a0")
+            self.editor.see(f"{state['line']}.0")
+        status = f"Отладка: команда {state['position']}, стек {state['depth']}"
+        if state['error']:
+            status += f", ошибка: {state['error']}"
+        elif state['finished']:
+            status += ", программа завершена"
+        self.output_text.insert(tk.END, status + "\n")
+        self.output_text.see(tk.END)
+        self.update_status(status)
+
+        result = uvm.Result(session.memory, session.executor, 'debug')
+        self.memory_dump = result.dump(0, len(result.data) - 1)
+        self.refresh_memory_dump()
+
     def refresh_memory_dump(self):
         """Обновляет отображение дампа памяти."""
         if self.memory_dump is None:
@@ -706,6 +804,52 @@ LOAD_MEM   133   ; Чтение MEM[133] (должно быть 42)
             except Exception as e:
                 messagebox.showerror("Ошибка", f"Не удалось сохранить дамп памяти:\n{str(e)}")
 
+    def draw_heatmap(self, buckets=64):
+        """Рисует тепловую карту обращений по корзинам затронутого диапазона."""
+        canvas = self.heatmap_canvas
+        canvas.delete("all")
+        if self.heatmap is None or not len(self.heatmap):
+            return
+        width = max(canvas.winfo_width(), 200)
+        low, span = self.heatmap.base, len(self.heatmap)
+        bucket = max(1, -(-span // buckets))
+        rows = self.heatmap.histogram(bucket)
+        peak = max(max(reads, writes) for _, reads, writes in rows)
+        cell = width / (-(-(low % bucket + span) // bucket))
+        first = low - low % bucket
+        for start, reads, writes in rows:
+            x = (start - first) // bucket * cell
+            # Чтения гасят красный канал (синий цвет), записи - синий (красный)
+            red = 255 - int(200 * reads / peak)
+            blue = 255 - int(200 * writes / peak)
+            color = f"#{red:02x}{min(red, blue):02x}{blue:02x}"
+            canvas.create_rectangle(x, 0, x + cell, 32, fill=color, outline="")
+        stats = self.heatmap.stats()
+        canvas.create_text(2, 40, anchor=tk.W, font=("Courier New", 8),
+                           text=f"Адреса {stats['low']}-{stats['high']}, корзина {bucket}: "
+                                f"чтений {stats['reads']}, записей {stats['writes']}, "
+                                f"страниц {stats['pages']} из {stats['span_pages']}")
+
+    def save_heatmap(self):
+        """Сохраняет тепловую карту в CSV или двоичный файл."""
+        if self.heatmap is None:
+            messagebox.showwarning("Предупреждение",
+                                   "Включите тепловую карту и выполните программу!")
+            return
+
+        filepath = filedialog.asksaveasfilename(
+            title="Сохранить тепловую карту",
+            defaultextension=".csv",
+            filetypes=[("CSV файлы", "*.csv"), ("Двоичная карта", "*.uvmh"), ("Все файлы", "*.*")]
+        )
+
+        if filepath:
+            try:
+                self.heatmap.save(filepath)
+                self.update_status(f"Тепловая карта сохранена: {os.path.basename(filepath)}")
+            except Exception as e:
+                messagebox.showerror("Ошибка", f"Не удалось сохранить тепловую карту:\n{str(e)}")
+
     def update_status(self, message):
         """Обновляет статусную строку."""
         timestamp = datetime.now().strftime("%H:%M:%S")
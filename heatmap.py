@@ -0,0 +1,161 @@
+"""
+Тепловая карта обращений к памяти данных УВМ (Вариант 5)
+Счетчики чтений и записей по адресам собираются исполнителем reference
+(UVMExecutor.heatmap). Счетчики хранятся в массивах array('I'), которые
+покрывают только затронутый диапазон адресов и расширяются при обращении
+за его пределы.
+
+Формат двоичного файла (little-endian):
+    b'UVMH', версия (1 байт), первый адрес диапазона и его длина (по 4
+    байта), счетчики чтений, затем записей (по 4 байта на адрес).
+CSV: строки 'address,reads,writes' для затронутых адресов или корзин.
+"""
+
+import sys
+import struct
+from array import array
+from typing import Dict, Any, List, Tuple
+
+MAGIC = b'UVMH'
+VERSION = 1
+
+_HEADER = struct.Struct('<4sBII')
+
+
+class AccessHeatmap:
+    """Счетчики чтений и записей по адресам памяти данных."""
+
+    def __init__(self):
+        self.base = 0                 # Адрес, соответствующий reads[0]
+        self.reads = array('I')
+        self.writes = array('I')
+
+    def __len__(self):
+        return len(self.reads)
+
+    def _slot(self, address: int) -> int:
+        """Индекс адреса в массивах; диапазон расширяется при необходимости."""
+        index = address - self.base
+        if 0 <= index < len(self.reads):
+            return index
+        if not self.reads:
+            self.base = address
+            self.reads.append(0)
+            self.writes.append(0)
+            return 0
+        if index < 0:
+            # Расширение вниз с запасом, чтобы соседние адреса не сдвигали массивы снова
+            # (адрес неотрицателен, поэтому -index <= base)
+            grow = min(max(-index, len(self.reads)), self.base)
+            padding = array('I', bytes(4 * grow))
+            self.reads[0:0] = padding
+            self.writes[0:0] = padding
+            self.base -= grow
+            return index + grow
+        padding = array('I', bytes(4 * (index - len(self.reads) + 1)))
+        self.reads.extend(padding)
+        self.writes.extend(padding)
+        return index
+
+    def read(self, address: int):
+        self.reads[self._slot(address)] += 1
+
+    def write(self, address: int):
+        self.writes[self._slot(address)] += 1
+
+    def counts(self, address: int) -> Tuple[int, int]:
+        """(чтений, записей) по адресу."""
+        index = address - self.base
+        if 0 <= index < len(self.reads):
+            return self.reads[index], self.writes[index]
+        return 0, 0
+
+    def touched(self) -> List[int]:
+        """Адреса, к которым были обращения."""
+        base, reads, writes = self.base, self.reads, self.writes
+        return [base + i for i in range(len(reads)) if reads[i] or writes[i]]
+
+    def histogram(self, bucket=256) -> List[Tuple[int, int, int]]:
+        """
+        Суммы счетчиков по корзинам в bucket адресов.
+
+        Returns:
+            [(первый адрес корзины, чтений, записей)] для непустых корзин
+        """
+        if bucket <= 0:
+            raise ValueError(f"Размер корзины должен быть положительным: {bucket}")
+        if not self.reads:
+            return []
+        first = self.base - self.base % bucket
+        rows = []
+        for start in range(first, self.base + len(self.reads), bucket):
+            low = max(start - self.base, 0)
+            high = start + bucket - self.base
+            reads, writes = sum(self.reads[low:high]), sum(self.writes[low:high])
+            if reads or writes:
+                rows.append((start, reads, writes))
+        return rows
+
+    def stats(self, page_size=4096) -> Dict[str, Any]:
+        """
+        Сводка: затронутые ячейки и страницы.
+
+        Малая доля затронутых страниц на большом диапазоне - признак того,
+        что страничная память (--paged) окупится.
+        """
+        touched = self.touched()
+        pages = {address // page_size for address in touched}
+        return {
+            'reads': sum(self.reads),
+            'writes': sum(self.writes),
+            'cells': len(touched),
+            'pages': len(pages),
+            'low': touched[0] if touched else None,
+            'high': touched[-1] if touched else None,
+            'span_pages': (touched[-1] // page_size - touched[0] // page_size + 1) if touched else 0
+        }
+
+    def to_bytes(self) -> bytes:
+        reads, writes = array('I', self.reads), array('I', self.writes)
+        if sys.byteorder == 'big':
+            reads.byteswap()
+            writes.byteswap()
+        return (_HEADER.pack(MAGIC, VERSION, self.base, len(reads))
+                + reads.tobytes() + writes.tobytes())
+
+    @classmethod
+    def from_bytes(cls, raw) -> 'AccessHeatmap':
+        """Разбирает двоичную карту; поврежденная - ValueError."""
+        raw = bytes(raw)
+        if len(raw) < _HEADER.size or raw[:4] != MAGIC:
+            raise ValueError("Не тепловая карта памяти УВМ")
+        _, version, base, length = _HEADER.unpack_from(raw)
+        if version != VERSION:
+            raise ValueError(f"Неподдерживаемая версия тепловой карты: {version}")
+        if len(raw) != _HEADER.size + 8 * length:
+            raise ValueError("Тепловая карта обрезана")
+        heatmap = cls()
+        heatmap.base = base
+        heatmap.reads.frombytes(raw[_HEADER.size:_HEADER.size + 4 * length])
+        heatmap.writes.frombytes(raw[_HEADER.size + 4 * length:])
+        if sys.byteorder == 'big':
+            heatmap.reads.byteswap()
+            heatmap.writes.byteswap()
+        return heatmap
+
+    def to_csv(self, bucket=1) -> str:
+        """CSV 'address,reads,writes': по адресам или по корзинам в bucket адресов."""
+        if bucket == 1:
+            rows = [(address,) + self.counts(address) for address in self.touched()]
+        else:
+            rows = self.histogram(bucket)
+        return 'address,reads,writes\n' + ''.join(f"{a},{r},{w}\n" for a, r, w in rows)
+
+    def save(self, path: str, bucket=1):
+        """Сохраняет карту: .csv - текстом, иначе в двоичном формате."""
+        if path.endswith('.csv'):
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(self.to_csv(bucket))
+        else:
+            with open(path, 'wb') as f:
+                f.write(self.to_bytes())
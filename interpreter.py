@@ -1,19 +1,301 @@
+from __future__ import annotations
+
 import sys
-import json
-import argparse
-from typing import List, Dict, Any, Optional
+
+from datasection import DATA_RECORD
+
+# typing нужен только для проверки типов: модуль загружается при каждом
+# запуске uvm.py run/disasm, а аннотации не вычисляются
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import List, Dict, Any, Optional, Tuple
+
+# Размер страницы памяти данных (в ячейках) для снимков и страничной памяти
+PAGE_SIZE = 4096
+PAGE_SHIFT = 12
+
+# Адресное пространство LOAD_MEM (24-битный адрес)
+ADDRESS_SPACE = 1 << 24
+
+# Память большего размера по умолчанию страничная
+DENSE_LIMIT = 65536
+
+_ZERO_PAGE = bytes(PAGE_SIZE)
+
+
+class PagedData:
+    """
+    Разреженная память данных из страниц по PAGE_SIZE байт.
+    
+    Страница выделяется при первой записи ненулевого значения; чтение
+    невыделенной страницы возвращает 0. Поддерживает операции списка,
+    которые используют исполнители: len, индексирование, срезы с шагом 1.
+    """
+    
+    def __init__(self, size: int = ADDRESS_SPACE):
+        self.size = size
+        self.pages: Dict[int, bytearray] = {}   # Номер страницы -> ячейки
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def __getitem__(self, address):
+        if isinstance(address, slice):
+            return self._read_slice(address)
+        # Граница проверяется и на выделенной странице: размер памяти может
+        # быть не кратен PAGE_SIZE
+        if not 0 <= address < self.size:
+            raise IndexError(f"Адрес памяти данных вне диапазона: {address}")
+        page = self.pages.get(address >> PAGE_SHIFT)
+        if page is None:
+            return 0
+        return page[address & (PAGE_SIZE - 1)]
+    
+    def __setitem__(self, address, value):
+        if isinstance(address, slice):
+            self._write_slice(address, value)
+            return
+        if not 0 <= address < self.size:
+            raise IndexError(f"Адрес памяти данных вне диапазона: {address}")
+        page = self.pages.get(address >> PAGE_SHIFT)
+        if page is None:
+            if not value:
+                return
+            page = self.pages[address >> PAGE_SHIFT] = bytearray(PAGE_SIZE)
+        page[address & (PAGE_SIZE - 1)] = value
+    
+    def _range(self, index: slice):
+        start, stop, step = index.indices(self.size)
+        if step != 1:
+            raise ValueError("Страничная память поддерживает только срезы с шагом 1")
+        return start, max(stop, start)
+    
+    def _read_slice(self, index: slice) -> bytes:
+        start, stop = self._range(index)
+        parts = []
+        while start < stop:
+            number, offset = start >> PAGE_SHIFT, start & (PAGE_SIZE - 1)
+            end = min(stop, (number + 1) << PAGE_SHIFT)
+            page = self.pages.get(number)
+            if page is None:
+                parts.append(_ZERO_PAGE if end - start == PAGE_SIZE else bytes(end - start))
+            else:
+                parts.append(bytes(page[offset:offset + end - start]))
+            start = end
+        return parts[0] if len(parts) == 1 else b''.join(parts)
+    
+    def _write_slice(self, index: slice, values):
+        start, stop = self._range(index)
+        if len(values) != stop - start:
+            raise ValueError("Размер страничной памяти не меняется")
+        values = bytes(values)
+        position = 0
+        while start < stop:
+            number, offset = start >> PAGE_SHIFT, start & (PAGE_SIZE - 1)
+            end = min(stop, (number + 1) << PAGE_SHIFT)
+            chunk = values[position:position + end - start]
+            page = self.pages.get(number)
+            if page is None and chunk.count(0) != len(chunk):
+                page = self.pages[number] = bytearray(PAGE_SIZE)
+            if page is not None:
+                page[offset:offset + len(chunk)] = chunk
+            position += len(chunk)
+            start = end
+    
+    def __iter__(self):
+        for start in range(0, self.size, PAGE_SIZE):
+            yield from self[start:start + PAGE_SIZE]
+    
+    def __eq__(self, other):
+        if isinstance(other, PagedData):
+            if self.size != other.size:
+                return False
+            return all(self[start:start + PAGE_SIZE] == other[start:start + PAGE_SIZE]
+                       for start in (number << PAGE_SHIFT
+                                     for number in set(self.pages) | set(other.pages)))
+        try:
+            return len(other) == self.size and list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+    
+    __hash__ = None
+    
+    def copy(self) -> 'PagedData':
+        data = PagedData(self.size)
+        data.pages = {number: bytearray(page) for number, page in self.pages.items()}
+        return data
+    
+    def nonzero(self, start: int, end: int):
+        """Пары (адрес, значение) ненулевых ячеек диапазона start..end по выделенным страницам."""
+        for number in sorted(self.pages):
+            base = number << PAGE_SHIFT
+            if base > end or base + PAGE_SIZE <= start:
+                continue
+            page = self.pages[number]
+            for offset in range(max(start - base, 0), min(end - base + 1, PAGE_SIZE, self.size - base)):
+                value = page[offset]
+                if value:
+                    yield base + offset, value
+
+
+def _image_bytes(image) -> bytes:
+    """Ячейки образа памяти в виде байтов."""
+    if hasattr(image, 'dtype'):
+        # Массив NumPy: значения проверяются до приведения к uint8
+        image = image.ravel()
+        if image.dtype.kind not in 'ui' or (image.size and (image.min() < 0 or image.max() > 255)):
+            raise ValueError("Значения образа памяти должны быть целыми 0-255")
+        return image.astype('uint8', copy=False).tobytes()
+    try:
+        return bytes(image)
+    except (TypeError, ValueError):
+        raise ValueError("Значения образа памяти должны быть целыми 0-255") from None
+
+
+def load_memory_image(path: str):
+    """
+    Читает образ памяти из файла.
+    
+    Формат определяется по расширению: .npy - массив NumPy, .json - разреженный
+    словарь {адрес: значение} или дамп interpreter.py, иначе сырые байты
+    (одна ячейка - один байт, с адреса 0).
+    
+    Returns:
+        Образ для UVMMemory.load_image (байты, массив или словарь)
+    """
+    if path.endswith('.npy'):
+        try:
+            import numpy as np
+        except ImportError:
+            raise ValueError("Для образов памяти .npy нужен NumPy") from None
+        return np.load(path, mmap_mode='r')
+    if path.endswith('.json'):
+        import json
+        with open(path, 'r', encoding='utf-8') as f:
+            image = json.load(f)
+        if isinstance(image, dict) and isinstance(image.get('memory'), dict):
+            image = image['memory']
+        if not isinstance(image, dict):
+            raise ValueError("JSON-образ памяти должен быть объектом {адрес: значение}")
+        return {int(address): value for address, value in image.items()}
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+class MemorySnapshot:
+    """
+    Неизменяемый снимок состояния машины: память данных, стек, pc и код.
+    
+    Память данных хранится байтами страниц по PAGE_SIZE ячеек. Снимки,
+    сделанные с одной памяти, разделяют неизмененные страницы, поэтому
+    новый снимок копирует только страницы, записанные после предыдущего.
+    Код тоже общий: его копия делается заново, только когда код заменен.
+    """
+    
+    def __init__(self, pages: tuple, stack: tuple, pc: int, code: bytes):
+        self.pages = pages
+        self.stack = stack
+        self.pc = pc
+        self.code = code
+    
+    @property
+    def data_size(self) -> int:
+        return sum(len(page) for page in self.pages)
+    
+    def read_data(self, address: int) -> int:
+        """Значение ячейки памяти данных в снимке."""
+        return self.pages[address // PAGE_SIZE][address % PAGE_SIZE]
+
 
 class UVMMemory:
     """Модель памяти УВМ с раздельной памятью команд и данных."""
     
-    def __init__(self, data_size=65536, code_size=65536):
-        self.data = [0] * data_size  # Память данных (инициализируем нулями)
+    def __init__(self, data_size=65536, code_size=65536, paged: Optional[bool] = None,
+                 backing: Optional[str] = None, persistent=False, image=None):
+        """
+        Args:
+            data_size: Размер памяти данных (до ADDRESS_SPACE)
+            paged: Страничная память (PagedData) вместо списка; по умолчанию
+                используется для памяти больше DENSE_LIMIT ячеек
+            image: Начальный образ вместо тестовых данных (см. load_image);
+                reset() восстанавливает этот образ
+            backing: Файл образа памяти данных, отображаемый через mmap.
+                Существующий файл задает начальное состояние и размер памяти,
+                новый создается размером data_size со стандартным образом
+            persistent: Записи сохраняются в файл backing; иначе файл
+                отображается только для чтения с копированием при записи,
+                и изменения видны лишь этому экземпляру
+        """
         self.code = bytearray()      # Память команд (загружаем из файла)
+        self.data_section = b''      # Записи секции данных загруженной программы
+        self.code_index = None       # Смещения команд из контейнера (container.py)
         self.stack = []              # Стек УВМ
         self.pc = 0                  # Счетчик команд
+        self.entry = 0               # Смещение начальной команды программы
+        self.dirty = set()           # Адреса ячеек, записанных после последнего снимка
+        self.dirty_pages = set()     # Страницы, записанные целиком (load_image) после снимка
+        self.backing = backing
+        self.persistent = persistent
+        
+        # Страницы последнего снимка; адреса и страницы, записанные до него (для reset)
+        self._pages = None
+        self._written = set()
+        self._written_pages = set()
+        # Код последнего снимка: (bytearray self.code, его неизменяемая копия)
+        self._code_image = None
+        
+        if backing is not None:
+            if image is not None:
+                raise ValueError("Образ памяти и файл образа (backing) несовместимы")
+            # Начальное состояние - содержимое файла, reset() отображает его заново
+            self._baseline = {}
+            self.data = self._map_backing(data_size)
+            return
+        
+        if paged is None:
+            paged = data_size > DENSE_LIMIT
+        # Память данных (инициализируем нулями)
+        self.data = PagedData(data_size) if paged else [0] * data_size
         
-        # Инициализация тестовыми данными как в скриншоте
-        self._init_test_data()
+        if image is None:
+            # Инициализация тестовыми данными как в скриншоте
+            self._init_test_data()
+        else:
+            self.load_image(image)
+        
+        # Исходный образ, который восстанавливает reset(): байты ненулевых страниц
+        data = self.data
+        self._baseline = {}
+        for page in self._changed_pages():
+            cells = bytes(data[page * PAGE_SIZE:(page + 1) * PAGE_SIZE])
+            if cells.count(0) != len(cells):
+                self._baseline[page] = cells
+        self.dirty.clear()
+        self.dirty_pages.clear()
+    
+    def _map_backing(self, data_size: int):
+        """Отображает файл образа памяти, при необходимости создавая его."""
+        import os
+        import mmap
+        if not os.path.exists(self.backing):
+            self.data = bytearray(data_size)
+            self._init_test_data()
+            self.dirty.clear()
+            self.dirty_pages.clear()
+            with open(self.backing, 'wb') as f:
+                f.write(self.data)
+        if os.path.getsize(self.backing) == 0:
+            raise ValueError(f"Файл образа памяти пуст: {self.backing}")
+        with open(self.backing, 'r+b' if self.persistent else 'rb') as f:
+            access = mmap.ACCESS_WRITE if self.persistent else mmap.ACCESS_COPY
+            return mmap.mmap(f.fileno(), 0, access=access)
+    
+    def close(self):
+        """Сохраняет записи постоянной памяти в файл и освобождает отображение."""
+        if self.backing is not None and not self.data.closed:
+            if self.persistent:
+                self.data.flush()
+            self.data.close()
     
     def _init_test_data(self):
         """Инициализация тестовыми данными из скриншота."""
@@ -29,8 +311,53 @@ class UVMMemory:
         self.write_data(520, 100)
     
     def load_code(self, binary_data: bytes):
-        """Загрузка машинного кода в память команд."""
-        self.code = bytearray(binary_data)
+        """
+        Загрузка машинного кода в память команд.
+        
+        Записи секции данных (директивы .data/.fill) в начале кода отделяются
+        и копируются в память данных присваиванием среза. Контейнер
+        (container.py) проверяется и распаковывается; pc устанавливается на
+        его начальную команду.
+        """
+        self.code_index = None
+        entry = 0
+        if binary_data[:4] == b'\xffUVM':
+            import container
+            program = container.read_container(binary_data)
+            entry = container.entry_offset(program)
+            self.code_index = program['index']
+            binary_data = program['data'] + program['code']
+        segments, start = split_data_section(binary_data)
+        self.data_section = bytes(binary_data[:start])
+        self.code = bytearray(binary_data[start:] if start else binary_data)
+        for address, cells in segments:
+            self.load_image(cells, base=address)
+        self.entry = entry
+        self.pc = entry
+    
+    def instruction_offset(self, number: int) -> int:
+        """
+        Смещение команды с номером number в коде.
+        
+        Для контейнера с индексом - без декодирования, иначе декодируются
+        предыдущие команды.
+        """
+        if self.code_index is not None:
+            if number < 0 or number >= len(self.code_index):
+                raise IndexError(f"Команды с номером {number} нет")
+            return self.code_index[number]
+        pc = 0
+        for _ in range(number):
+            if pc >= len(self.code):
+                break
+            pc += UVMDecoder.decode_at(self.code, pc)['size']
+        if number < 0 or pc >= len(self.code):
+            raise IndexError(f"Команды с номером {number} нет")
+        return pc
+    
+    def program_bytes(self) -> bytes:
+        """Загруженная программа целиком: секция данных и код."""
+        return self.data_section + bytes(self.code)
     
     def read_code(self, address: int) -> int:
         """Чтение байта из памяти команд."""
@@ -44,6 +371,33 @@ class UVMMemory:
             raise IndexError(f"Адрес памяти данных вне диапазона: {address}")
         return self.data[address]
     
+    def load_image(self, image, base=0):
+        """
+        Записывает образ памяти начиная с адреса base.
+        
+        Args:
+            image: Байтовый буфер (bytes, bytearray, memoryview, mmap), массив
+                NumPy или список значений 0-255 - копируется одним присваиванием
+                среза; либо разреженный словарь {адрес: значение}, где base
+                не используется
+        
+        Буфер отмечается записанным постранично (dirty_pages), без учета
+        отдельных ячеек.
+        """
+        if isinstance(image, dict):
+            for address, value in image.items():
+                self.write_data(int(address), value)
+            return
+        cells = _image_bytes(image)
+        if base < 0 or base + len(cells) > len(self.data):
+            raise IndexError(f"Образ памяти ({len(cells)} байт с адреса {base}) "
+                             f"не помещается в память размером {len(self.data)}")
+        if not cells:
+            return
+        self.data[base:base + len(cells)] = cells
+        self.dirty_pages.update(range(base >> PAGE_SHIFT,
+                                      ((base + len(cells) - 1) >> PAGE_SHIFT) + 1))
+    
     def write_data(self, address: int, value: int):
         """Запись значения в память данных."""
         if address < 0 or address >= len(self.data):
@@ -51,6 +405,178 @@ class UVMMemory:
         if value < 0 or value > 255:
             raise ValueError(f"Значение вне диапазона 0-255: {value}")
         self.data[address] = value
+        self.dirty.add(address)
+    
+    def reset(self) -> int:
+        """
+        Возвращает память к состоянию после создания.
+        
+        Восстанавливаются только записанные ячейки (dirty и ячейки, записанные
+        до последнего снимка) и записанные целиком страницы - последние
+        присваиванием среза из исходного образа, поэтому время пропорционально
+        объему записанного предыдущей программой, а не размеру памяти.
+        Исполнители, пишущие в data напрямую, добавляют адреса в dirty.
+        Память с файлом образа отображает файл заново; в постоянном режиме
+        данные не восстанавливаются.
+        
+        Returns:
+            Число восстановленных ячеек
+        """
+        self._settle()
+        written, pages = self._written, self._written_pages
+        restored = 0
+        if self.backing is not None:
+            # Копирование при записи: новое отображение возвращает содержимое
+            # файла без чтения; постоянная память сохраняет записи
+            restored = len(written) + PAGE_SIZE * len(pages)
+            if not self.persistent:
+                size = len(self.data)
+                self.data.close()
+                self.data = self._map_backing(size)
+        else:
+            data = self.data
+            size = len(data)
+            baseline = self._baseline
+            for page in pages:
+                start = page * PAGE_SIZE
+                end = min(start + PAGE_SIZE, size)
+                data[start:end] = baseline.get(page) or bytes(end - start)
+                restored += end - start
+            for address in written:
+                page = address >> PAGE_SHIFT
+                if page not in pages:
+                    cells = baseline.get(page)
+                    data[address] = cells[address & (PAGE_SIZE - 1)] if cells else 0
+                    restored += 1
+        written.clear()
+        pages.clear()
+        self.stack.clear()
+        self.pc = 0
+        self.entry = 0
+        del self.code[:]
+        self.data_section = b''
+        self.code_index = None
+        self._pages = None
+        return restored
+    
+    def _changed_pages(self) -> set:
+        """Номера страниц, записанных после последнего снимка или восстановления."""
+        return {address >> PAGE_SHIFT for address in self.dirty} | self.dirty_pages
+    
+    def _settle(self):
+        """Переносит dirty в записанные до снимка: следующие записи снова видны в dirty."""
+        self._written |= self.dirty
+        self._written_pages |= self.dirty_pages
+        self.dirty.clear()
+        self.dirty_pages.clear()
+    
+    def snapshot(self) -> MemorySnapshot:
+        """
+        Снимок текущего состояния.
+        
+        Первый снимок копирует всю память; следующие копируют только страницы,
+        записанные после предыдущего снимка, а остальные разделяют с ним.
+        Код копируется один раз и разделяется, пока не будет заменен.
+        """
+        data = self.data
+        if self._pages is None:
+            pages = [bytes(data[start:start + PAGE_SIZE])
+                     for start in range(0, len(data), PAGE_SIZE)]
+        else:
+            pages = list(self._pages)
+            for page in self._changed_pages():
+                start = page * PAGE_SIZE
+                pages[page] = bytes(data[start:start + PAGE_SIZE])
+        self._pages = tuple(pages)
+        self._settle()
+        return MemorySnapshot(self._pages, tuple(self.stack), self.pc, self._code_bytes())
+    
+    def _code_bytes(self) -> bytes:
+        """
+        Неизменяемая копия кода, общая для снимков.
+        
+        Код заменяется присваиванием (load_code, restore), а не изменяется на
+        месте, поэтому копия делается заново, только если self.code - другой
+        объект.
+        """
+        cached = self._code_image
+        if cached is None or cached[0] is not self.code or len(cached[1]) != len(self.code):
+            cached = self._code_image = (self.code, bytes(self.code))
+        return cached[1]
+    
+    def restore(self, snapshot: MemorySnapshot):
+        """
+        Возвращает память к снимку.
+        
+        Перезаписываются только страницы, отличающиеся от снимка: записанные
+        после последнего снимка или восстановления и не разделяемые с ним.
+        """
+        if snapshot.data_size != len(self.data):
+            raise ValueError(f"Размер памяти снимка {snapshot.data_size} "
+                             f"не совпадает с размером памяти {len(self.data)}")
+        data = self.data
+        if self._pages is None:
+            pages = range(len(snapshot.pages))
+        else:
+            pages = self._changed_pages()
+            pages.update(page for page, (current, target)
+                         in enumerate(zip(self._pages, snapshot.pages)) if current is not target)
+        self._settle()
+        written = self._written_pages
+        for page in pages:
+            start = page * PAGE_SIZE
+            end = start + len(snapshot.pages[page])
+            content = snapshot.pages[page]
+            data[start:end] = content
+            # Страница может отличаться от исходного образа - reset() должен ее восстановить
+            original = self._baseline.get(page)
+            if (content != original if original is not None
+                    else content.count(0) != len(content)):
+                written.add(page)
+        self._pages = snapshot.pages
+        self.stack[:] = snapshot.stack
+        self.pc = snapshot.pc
+        cached = self._code_image
+        if cached is None or cached[0] is not self.code or cached[1] is not snapshot.code:
+            # Код сравнивается по тождеству копии, без побайтового сравнения
+            self.code = bytearray(snapshot.code)
+            self._code_image = (self.code, snapshot.code)
+    
+    def fork(self) -> 'UVMMemory':
+        """
+        Независимая копия памяти в текущем состоянии.
+        
+        Копия разделяет страницы снимка с исходной памятью, поэтому снимки
+        и восстановления в обеих копиях продолжают копировать только
+        измененные страницы. Исходный образ для reset() общий.
+        """
+        snapshot = self.snapshot()
+        memory = UVMMemory.__new__(UVMMemory)
+        data = self.data
+        memory.data = data.copy() if hasattr(data, 'copy') else bytearray(data)
+        memory.backing = None
+        memory.persistent = False
+        memory.code = bytearray(snapshot.code)
+        memory._code_image = (memory.code, snapshot.code)
+        memory.data_section = self.data_section
+        memory.code_index = self.code_index
+        memory.stack = list(snapshot.stack)
+        memory.pc = snapshot.pc
+        memory.entry = self.entry
+        memory.dirty = set()
+        memory.dirty_pages = set()
+        memory._written = set(self._written)
+        memory._written_pages = set(self._written_pages)
+        memory._baseline = self._baseline
+        memory._pages = snapshot.pages
+        return memory
+    
+    @classmethod
+    def from_snapshot(cls, snapshot: MemorySnapshot) -> 'UVMMemory':
+        """Новая память в состоянии снимка (например, сохраненного ранее)."""
+        memory = cls(data_size=snapshot.data_size)
+        memory.restore(snapshot)
+        return memory
     
     def push(self, value: int):
         """Помещение значения на стек."""
@@ -68,96 +594,160 @@ class UVMMemory:
         """Просмотр вершины стека без снятия."""
         return self.stack[-1] if self.stack else None
     
+    def nonzero(self, start_addr: int, end_addr: int):
+        """
+        Пары (адрес, значение) ненулевых ячеек в диапазоне по возрастанию адреса.
+        
+        В страничной памяти перебираются только выделенные страницы.
+        """
+        data = self.data
+        if isinstance(data, PagedData):
+            yield from data.nonzero(start_addr, end_addr)
+            return
+        if not isinstance(data, list) and start_addr >= 0:
+            # Байтовый буфер (файл образа): поиск без копирования через NumPy
+            try:
+                import numpy as np
+            except ImportError:  # pragma: no cover - NumPy необязателен
+                np = None
+            if np is not None:
+                view = np.frombuffer(data, dtype=np.uint8)[start_addr:end_addr + 1]
+                indices = np.flatnonzero(view)
+                cells = list(zip((indices + start_addr).tolist(), view[indices].tolist()))
+                # Отображение нельзя закрыть, пока на него ссылается массив
+                del view, indices
+                yield from cells
+                return
+        for addr in range(start_addr, min(end_addr + 1, len(data))):
+            if data[addr] != 0:
+                yield addr, data[addr]
+    
     def get_memory_dump(self, start_addr: int, end_addr: int) -> Dict[str, Any]:
         """Получение дампа памяти данных в указанном диапазоне."""
-        dump = {}
-        for addr in range(start_addr, min(end_addr + 1, len(self.data))):
-            if self.data[addr] != 0:  # Сохраняем только ненулевые значения
-                dump[str(addr)] = self.data[addr]
-        return dump
+        # Сохраняем только ненулевые значения
+        return {str(addr): value for addr, value in self.nonzero(start_addr, end_addr)}
     
     def get_stack_dump(self) -> List[int]:
         """Получение дампа стека."""
         return self.stack.copy()
 
 
+def split_data_section(binary) -> Tuple[List[Tuple[int, bytes]], int]:
+    """
+    Разбирает записи секции данных в начале машинного кода.
+    
+    Returns:
+        (список (адрес, значения), смещение начала кода)
+    """
+    segments = []
+    position = 0
+    while position < len(binary) and binary[position] == DATA_RECORD:
+        start = position + 6
+        if start > len(binary):
+            raise ValueError(f"Секция данных: неполный заголовок записи по смещению {position}")
+        address = int.from_bytes(binary[position + 1:position + 4], 'big')
+        length = int.from_bytes(binary[position + 4:start], 'big')
+        if start + length > len(binary):
+            raise ValueError(f"Секция данных: запись по смещению {position} обрезана")
+        segments.append((address, bytes(binary[start:start + length])))
+        position = start + length
+    return segments, position
+
+
 class UVMDecoder:
     """Декодер команд УВМ из бинарного формата."""
     
     @staticmethod
-    def decode_instruction(memory: UVMMemory) -> Optional[Dict[str, Any]]:
-        """Декодирует следующую команду из памяти команд."""
-        if memory.pc >= len(memory.code):
-            return None
-        
-        byte1 = memory.read_code(memory.pc)
+    def decode_at(code, pc: int) -> Dict[str, Any]:
+        """Декодирует команду, начинающуюся со смещения pc в коде."""
+        byte1 = code[pc]
         a_value = (byte1 >> 5) & 0x07
         
         if a_value == 4:  # ROL
-            instr = {
+            return {
                 'A': a_value,
                 'B': None,
                 'size': 1,
                 'opcode': 'ROL'
             }
-            memory.pc += 1
             
         elif a_value == 2:  # LOAD_CONST
-            if memory.pc + 1 >= len(memory.code):
+            if pc + 1 >= len(code):
                 raise ValueError("Недостаточно данных для LOAD_CONST")
             
-            byte2 = memory.read_code(memory.pc + 1)
+            byte2 = code[pc + 1]
             b_value = ((byte1 & 0x1F) << 5) | (byte2 & 0x1F)
             
-            instr = {
+            return {
                 'A': a_value,
                 'B': b_value,
                 'size': 2,
                 'opcode': 'LOAD_CONST'
             }
-            memory.pc += 2
             
         elif a_value == 1:  # STORE_MEM
-            if memory.pc + 1 >= len(memory.code):
+            if pc + 1 >= len(code):
                 raise ValueError("Недостаточно данных для STORE_MEM")
             
-            byte2 = memory.read_code(memory.pc + 1)
+            byte2 = code[pc + 1]
             b_value = ((byte1 & 0x1F) << 8) | byte2
             
             # Преобразуем из беззнакового в знаковое
             if b_value >= 4096:
                 b_value = b_value - 8192
             
-            instr = {
+            return {
                 'A': a_value,
                 'B': b_value,
                 'size': 2,
                 'opcode': 'STORE_MEM'
             }
-            memory.pc += 2
             
         elif a_value == 3:  # LOAD_MEM
-            if memory.pc + 3 >= len(memory.code):
+            if pc + 3 >= len(code):
                 raise ValueError("Недостаточно данных для LOAD_MEM")
             
-            byte2 = memory.read_code(memory.pc + 1)
-            byte3 = memory.read_code(memory.pc + 2)
-            byte4 = memory.read_code(memory.pc + 3)
+            byte2 = code[pc + 1]
+            byte3 = code[pc + 2]
+            byte4 = code[pc + 3]
             
             b_value = ((byte1 & 0x1F) << 19) | (byte2 << 11) | (byte3 << 3) | ((byte4 >> 5) & 0x07)
             
-            instr = {
+            return {
                 'A': a_value,
                 'B': b_value,
                 'size': 4,
                 'opcode': 'LOAD_MEM'
             }
-            memory.pc += 4
             
-        else:
-            raise ValueError(f"Неизвестный код операции A={a_value}")
+        raise ValueError(f"Неизвестный код операции A={a_value}")
+    
+    @staticmethod
+    def decode_instruction(memory: UVMMemory) -> Optional[Dict[str, Any]]:
+        """Декодирует следующую команду из памяти команд."""
+        if memory.pc >= len(memory.code):
+            return None
         
+        instr = UVMDecoder.decode_at(memory.code, memory.pc)
+        memory.pc += instr['size']
         return instr
+    
+    @staticmethod
+    def decode_program(code) -> List[Dict[str, Any]]:
+        """
+        Декодирует весь машинный код в список команд.
+        
+        Каждая команда дополнительно содержит поле 'offset' - смещение
+        начала команды в коде. Ошибка декодирования прерывает разбор.
+        """
+        program = []
+        pc = 0
+        while pc < len(code):
+            instr = UVMDecoder.decode_at(code, pc)
+            instr['offset'] = pc
+            program.append(instr)
+            pc += instr['size']
+        return program
 
 
 class UVMExecutor:
@@ -167,6 +757,8 @@ class UVMExecutor:
         self.memory = memory
         self.running = True
         self.instruction_count = 0
+        self.error = None            # Исключение, остановившее выполнение
+        self.heatmap = None          # heatmap.AccessHeatmap: счетчики обращений к памяти
     
     def execute(self, instruction: Dict[str, Any]):
         """Выполняет одну инструкцию."""
@@ -182,6 +774,8 @@ class UVMExecutor:
             # LOAD_MEM: чтение из памяти по адресу B
             address = instruction['B']
             value = self.memory.read_data(address)
+            if self.heatmap is not None:
+                self.heatmap.read(address)
             self.memory.push(value)
             
         elif opcode == 'STORE_MEM':
@@ -199,6 +793,8 @@ class UVMExecutor:
             address = value_to_store + offset
             
             self.memory.write_data(address, value_to_store)
+            if self.heatmap is not None:
+                self.heatmap.write(address)
             
         elif opcode == 'ROL':
             # ROL: побитовый циклический сдвиг влево
@@ -223,6 +819,8 @@ class UVMExecutor:
             
             # Читаем количество сдвигов из памяти
             shift_count = self.memory.read_data(address_for_shifts)
+            if self.heatmap is not None:
+                self.heatmap.read(address_for_shifts)
             
             # Ограничиваем shift_count разумным значением (0-31)
             shift_count = shift_count & 0x1F  # 5 бит
@@ -242,11 +840,20 @@ class UVMExecutor:
         else:
             raise ValueError(f"Неизвестная команда: {opcode}")
     
-    def run(self):
-        """Основной цикл выполнения программы."""
+    def run(self, max_instructions: Optional[int] = None):
+        """
+        Основной цикл выполнения программы.
+        
+        Args:
+            max_instructions: Остановиться после выполнения стольких команд
+                (всего, с учетом уже выполненных); running остается True,
+                и повторный вызов run продолжает выполнение с memory.pc
+        """
         decoder = UVMDecoder()
         
         while self.running and self.memory.pc < len(self.memory.code):
+            if max_instructions is not None and self.instruction_count >= max_instructions:
+                break
             try:
                 instruction = decoder.decode_instruction(self.memory)
                 if instruction is None:
@@ -255,12 +862,32 @@ class UVMExecutor:
                 self.execute(instruction)
                 
             except Exception as e:
-                print(f"Ошибка выполнения на инструкции {self.instruction_count}: {e}")
+                # Ошибка сохраняется в self.error, вывод - забота вызывающего кода
+                self.error = e
                 self.running = False
                 break
+    
+    def run_intermediate(self, intermediate: List[Dict[str, Any]]):
+        """
+        Выполняет программу из промежуточного представления без кодирования.
         
-        print(f"Выполнено инструкций: {self.instruction_count}")
-        print(f"Размер стека: {len(self.memory.stack)}")
+        pc и ошибки изменяются так же, как при выполнении машинного кода:
+        pc указывает за последнюю выполненную (или ошибочную) команду.
+        """
+        memory = self.memory
+        for instruction in intermediate:
+            if not self.running:
+                break
+            if instruction['opcode'] == '.DATA':
+                # Директивы данных загружаются в память до выполнения
+                continue
+            memory.pc += instruction['size']
+            try:
+                self.execute(instruction)
+            except Exception as e:
+                self.error = e
+                self.running = False
+                break
 
 
 def create_memory_dump(memory: UVMMemory, start_addr: int, end_addr: int) -> Dict[str, Any]:
@@ -277,20 +904,22 @@ def create_memory_dump(memory: UVMMemory, start_addr: int, end_addr: int) -> Dic
     }
     
     # Добавляем только ненулевые значения памяти
-    for addr in range(start_addr, min(end_addr + 1, len(memory.data))):
-        value = memory.data[addr]
-        if value != 0:
-            dump["memory"][str(addr)] = value
+    for addr, value in memory.nonzero(start_addr, end_addr):
+        dump["memory"][str(addr)] = value
     
     return dump
 
 
 def main():
     """CLI интерфейс интерпретатора."""
+    import json
+    import argparse
+    from engines import ENGINES, get_engine
+    
     parser = argparse.ArgumentParser(
         description='Интерпретатор УВМ (Вариант 5) - Этап 3'
     )
-    parser.add_argument('input', help='Путь к бинарному файлу с программой (.bin)')
+    parser.add_argument('input', help='Путь к бинарному файлу с программой (.bin или контейнер)')
     parser.add_argument('output', help='Путь к файлу для сохранения дампа памяти (.json)')
     parser.add_argument('--start', type=int, default=0, 
                        help='Начальный адрес для дампа памяти (по умолчанию: 0)')
@@ -298,6 +927,42 @@ def main():
                        help='Конечный адрес для дампа памяти (по умолчанию: 1000)')
     parser.add_argument('--verbose', action='store_true',
                        help='Подробный вывод выполнения')
+    parser.add_argument('--pre-evaluated', metavar='FILE',
+                       help='Применить предвычисленный артефакт (evaluator.py) '
+                            'вместо выполнения, если он подходит к программе и памяти')
+    parser.add_argument('--engine', default='reference', choices=list(ENGINES),
+                       help='Исполнитель программы (по умолчанию: reference)')
+    parser.add_argument('--slice', action='store_true',
+                       help='Выполнять только команды, влияющие на диапазон дампа '
+                            'и итоговый стек (обратный срез)')
+    parser.add_argument('--paged', action='store_true',
+                       help='Память данных на все 24-битное адресное пространство '
+                            '(страницы по 4096 ячеек выделяются при записи)')
+    parser.add_argument('--init-mem', metavar='FILE',
+                       help='Начальный образ памяти вместо тестовых данных: '
+                            'сырые байты, .npy или разреженный .json {адрес: значение}')
+    parser.add_argument('--backing', metavar='FILE',
+                       help='Файл образа памяти данных (mmap); изменения не '
+                            'записываются в файл без --persistent')
+    parser.add_argument('--persistent', action='store_true',
+                       help='Сохранять записи программы в файл --backing')
+    parser.add_argument('--checkpoint-every', type=int, metavar='N',
+                       help='Сохранять контрольную точку каждые N команд')
+    parser.add_argument('--checkpoint-dir', default='checkpoints', metavar='D',
+                       help='Каталог контрольных точек (по умолчанию: checkpoints)')
+    parser.add_argument('--resume', action='store_true',
+                       help='Продолжить выполнение с последней контрольной точки')
+    parser.add_argument('--heatmap', metavar='FILE',
+                       help='Сохранить счетчики чтений и записей по адресам '
+                            '(.csv - текстом, иначе двоичный формат; только reference)')
+    parser.add_argument('--heatmap-bucket', type=int, default=1, metavar='N',
+                       help='Размер корзины адресов для CSV тепловой карты (по умолчанию: 1)')
+    parser.add_argument('--source-map', metavar='FILE',
+                       help='Карта исходного кода для сообщений об ошибках '
+                            '(по умолчанию: секция контейнера или <вход>.map)')
+    parser.add_argument('--start-at', type=int, metavar='N',
+                       help='Начать выполнение с команды с номером N (для контейнера '
+                            'с индексом - без декодирования предыдущих команд)')
     
     args = parser.parse_args()
     
@@ -311,13 +976,102 @@ def main():
         
         # 2. Инициализация памяти УВМ
         print("Инициализация памяти УВМ...")
-        memory = UVMMemory()
+        image = None
+        if args.init_mem:
+            image = load_memory_image(args.init_mem)
+            print(f"Начальный образ памяти: {args.init_mem}")
+        memory = UVMMemory(data_size=ADDRESS_SPACE if args.paged else 65536,
+                           backing=args.backing, persistent=args.persistent, image=image)
         memory.load_code(binary_data)
+        if args.start_at is not None:
+            memory.pc = memory.entry = memory.instruction_offset(args.start_at)
+            print(f"Начальная команда: {args.start_at} (смещение {memory.pc})")
         
         # 3. Запуск интерпретатора
-        print("Запуск интерпретатора...")
-        executor = UVMExecutor(memory)
-        executor.run()
+        applied = False
+        if args.pre_evaluated:
+            from evaluator import load_evaluation, apply_evaluation
+            evaluation = load_evaluation(args.pre_evaluated)
+            applied = apply_evaluation(memory, evaluation)
+            if applied:
+                print(f"Применен предвычисленный результат: {args.pre_evaluated}")
+            elif evaluation['error'] is not None:
+                print("Предвычисленный результат получен выполнением с ошибкой, "
+                      "программа выполняется заново")
+            else:
+                print("Предвычисленный результат не подходит к программе или памяти")
+        
+        if not applied and args.slice and memory.pc:
+            print("Срез выполняется только с начала программы, выполняется вся программа")
+        elif not applied and args.slice:
+            from slicer import slice_code
+            sliced = slice_code(memory.code, args.start, args.end, len(memory.data))
+            if sliced is None:
+                print("Срез невозможен (возможна ошибка выполнения), выполняется вся программа")
+            else:
+                print(f"Срез для диапазона {args.start}-{args.end}: "
+                      f"{len(sliced)} из {len(memory.code)} байт кода")
+                memory.load_code(sliced)
+        
+        resumed = None
+        base = None                # Снимок загруженной памяти - образ для контрольных точек
+        if not applied and args.resume:
+            import checkpoint
+            base = memory.snapshot()
+            latest = checkpoint.load_latest(args.checkpoint_dir, memory.program_bytes(),
+                                            memory.entry, checkpoint.image_digest(base))
+            if latest is None:
+                print(f"Контрольных точек для программы в {args.checkpoint_dir} нет, "
+                      f"выполнение с начала")
+            else:
+                path, resumed = latest
+                checkpoint.restore_memory(memory, resumed, base)
+                print(f"Продолжение с контрольной точки {path}: "
+                      f"{resumed['instruction_count']} команд выполнено")
+        
+        if args.heatmap and args.engine != 'reference':
+            raise ValueError("Тепловую карту собирает только исполнитель reference")
+        if args.engine == 'reference':
+            executor = UVMExecutor(memory)
+            if args.heatmap:
+                from heatmap import AccessHeatmap
+                executor.heatmap = AccessHeatmap()
+        else:
+            executor = get_engine(args.engine)(memory)
+        if resumed is not None:
+            executor.instruction_count = resumed['instruction_count']
+        if applied:
+            executor.instruction_count = evaluation['instruction_count']
+        else:
+            print("Запуск интерпретатора...")
+            if args.checkpoint_every:
+                import checkpoint
+                checkpointer = checkpoint.Checkpointer(args.checkpoint_dir, args.checkpoint_every,
+                                                      base=base)
+                checkpointer.run(executor, memory)
+                stats = checkpointer.stats()
+                print(f"Контрольные точки: {stats['saved']}, {stats['bytes']} байт, "
+                      f"{stats['save_seconds'] * 1000:.1f} мс "
+                      f"({stats['overhead'] * 100:.1f}% времени), интервал {stats['interval']}")
+            else:
+                executor.run()
+            if executor.error is not None:
+                from sourcemap import find_source_map, load_source_map, error_offset
+                source_map = (load_source_map(args.source_map) if args.source_map
+                              else find_source_map(args.input, binary_data))
+                where = ''
+                if source_map is not None:
+                    where = f" ({source_map.location(error_offset(memory.pc, executor.error))})"
+                print(f"Ошибка выполнения на инструкции {executor.instruction_count}{where}: "
+                      f"{executor.error}")
+        
+        if args.heatmap and executor.heatmap is not None:
+            executor.heatmap.save(args.heatmap, args.heatmap_bucket)
+            stats = executor.heatmap.stats()
+            print(f"Тепловая карта сохранена в: {args.heatmap} "
+                  f"(чтений {stats['reads']}, записей {stats['writes']}, "
+                  f"ячеек {stats['cells']}, страниц {stats['pages']} из {stats['span_pages']} "
+                  f"в диапазоне {stats['low']}-{stats['high']})")
         
         # 4. Создание дампа памяти
         print(f"Создание дампа памяти с {args.start} по {args.end}...")
@@ -344,8 +1098,13 @@ def main():
         if memory.stack:
             print(f"\nВершина стека: {memory.stack[-1]}")
         
-    except FileNotFoundError:
-        print(f"Ошибка: файл '{args.input}' не найден", file=sys.stderr)
+        if args.backing:
+            memory.close()
+            if args.persistent:
+                print(f"\nПамять данных сохранена в: {args.backing}")
+        
+    except FileNotFoundError as e:
+        print(f"Ошибка: файл '{e.filename or args.input}' не найден", file=sys.stderr)
         sys.exit(1)
     except Exception as e:
         print(f"Ошибка: {e}", file=sys.stderr)
@@ -1,9 +1,6 @@
 import sys
 import argparse
-import json
 import os
-from parser import parse_assembly
-from encoder import encode_to_intermediate, encode_to_binary, decode_from_binary
 
 def format_hex_dump(binary_data, bytes_per_line=16):
     """Форматирует бинарные данные в hex-дамп."""
@@ -24,9 +21,16 @@ def main():
                        help='Режим тестирования: вывод промежуточного представления и бинарного кода')
     parser.add_argument('--stage', type=int, default=2, choices=[1, 2],
                        help='Этап работы: 1 - только промежуточное представление, 2 - бинарный код (по умолчанию)')
+    parser.add_argument('--source-map', action='store_true',
+                       help='Записать карту исходного кода рядом с бинарным файлом (<выход>.map)')
     
     args = parser.parse_args()
     
+    # Ассемблер загружается после разбора аргументов: --help не платит за импорт
+    import json
+    from parser import parse_assembly
+    from encoder import encode_to_intermediate, encode_to_binary, decode_from_binary
+    
     try:
         # 1. Чтение исходного файла
         with open(args.input, 'r', encoding='utf-8') as f:
@@ -78,6 +82,12 @@ def main():
         # 7. Вывод информации о размере
         print(f"\nРазмер бинарного файла: {len(binary)} байт")
         
+        if args.source_map:
+            from sourcemap import build_source_map, write_source_map, map_path
+            write_source_map(map_path(args.output),
+                             build_source_map(intermediate, os.path.basename(args.input)))
+            print(f"Карта исходного кода сохранена в: {map_path(args.output)}")
+        
         # 8. Режим тестирования (вывод бинарного кода)
         if args.test:
             print("\n=== БИНАРНЫЙ КОД (hex) ===")
@@ -1,8 +1,53 @@
 import re
 
+def _parse_int(text):
+    """Разбирает десятичный операнд либо литерал с префиксом (0b, 0x, 0o)."""
+    try:
+        return int(text)
+    except ValueError:
+        return int(text, 0)
+
+def _parse_directive(directive, operands, line_num):
+    """
+    Разбирает директиву секции данных.
+    
+    .data ADDR v1, v2, ...   - значения с адреса ADDR
+    .fill ADDR COUNT, VALUE  - COUNT ячеек со значением VALUE (по умолчанию 0)
+    
+    Returns:
+        (адрес, список значений)
+    """
+    tokens = [token for token in re.split(r'[\s,]+', operands) if token]
+    try:
+        numbers = [_parse_int(token) for token in tokens]
+    except ValueError:
+        raise ValueError(f"Строка {line_num}: неверный операнд директивы '{directive.lower()}'")
+    
+    if directive == '.DATA':
+        if len(numbers) < 2:
+            raise ValueError(f"Строка {line_num}: '.data' требует адрес и хотя бы одно значение")
+        address, values = numbers[0], numbers[1:]
+    else:
+        if len(numbers) not in (2, 3):
+            raise ValueError(f"Строка {line_num}: '.fill' требует адрес, количество и значение")
+        address, count = numbers[0], numbers[1]
+        if count < 1:
+            raise ValueError(f"Строка {line_num}: количество {count} должно быть положительным")
+        values = [numbers[2] if len(numbers) == 3 else 0] * count
+    
+    if address < 0 or address + len(values) > 16777216:
+        raise ValueError(f"Строка {line_num}: адрес {address} вне диапазона 0-16777215")
+    for value in values:
+        if value < 0 or value > 255:
+            raise ValueError(f"Строка {line_num}: значение {value} вне диапазона 0-255")
+    return address, values
+
 def parse_assembly(source):
     """
     Парсит исходный текст ассемблера в список инструкций.
+    
+    Директивы .data и .fill возвращаются записями с мнемоникой '.DATA',
+    адресом в 'operand' и значениями ячеек в 'values'.
     """
     lines = source.split('\n')
     program = []
@@ -22,6 +67,18 @@ def parse_assembly(source):
         parts = re.split(r'\s+', line, maxsplit=1)
         opcode = parts[0].upper()
         
+        # Директивы секции данных
+        if opcode in ('.DATA', '.FILL'):
+            address, values = _parse_directive(opcode, parts[1] if len(parts) > 1 else '', line_num)
+            program.append({
+                'opcode': '.DATA',
+                'operand': address,
+                'values': values,
+                'line': line_num,
+                'original': line
+            })
+            continue
+        
         # Проверяем поддерживаемые мнемоники
         valid_opcodes = ['LOAD_CONST', 'LOAD_MEM', 'STORE_MEM', 'ROL']
         if opcode not in valid_opcodes:
@@ -34,7 +91,7 @@ def parse_assembly(source):
                 raise ValueError(f"Строка {line_num}: отсутствует операнд для '{opcode}'")
             
             try:
-                operand = int(parts[1].strip())
+                operand = _parse_int(parts[1].strip())
             except ValueError:
                 raise ValueError(f"Строка {line_num}: неверный операнд '{parts[1]}'")
         
@@ -0,0 +1,499 @@
+#!/usr/bin/env python3
+"""
+Исполнитель УВМ с предварительным декодированием (Вариант 5)
+Машинный код декодируется один раз в список операций, после чего цикл
+выполнения не разбирает байты. Частые последовательности команд
+(например, LOAD_MEM / LOAD_CONST / ROL / STORE_MEM) сливаются в
+суперинструкции, выполняемые за одну диспетчеризацию.
+
+Операция - кортеж (вид, x, y, z, смещение первой команды); код
+разбирается за один проход без промежуточных объектов для каждой команды.
+Если быстрый путь операции не применим (выход за границы памяти, пустой
+стек и т.п.), ее команды выполняются по одной по уже декодированным
+операндам с проверками UVMMemory - поэтому ошибки и частичное состояние
+совпадают с эталонным интерпретатором.
+"""
+
+import sys
+from collections import Counter
+from typing import List, Any, Optional, Tuple
+
+from interpreter import UVMMemory, UVMDecoder, UVMExecutor
+
+# Таблица циклического сдвига: ROL_TABLE[значение][сдвиг % 8]
+ROL_TABLE = [[((v << s) | (v >> (8 - s))) & 0xFF for s in range(8)]
+             for v in range(256)]
+
+# Виды операций
+OP_LOAD_CONST = 0
+OP_LOAD_MEM = 1
+OP_STORE_MEM = 2
+OP_ROL = 3
+OP_DECODE_ERROR = 4
+OP_ROL_STORE = 10    # LOAD_MEM a, LOAD_CONST c, ROL, STORE_MEM off
+OP_ROL_MEM = 11      # LOAD_MEM a, LOAD_CONST c, ROL
+OP_CONST_STORE = 12  # LOAD_CONST v, STORE_MEM off
+OP_LOAD_STORE = 13   # LOAD_MEM a, STORE_MEM off
+OP_VECTOR = 20       # Векторизованная серия операций (см. vectorize.py)
+
+_OPCODE_KINDS = {
+    'LOAD_CONST': OP_LOAD_CONST,
+    'LOAD_MEM': OP_LOAD_MEM,
+    'STORE_MEM': OP_STORE_MEM,
+    'ROL': OP_ROL,
+}
+
+# Поддерживаемые суперинструкции: последовательность мнемоник -> вид операции
+SUPERINSTRUCTIONS = {
+    ('LOAD_MEM', 'LOAD_CONST', 'ROL', 'STORE_MEM'): OP_ROL_STORE,
+    ('LOAD_MEM', 'LOAD_CONST', 'ROL'): OP_ROL_MEM,
+    ('LOAD_CONST', 'STORE_MEM'): OP_CONST_STORE,
+    ('LOAD_MEM', 'STORE_MEM'): OP_LOAD_STORE,
+}
+
+DEFAULT_FUSIONS = list(SUPERINSTRUCTIONS)
+
+# Вид команды и ее размер в байтах по полю A (None/0 - не команда)
+_A_KINDS = (None, OP_STORE_MEM, OP_LOAD_CONST, OP_LOAD_MEM, OP_ROL, None, None, None)
+_A_SIZES = (0, 2, 2, 4, 1, 0, 0, 0)
+_KIND_A = {kind: a for a, kind in enumerate(_A_KINDS) if kind is not None}
+
+# Команды операции: (вид, поле операции с операндом, размер команды)
+_COMPONENTS = {
+    OP_LOAD_CONST: ((OP_LOAD_CONST, 1, 2),),
+    OP_LOAD_MEM: ((OP_LOAD_MEM, 1, 4),),
+    OP_STORE_MEM: ((OP_STORE_MEM, 1, 2),),
+    OP_ROL: ((OP_ROL, None, 1),),
+    OP_ROL_STORE: ((OP_LOAD_MEM, 1, 4), (OP_LOAD_CONST, 2, 2), (OP_ROL, None, 1),
+                   (OP_STORE_MEM, 3, 2)),
+    OP_ROL_MEM: ((OP_LOAD_MEM, 1, 4), (OP_LOAD_CONST, 2, 2), (OP_ROL, None, 1)),
+    OP_CONST_STORE: ((OP_LOAD_CONST, 1, 2), (OP_STORE_MEM, 2, 2)),
+    OP_LOAD_STORE: ((OP_LOAD_MEM, 1, 4), (OP_STORE_MEM, 2, 2)),
+}
+
+# Число команд операции; у векторной серии оно в самой операции (поле y)
+_LENGTHS = {kind: len(components) for kind, components in _COMPONENTS.items()}
+_LENGTHS[OP_DECODE_ERROR] = _LENGTHS[OP_VECTOR] = 0
+_MAX_LENGTH = max(_LENGTHS.values())
+
+
+def _operand(code, pc: int):
+    """Операнд B полностью присутствующей команды по смещению pc (у ROL - None)."""
+    byte1 = code[pc]
+    a_value = byte1 >> 5
+    if a_value == 2:
+        return ((byte1 & 0x1F) << 5) | (code[pc + 1] & 0x1F)
+    if a_value == 1:
+        b_value = ((byte1 & 0x1F) << 8) | code[pc + 1]
+        return b_value - 8192 if b_value >= 4096 else b_value
+    if a_value == 3:
+        return (((byte1 & 0x1F) << 19) | (code[pc + 1] << 11) |
+                (code[pc + 2] << 3) | ((code[pc + 3] >> 5) & 0x07))
+    return None
+
+
+def _decode_fast(code) -> Tuple[List[int], List[Any], List[int], Optional[tuple]]:
+    """
+    Декодирование без создания словарей команд.
+
+    Returns:
+        (виды, операнды B, смещения команд и конец кода, ошибка или None)
+    """
+    kinds = []
+    operands = []
+    offsets = []
+    error = None
+    size = len(code)
+    pc = 0
+    while pc < size:
+        byte1 = code[pc]
+        a_value = byte1 >> 5
+        if a_value == 4:
+            kinds.append(OP_ROL)
+            operands.append(None)
+            offsets.append(pc)
+            pc += 1
+        elif a_value == 2 and pc + 1 < size:
+            kinds.append(OP_LOAD_CONST)
+            operands.append(((byte1 & 0x1F) << 5) | (code[pc + 1] & 0x1F))
+            offsets.append(pc)
+            pc += 2
+        elif a_value == 1 and pc + 1 < size:
+            b_value = ((byte1 & 0x1F) << 8) | code[pc + 1]
+            kinds.append(OP_STORE_MEM)
+            operands.append(b_value - 8192 if b_value >= 4096 else b_value)
+            offsets.append(pc)
+            pc += 2
+        elif a_value == 3 and pc + 3 < size:
+            kinds.append(OP_LOAD_MEM)
+            operands.append(((byte1 & 0x1F) << 19) | (code[pc + 1] << 11) |
+                            (code[pc + 2] << 3) | ((code[pc + 3] >> 5) & 0x07))
+            offsets.append(pc)
+            pc += 4
+        else:
+            # Сообщение об ошибке берем у эталонного декодера
+            try:
+                UVMDecoder.decode_at(code, pc)
+            except ValueError as e:
+                error = (str(e), pc)
+            break
+    offsets.append(pc)
+    return kinds, operands, offsets, error
+
+
+def predecode(code: bytes, fusions: Optional[List[Tuple[str, ...]]] = None) -> List[tuple]:
+    """
+    Декодирует машинный код в список операций.
+
+    Args:
+        code: Машинный код программы
+        fusions: Последовательности мнемоник, сливаемые в суперинструкции
+            (по умолчанию все поддерживаемые); пустой список - без слияния
+
+    Returns:
+        Список операций (вид, x, y, z, смещение первой команды); ошибка
+        декодирования - последняя операция (OP_DECODE_ERROR, сообщение,
+        смещение, None, смещение)
+    """
+    if fusions is None:
+        fusions = DEFAULT_FUSIONS
+    # Шаблоны по полям A команд: ключ 1AAABBB... (по 3 бита на команду) -> вид
+    # операции; None - начало более длинного шаблона
+    patterns = {}
+    for pattern in fusions:
+        pattern = tuple(pattern)
+        if pattern not in SUPERINSTRUCTIONS:
+            continue
+        key = 1
+        for mnemonic in pattern:
+            key = key << 3 | _KIND_A[_OPCODE_KINDS[mnemonic]]
+            patterns.setdefault(key, None)
+        patterns[key] = SUPERINSTRUCTIONS[pattern]
+
+    a_kinds = _A_KINDS
+    a_sizes = _A_SIZES
+    ops = []
+    append = ops.append
+    size = len(code)
+    pc = 0
+    while pc < size:
+        a_value = code[pc] >> 5
+        end = pc + a_sizes[a_value]
+        if end == pc or end > size:
+            # Сообщение об ошибке берем у эталонного декодера
+            try:
+                UVMDecoder.decode_at(code, pc)
+            except ValueError as e:
+                append((OP_DECODE_ERROR, str(e), pc, None, pc))
+            break
+
+        # Самая длинная суперинструкция с команды pc: по полям A следующих команд
+        kind = None
+        key = 8 | a_value
+        position = end
+        while key in patterns and position < size:
+            a_next = code[position] >> 5
+            step = a_sizes[a_next]
+            if not step or position + step > size:
+                break
+            key = key << 3 | a_next
+            position += step
+            found = patterns.get(key)
+            if found is not None:
+                kind, end = found, position
+
+        if kind is None:
+            if a_value == 2:
+                # LOAD_CONST - самая частая одиночная команда
+                append((OP_LOAD_CONST, ((code[pc] & 0x1F) << 5) | (code[pc + 1] & 0x1F),
+                        None, None, pc))
+            elif a_value == 4:
+                append((OP_ROL, None, None, None, pc))
+            else:
+                append((a_kinds[a_value], _operand(code, pc), None, None, pc))
+        elif kind == OP_ROL_STORE:
+            # LOAD_MEM pc, LOAD_CONST pc+4, ROL pc+6, STORE_MEM pc+7
+            offset = ((code[pc + 7] & 0x1F) << 8) | code[pc + 8]
+            append((kind, ((code[pc] & 0x1F) << 19) | (code[pc + 1] << 11) |
+                    (code[pc + 2] << 3) | (code[pc + 3] >> 5),
+                    ((code[pc + 4] & 0x1F) << 5) | (code[pc + 5] & 0x1F),
+                    offset - 8192 if offset >= 4096 else offset, pc))
+        elif kind == OP_CONST_STORE:
+            offset = ((code[pc + 2] & 0x1F) << 8) | code[pc + 3]
+            append((kind, ((code[pc] & 0x1F) << 5) | (code[pc + 1] & 0x1F),
+                    offset - 8192 if offset >= 4096 else offset, None, pc))
+        else:
+            # OP_ROL_MEM и OP_LOAD_STORE начинаются с LOAD_MEM
+            append((kind, _operand(code, pc), _operand(code, pc + 4), None, pc))
+        pc = end
+    return ops
+
+
+def record_ngram_profile(codes: List[bytes], max_length=4) -> Counter:
+    """
+    Собирает профиль последовательностей мнемоник (n-грамм).
+
+    Программы УВМ не содержат переходов, поэтому каждая команда выполняется
+    ровно один раз и статический подсчет совпадает с профилем выполнения.
+    """
+    profile = Counter()
+    for code in codes:
+        opcodes = [i['opcode'] for i in UVMDecoder.decode_program(code)]
+        for length in range(2, max_length + 1):
+            for start in range(len(opcodes) - length + 1):
+                profile[tuple(opcodes[start:start + length])] += 1
+    return profile
+
+
+def select_fusions(profile: Counter, min_count=1) -> List[Tuple[str, ...]]:
+    """
+    Выбирает суперинструкции по профилю n-грамм.
+
+    Возвращает поддерживаемые шаблоны, встретившиеся не реже min_count раз,
+    упорядоченные по числу сэкономленных диспетчеризаций.
+    """
+    candidates = [(profile[p] * (len(p) - 1), p) for p in SUPERINSTRUCTIONS
+                  if profile.get(p, 0) >= min_count]
+    candidates.sort(key=lambda item: item[0], reverse=True)
+    return [p for _, p in candidates]
+
+
+class PredecodedExecutor:
+    """Исполнитель предварительно декодированной программы."""
+
+    def __init__(self, memory: UVMMemory, fusions: Optional[List[Tuple[str, ...]]] = None,
+                 ops: Optional[List[tuple]] = None):
+        self.memory = memory
+        self.running = True
+        self.instruction_count = 0
+        self.error = None
+        self.ops = ops if ops is not None else predecode(memory.code, fusions)
+        # Индекс текущей операции; при ненулевом pc определяется в run()
+        self.index = None if memory.pc else 0
+        self._reference = UVMExecutor(memory)
+
+    def _seek(self, limit=sys.maxsize):
+        """
+        Находит операцию, начинающуюся с текущего pc.
+
+        Если pc внутри слитой операции или серии (например, состояние
+        сохранено эталонным исполнителем или прошлый run остановился внутри
+        операции), команды до начала следующей операции выполняются
+        эталонным исполнителем, но не дальше limit команд; если граница
+        достигнута раньше, index остается None.
+        """
+        memory = self.memory
+        starts = {}
+        for index, op in enumerate(self.ops):
+            # Векторная операция и первая операция ее серии начинаются с одного pc
+            starts.setdefault(op[4], index)
+        while memory.pc < len(memory.code) and memory.pc not in starts:
+            if self.instruction_count >= limit:
+                return
+            try:
+                instruction = UVMDecoder.decode_instruction(memory)
+                self.instruction_count += 1
+                self._reference.execute(instruction)
+            except Exception as e:
+                self.error = e
+                self.running = False
+                break
+        self.index = starts.get(memory.pc, len(self.ops))
+
+    def _slow(self, op: tuple, stop: Optional[int] = None) -> int:
+        """
+        Выполняет команды операции по одной по декодированным операндам.
+
+        Чтение, запись и снятие со стека идут через UVMMemory, поэтому
+        ошибки совпадают с эталонным исполнителем; при ошибке pc указывает
+        за вызвавшую ее команду.
+
+        Args:
+            stop: Выполнить только первые stop команд операции; pc
+                указывает за последнюю из них
+
+        Returns:
+            Число выполненных команд (с командой, вызвавшей ошибку)
+        """
+        memory = self.memory
+        stack = memory.stack
+        pc = op[4]
+        executed = 0
+        for kind, field, size in _COMPONENTS[op[0]][:stop]:
+            pc += size
+            executed += 1
+            try:
+                if kind == OP_LOAD_CONST:
+                    memory.push(op[field])
+                elif kind == OP_LOAD_MEM:
+                    memory.push(memory.read_data(op[field]))
+                elif kind == OP_STORE_MEM:
+                    if not stack:
+                        raise RuntimeError("STORE_MEM: стек пуст")
+                    value = memory.pop()
+                    memory.write_data(value + op[field], value)
+                else:
+                    if len(stack) < 2:
+                        raise RuntimeError("ROL: недостаточно значений на стеке")
+                    address = memory.pop()
+                    value = memory.pop()
+                    memory.push(ROL_TABLE[value & 0xFF][memory.read_data(address) & 7])
+            except Exception as e:
+                self.error = e
+                self.running = False
+                memory.pc = pc
+                break
+        else:
+            if stop is not None:
+                memory.pc = pc
+        return executed
+
+    def run(self, max_instructions: Optional[int] = None):
+        """
+        Основной цикл выполнения программы.
+
+        Args:
+            max_instructions: Остановиться, выполнив ровно столько команд
+                (всего). Серия, не помещающаяся до границы, выполняется
+                суперинструкциями, а слитая операция на границе - по одной
+                команде до нее; повторный вызов run продолжает выполнение
+        """
+        limit = sys.maxsize if max_instructions is None else max_instructions
+        if self.index is None:
+            self._seek(limit)
+            if self.index is None:
+                return
+        memory = self.memory
+        data = memory.data
+        dirty = memory.dirty
+        mark = dirty.add
+        stack = memory.stack
+        push = stack.append
+        pop = stack.pop
+        size = len(data)
+        table = ROL_TABLE
+        slow = self._slow
+        ops = self.ops
+        total = len(ops)
+        lengths = _LENGTHS
+        count = self.instruction_count
+        index = self.index
+        # До edge любая слитая операция помещается до границы целиком
+        edge = limit - _MAX_LENGTH
+
+        while self.running and index < total:
+            if count > edge:
+                if count >= limit:
+                    # Остановка между операциями: pc - начало следующей операции
+                    memory.pc = ops[index][4]
+                    break
+                if count + lengths[ops[index][0]] > limit:
+                    # Операция на границе: ее первые команды по одной, остальные
+                    # выполнит _seek при следующем вызове run
+                    count += slow(ops[index], limit - count)
+                    index = None
+                    break
+            kind, x, y, z, start = ops[index]
+
+            if kind == OP_ROL_STORE:
+                if x < size and y < size:
+                    value = table[data[x]][data[y] & 7]
+                    address = value + z
+                    if 0 <= address < size:
+                        data[address] = value
+                        mark(address)
+                        count += 4
+                        index += 1
+                        continue
+
+            elif kind == OP_CONST_STORE:
+                address = x + y
+                if x <= 255 and 0 <= address < size:
+                    data[address] = x
+                    mark(address)
+                    count += 2
+                    index += 1
+                    continue
+
+            elif kind == OP_LOAD_CONST:
+                push(x)
+                count += 1
+                index += 1
+                continue
+
+            elif kind == OP_LOAD_MEM:
+                if x < size:
+                    push(data[x])
+                    count += 1
+                    index += 1
+                    continue
+
+            elif kind == OP_STORE_MEM:
+                if stack:
+                    value = stack[-1]
+                    address = value + x
+                    if 0 <= value <= 255 and 0 <= address < size:
+                        pop()
+                        data[address] = value
+                        mark(address)
+                        count += 1
+                        index += 1
+                        continue
+
+            elif kind == OP_ROL:
+                if len(stack) >= 2:
+                    address = stack[-1]
+                    if 0 <= address < size:
+                        pop()
+                        push(table[pop() & 0xFF][data[address] & 7])
+                        count += 1
+                        index += 1
+                        continue
+
+            elif kind == OP_ROL_MEM:
+                if x < size and y < size:
+                    push(table[data[x]][data[y] & 7])
+                    count += 3
+                    index += 1
+                    continue
+
+            elif kind == OP_LOAD_STORE:
+                if x < size:
+                    value = data[x]
+                    address = value + y
+                    if 0 <= address < size:
+                        data[address] = value
+                        mark(address)
+                        count += 2
+                        index += 1
+                        continue
+
+            elif kind == OP_VECTOR:
+                # x - серия с методом execute, y - число команд, z - число
+                # следующих за этой операцией суперинструкций серии
+                if count + y <= limit and x.execute(data, size, dirty):
+                    count += y
+                    index += 1 + z
+                else:
+                    # Серия не помещается до границы или ее проверка не прошла:
+                    # выполняются ее суперинструкции
+                    index += 1
+                continue
+
+            elif kind == OP_DECODE_ERROR:
+                # Команда не декодирована: счетчик не увеличивается, pc на ее начале
+                self.error = ValueError(x)
+                self.running = False
+                memory.pc = y
+                break
+
+            # Медленный путь: команды операции по одной
+            count += slow(ops[index])
+            if not self.running:
+                break
+            index += 1
+
+        if self.running and index is not None and index >= total:
+            memory.pc = len(memory.code)
+        self.instruction_count = count
+        self.index = index
@@ -0,0 +1,139 @@
+"""
+Профилировщик программ УВМ по строкам исходного текста (Вариант 5)
+Исполнитель запускается порциями по every команд (run(max_instructions)).
+В программах нет переходов, поэтому порция - это команды между прежним и
+новым pc; они переводятся в строки исходного текста через карту
+(sourcemap.py), каждой засчитывается выполнение и равная доля времени
+порции. Число выполнений точное при любом every, время - с точностью до
+порции: при every=1 исполнитель reference измеряет каждую команду, а
+быстрые исполнители останавливаются только между слитыми сериями.
+
+Результат - отчет, отсортированный по времени, и файл свернутых стеков
+("кадр;кадр значение" в строке), который принимают flamegraph.pl,
+speedscope и inferno.
+
+    profiler = Profiler(source_map, every=1000)
+    profiler.run(get_engine('predecoded')(memory), memory)
+    print(profiler.report(source_text.split('\\n')))
+"""
+
+import time
+from typing import Dict, Any, List, Optional
+
+from sourcemap import SourceMap
+
+
+class Profiler:
+    """Профиль выполнения по строкам исходного текста с выборкой каждые every команд."""
+
+    def __init__(self, source_map: Optional[SourceMap] = None, every=1000):
+        """
+        Args:
+            source_map: Карта исходного кода; без нее профиль строится по
+                смещениям команд
+            every: Интервал выборки в командах
+        """
+        if every <= 0:
+            raise ValueError(f"Интервал выборки должен быть положительным: {every}")
+        self.source_map = source_map
+        self.every = every
+        self.samples = 0
+        self.counts: Dict[int, int] = {}     # Строка (или смещение) -> выполнений
+        self.times: Dict[int, float] = {}    # Строка (или смещение) -> наносекунд
+
+    def _lines(self, code) -> SourceMap:
+        """Карта для профиля: заданная или 'строка = смещение команды'."""
+        if self.source_map is not None:
+            return self.source_map
+        from interpreter import UVMDecoder
+        offsets = []
+        pc = 0
+        while pc < len(code):
+            offsets.append(pc)
+            try:
+                pc += UVMDecoder.decode_at(code, pc)['size']
+            except ValueError:
+                break
+        return SourceMap(offsets, offsets)
+
+    def run(self, executor, memory):
+        """
+        Выполняет программу исполнителем, снимая выборку каждые every команд.
+
+        Исполнитель должен поддерживать run(max_instructions).
+        """
+        lines = self._lines(memory.code)
+        counts, times = self.counts, self.times
+        clock = time.perf_counter_ns
+        while executor.running and memory.pc < len(memory.code):
+            before, start = executor.instruction_count, memory.pc
+            started = clock()
+            executor.run(max_instructions=before + self.every)
+            elapsed = clock() - started
+            if executor.instruction_count == before and executor.running:
+                break
+            self.samples += 1
+            # Переходов нет: выполнены ровно команды между прежним и новым pc
+            first, last = lines.index_of(start), lines.index_of(memory.pc - 1)
+            if first is None or last is None or last < first:
+                continue
+            share = elapsed / (last - first + 1)
+            for index in range(first, last + 1):
+                key = lines.lines[index]
+                counts[key] = counts.get(key, 0) + 1
+                times[key] = times.get(key, 0) + share
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """Строки профиля по убыванию времени."""
+        total = sum(self.times.values()) or 1
+        rows = [{'key': key, 'instructions': self.counts[key], 'ns': self.times[key],
+                 'percent': 100.0 * self.times[key] / total} for key in self.times]
+        rows.sort(key=lambda row: (-row['ns'], row['key']))
+        return rows
+
+    def _label(self, key: int, source_lines: Optional[List[str]]) -> str:
+        if self.source_map is None:
+            return f"смещение {key}"
+        text = ''
+        if source_lines is not None and 0 < key <= len(source_lines):
+            text = source_lines[key - 1].split(';', 1)[0].strip()
+        return f"{key}: {text}" if text else f"строка {key}"
+
+    def report(self, source_lines: Optional[List[str]] = None, top=20) -> str:
+        """Текстовый отчет: самые затратные строки первыми."""
+        rows = self.rows()
+        lines = [f"Выборок: {self.samples}, интервал {self.every} команд, "
+                 f"команд: {sum(self.counts.values())}, "
+                 f"время: {sum(self.times.values()) / 1e6:.3f} мс",
+                 f"{'%':>6} {'мс':>10} {'команд':>10}  строка"]
+        for row in rows[:top]:
+            lines.append(f"{row['percent']:6.2f} {row['ns'] / 1e6:10.3f} {row['instructions']:>10}  "
+                         f"{self._label(row['key'], source_lines)}")
+        if len(rows) > top:
+            lines.append(f"... еще строк: {len(rows) - top}")
+        return '\n'.join(lines)
+
+    def collapsed(self, source_lines: Optional[List[str]] = None, weight='ns') -> str:
+        """
+        Свернутые стеки для flamegraph: 'программа;строка значение'.
+
+        Args:
+            weight: 'ns' - время в наносекундах, 'instructions' - число команд
+        """
+        values = self.times if weight == 'ns' else self.counts
+        root = (self.source_map.source if self.source_map is not None and self.source_map.source
+                else 'program')
+        lines = []
+        for key in sorted(values):
+            frame = self._label(key, source_lines).replace(';', ',')
+            lines.append(f"{root};{frame} {round(values[key])}")
+        return '\n'.join(lines) + '\n' if lines else ''
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'samples': self.samples,
+            'every': self.every,
+            'instructions': sum(self.counts.values()),
+            'ns': round(sum(self.times.values())),
+            'rows': len(self.times)
+        }
@@ -0,0 +1,338 @@
+"""
+Запись и воспроизведение выполнения УВМ (Вариант 5)
+Запись - журнал записей в память данных (номер команды, адрес, значение)
+и итоговое состояние (число команд, pc, стек, ошибка, хеш памяти),
+привязанный к SHA-256 программы, смещению начальной команды и хешу
+начального образа памяти. Каждые every команд в журнал попадает отметка -
+pc и стек после команды. Воспроизведение применяет записи к памяти с той
+же программой, начальной командой и начальным образом без декодирования
+и выполнения команд; состояние после команды N (память, стек и pc)
+восстанавливается от ближайшей отметки не позже N и выполнением не больше
+every команд.
+
+Формат журнала:
+    b'UVMR', версия (1 байт), SHA-256 программы, начального образа и
+    итоговой памяти (по 32 байта), затем varint: размер памяти, смещение
+    начальной команды, интервал отметок, число команд, pc, длина и текст
+    ошибки (UTF-8), глубина стека и значения (zigzag), число событий и
+    события (приращение номера команды, приращение адреса в zigzag,
+    значение - 1 байт), число отметок и отметки (pc, глубина стека и
+    значения); в конце CRC32 всего предыдущего.
+Последовательные записи соседних ячеек дают события по 3 байта.
+"""
+
+import zlib
+import struct
+import hashlib
+from array import array
+from typing import Dict, Any, List, Optional
+
+from interpreter import UVMExecutor
+
+MAGIC = b'UVMR'
+VERSION = 3
+SUFFIX = '.uvmr'
+MARK_EVERY = 1024
+
+_CRC = struct.Struct('<I')
+
+
+def _put_varint(out: bytearray, value: int):
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _get_varint(raw, position: int):
+    value = shift = 0
+    while True:
+        byte = raw[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+
+def _zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -(value >> 1) - 1
+
+
+def _put_stack(out: bytearray, stack):
+    _put_varint(out, len(stack))
+    for value in stack:
+        _put_varint(out, _zigzag(value))
+
+
+def _get_stack(raw, position: int):
+    depth, position = _get_varint(raw, position)
+    stack = []
+    for _ in range(depth):
+        value, position = _get_varint(raw, position)
+        stack.append(_unzigzag(value))
+    return stack, position
+
+
+def state_digest(memory) -> bytes:
+    """SHA-256 содержимого памяти данных (ненулевые ячейки)."""
+    digest = hashlib.sha256()
+    for address, value in memory.nonzero(0, len(memory.data) - 1):
+        digest.update(struct.pack('<IB', address, value))
+    return digest.digest()
+
+
+class RecordingExecutor(UVMExecutor):
+    """
+    Исполнитель reference, записывающий каждую запись в память данных и
+    каждые every команд - pc и стек.
+    """
+
+    def __init__(self, memory, every=MARK_EVERY):
+        if every <= 0:
+            raise ValueError(f"Интервал отметок должен быть положительным: {every}")
+        super().__init__(memory)
+        self.every = every
+        self.instructions = array('Q')   # Номер команды (с 1), выполнившей запись
+        self.addresses = array('I')
+        self.values = bytearray()
+        self.marks = []                  # (pc, стек) после команд every, 2 * every, ...
+
+    def execute(self, instruction: Dict[str, Any]):
+        # Пишет только STORE_MEM - по адресу вершина стека + B; при ошибке
+        # write_data не изменяет память
+        stack = self.memory.stack
+        address = None
+        if instruction['opcode'] == 'STORE_MEM' and stack:
+            address = stack[-1] + instruction['B']
+        super().execute(instruction)
+        if address is not None:
+            self.instructions.append(self.instruction_count)
+            self.addresses.append(address)
+            self.values.append(self.memory.data[address])
+        if not self.instruction_count % self.every:
+            self.marks.append((self.memory.pc, tuple(stack)))
+
+
+class Recording:
+    """Журнал выполнения программы."""
+
+    def __init__(self, program_digest: bytes, image_digest: bytes, data_size: int, entry: int,
+                 every: int, instruction_count: int, pc: int, error: str, stack: List[int],
+                 instructions, addresses, values, marks, memory_digest: bytes):
+        self.program_digest = program_digest
+        self.image_digest = image_digest     # state_digest памяти перед первой командой
+        self.data_size = data_size
+        self.entry = entry                   # pc перед первой командой
+        self.every = every                   # Интервал отметок в командах
+        self.instruction_count = instruction_count
+        self.pc = pc
+        self.error = error                   # Текст ошибки или ''
+        self.stack = list(stack)
+        self.instructions = array('Q', instructions)
+        self.addresses = array('I', addresses)
+        self.values = bytes(values)
+        self.marks = [(pc, tuple(stack)) for pc, stack in marks]
+        self.memory_digest = memory_digest
+
+    def __len__(self):
+        return len(self.addresses)
+
+    def to_bytes(self) -> bytes:
+        out = bytearray(MAGIC)
+        out.append(VERSION)
+        out += self.program_digest + self.image_digest + self.memory_digest
+        error = self.error.encode('utf-8')
+        for value in (self.data_size, self.entry, self.every, self.instruction_count, self.pc,
+                      len(error)):
+            _put_varint(out, value)
+        out += error
+        _put_stack(out, self.stack)
+        _put_varint(out, len(self.addresses))
+        instruction = address = 0
+        for number, target, value in zip(self.instructions, self.addresses, self.values):
+            _put_varint(out, number - instruction)
+            _put_varint(out, _zigzag(target - address - 1))
+            out.append(value)
+            instruction, address = number, target
+        _put_varint(out, len(self.marks))
+        for pc, stack in self.marks:
+            _put_varint(out, pc)
+            _put_stack(out, stack)
+        out += _CRC.pack(zlib.crc32(out))
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, raw) -> 'Recording':
+        """Разбирает журнал; поврежденный - ValueError."""
+        raw = bytes(raw)
+        if len(raw) < 4 + 1 + 96 + _CRC.size or raw[:4] != MAGIC:
+            raise ValueError("Не журнал выполнения УВМ")
+        if zlib.crc32(raw[:-_CRC.size]) != _CRC.unpack(raw[-_CRC.size:])[0]:
+            raise ValueError("Контрольная сумма журнала не совпадает")
+        if raw[4] != VERSION:
+            raise ValueError(f"Неподдерживаемая версия журнала: {raw[4]}")
+        program_digest, image_digest, memory_digest = raw[5:37], raw[37:69], raw[69:101]
+        position = 101
+        fields = []
+        for _ in range(6):
+            value, position = _get_varint(raw, position)
+            fields.append(value)
+        data_size, entry, every, instruction_count, pc, error_length = fields
+        error = raw[position:position + error_length].decode('utf-8')
+        position += error_length
+        stack, position = _get_stack(raw, position)
+        count, position = _get_varint(raw, position)
+        instructions, addresses, values = array('Q'), array('I'), bytearray()
+        instruction = address = 0
+        for _ in range(count):
+            delta, position = _get_varint(raw, position)
+            step, position = _get_varint(raw, position)
+            instruction += delta
+            address += _unzigzag(step) + 1
+            instructions.append(instruction)
+            addresses.append(address)
+            values.append(raw[position])
+            position += 1
+        count, position = _get_varint(raw, position)
+        marks = []
+        for _ in range(count):
+            mark_pc, position = _get_varint(raw, position)
+            mark_stack, position = _get_stack(raw, position)
+            marks.append((mark_pc, mark_stack))
+        if position != len(raw) - _CRC.size or not every:
+            raise ValueError("Журнал выполнения поврежден")
+        return cls(program_digest, image_digest, data_size, entry, every, instruction_count, pc,
+                   error, stack, instructions, addresses, values, marks, memory_digest)
+
+    def replay(self, memory, at: Optional[int] = None) -> bool:
+        """
+        Применяет записи журнала к памяти с загруженной программой.
+
+        Args:
+            memory: UVMMemory в начальном состоянии (та же программа, pc на
+                начальной команде и тот же образ)
+            at: Восстановить состояние после команды с этим номером; None -
+                итоговое состояние
+
+        Returns:
+            True, если восстановлено итоговое состояние; для промежуточного
+            память данных, стек и pc восстанавливаются до ближайшей отметки,
+            а остальные команды (меньше every) выполняет UVMExecutor
+
+        Raises:
+            ValueError: Отрицательный at; журнал относится к другой программе,
+                начальной команде, размеру памяти или начальному образу
+        """
+        if at is not None and at < 0:
+            raise ValueError(f"Номер команды не может быть отрицательным: {at}")
+        if hashlib.sha256(memory.program_bytes()).digest() != self.program_digest:
+            raise ValueError("Журнал записан для другой программы")
+        if memory.pc != self.entry:
+            raise ValueError(f"Журнал записан с начальной команды на смещении {self.entry}, "
+                             f"а pc памяти {memory.pc}")
+        if len(memory.data) != self.data_size:
+            raise ValueError(f"Размер памяти журнала {self.data_size} "
+                             f"не совпадает с размером памяти {len(memory.data)}")
+        if state_digest(memory) != self.image_digest:
+            raise ValueError("Журнал записан для другого начального образа памяти")
+        final = at is None or at >= self.instruction_count
+        count = len(self.addresses)
+        if final:
+            position, pc, stack = self.instruction_count, self.pc, self.stack
+        else:
+            from bisect import bisect_right
+            mark = min(at // self.every, len(self.marks))
+            position = mark * self.every
+            pc, stack = self.marks[mark - 1] if mark else (self.entry, ())
+            count = bisect_right(self.instructions, position)
+        # Каждой ячейке достаточно последнего значения
+        last = dict(zip(self.addresses[:count], self.values[:count]))
+        data = memory.data
+        for address, value in last.items():
+            data[address] = value
+        memory.dirty.update(last)
+        memory.stack[:] = stack
+        memory.pc = pc
+        if not final and position < at:
+            executor = UVMExecutor(memory)
+            executor.instruction_count = position
+            executor.run(max_instructions=at)
+        return final
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'instructions': self.instruction_count,
+            'writes': len(self.addresses),
+            'bytes': len(self.to_bytes()),
+            'error': self.error
+        }
+
+
+def record(memory, every=MARK_EVERY) -> Recording:
+    """
+    Выполняет программу из памяти исполнителем reference и записывает журнал.
+
+    Args:
+        every: Интервал отметок pc и стека; меньший ускоряет replay(at=N),
+            но каждая отметка хранит стек целиком
+    """
+    entry = memory.pc
+    image = state_digest(memory)
+    executor = RecordingExecutor(memory, every)
+    executor.run()
+    return Recording(hashlib.sha256(memory.program_bytes()).digest(), image, len(memory.data),
+                     entry, every, executor.instruction_count, memory.pc,
+                     '' if executor.error is None else str(executor.error),
+                     memory.stack, executor.instructions, executor.addresses, executor.values,
+                     executor.marks, state_digest(memory))
+
+
+def compare(recording: Recording, memory, instruction_count: int, error) -> List[str]:
+    """
+    Расхождения итогового состояния выполнения с журналом.
+
+    Args:
+        memory: Память после выполнения (или воспроизведения)
+        instruction_count: Число выполненных команд
+        error: Ошибка выполнения или None
+
+    Returns:
+        Список описаний расхождений; пустой - состояние совпадает
+    """
+    problems = []
+    if instruction_count != recording.instruction_count:
+        problems.append(f"число команд {instruction_count}, в журнале {recording.instruction_count}")
+    if memory.pc != recording.pc:
+        problems.append(f"pc {memory.pc}, в журнале {recording.pc}")
+    text = '' if error is None else str(error)
+    if text != recording.error:
+        problems.append(f"ошибка {text!r}, в журнале {recording.error!r}")
+    if memory.stack != recording.stack:
+        problems.append(f"стек {memory.stack}, в журнале {recording.stack}")
+    if state_digest(memory) != recording.memory_digest:
+        problems.append("память данных отличается от записанной")
+    return problems
+
+
+def first_divergence(expected: Recording, actual: Recording) -> Optional[int]:
+    """Номер команды, на которой записи в память двух журналов впервые расходятся."""
+    pairs = zip(expected.instructions, expected.addresses, expected.values,
+                actual.instructions, actual.addresses, actual.values)
+    for a_number, a_address, a_value, b_number, b_address, b_value in pairs:
+        if (a_number, a_address, a_value) != (b_number, b_address, b_value):
+            return min(a_number, b_number)
+    if len(expected) != len(actual):
+        shorter = expected if len(expected) < len(actual) else actual
+        longer = actual if shorter is expected else expected
+        return longer.instructions[len(shorter)]
+    return None
+
+
+def load_recording(path: str) -> Recording:
+    with open(path, 'rb') as f:
+        return Recording.from_bytes(f.read())
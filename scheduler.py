@@ -0,0 +1,172 @@
+"""
+Планировщик нескольких УВМ в одном процессе (Вариант 5)
+Виртуальные машины выполняются по кругу порциями команд: каждая получает
+budget * priority команд (run(max_instructions)), после чего управление
+переходит к следующей. Исполнители хранят положение в себе (у predecoded -
+индекс операции), поэтому переключение - это вызов run другого
+исполнителя без копирования состояния.
+
+Исполнители останавливаются ровно на границе порции: серия или блок, не
+помещающиеся до нее, выполняются суперинструкциями или по одной команде,
+поэтому ни порция, ни лимит машины не превышаются.
+
+    scheduler = Scheduler(budget=1000)
+    scheduler.add(memory_a, name='a', priority=2)
+    scheduler.add(memory_b, name='b', limit=10_000)
+    for task in scheduler.run():
+        print(task.name, task.status, task.executor.instruction_count)
+"""
+
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional, Callable
+
+# Состояния машины
+READY = 'ready'        # Ожидает порцию
+DONE = 'done'          # Программа выполнена
+ERROR = 'error'        # Остановлена ошибкой выполнения
+LIMIT = 'limit'        # Исчерпан лимит команд машины
+
+
+class VMTask:
+    """Виртуальная машина в планировщике."""
+
+    def __init__(self, name: str, memory, executor, engine: str, priority: int,
+                 limit: Optional[int]):
+        self.name = name
+        self.memory = memory
+        self.executor = executor
+        self.engine = engine
+        self.priority = priority
+        self.limit = limit               # Наибольшее число команд или None
+        self.status = READY
+        self.slices = 0
+        self.added = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    @property
+    def turnaround(self) -> Optional[float]:
+        """Секунд от добавления до завершения."""
+        return None if self.finished is None else self.finished - self.added
+
+    def result(self):
+        """uvm.Result машины."""
+        from uvm import Result
+        return Result(self.memory, self.executor, self.engine)
+
+    def __repr__(self):
+        return (f"VMTask({self.name!r}, {self.status}, "
+                f"instructions={self.executor.instruction_count}, slices={self.slices})")
+
+
+class Scheduler:
+    """Круговой планировщик машин с приоритетами и лимитами команд."""
+
+    def __init__(self, budget=1000, engine='predecoded',
+                 on_finish: Optional[Callable[[VMTask], None]] = None):
+        """
+        Args:
+            budget: Порция команд машины с приоритетом 1
+            engine: Исполнитель по умолчанию (имя из engines.ENGINES)
+            on_finish: Вызывается для каждой завершенной машины; может
+                добавлять новые машины
+        """
+        if budget <= 0:
+            raise ValueError(f"Порция команд должна быть положительной: {budget}")
+        self.budget = budget
+        self.engine = engine
+        self.on_finish = on_finish
+        self._ready: 'deque[VMTask]' = deque()
+        # Завершенные машины не хранятся - только их число по состояниям
+        self.added = 0
+        self.finished = {DONE: 0, ERROR: 0, LIMIT: 0}
+        self.switches = 0
+        self.instructions = 0
+        self.seconds = 0.0
+
+    def add(self, memory, name: Optional[str] = None, priority=1, limit: Optional[int] = None,
+            engine: Optional[str] = None) -> VMTask:
+        """
+        Добавляет машину с загруженной программой.
+
+        Args:
+            priority: Число порций за один круг (целое не меньше 1)
+            limit: Остановить машину после стольких команд (состояние LIMIT)
+        """
+        if priority < 1:
+            raise ValueError(f"Приоритет должен быть не меньше 1: {priority}")
+        if limit is not None and limit < 0:
+            raise ValueError(f"Лимит команд не может быть отрицательным: {limit}")
+        from engines import get_engine
+        engine = engine or self.engine
+        task = VMTask(name or f"vm{self.added}", memory, get_engine(engine)(memory),
+                      engine, priority, limit)
+        self.added += 1
+        self._ready.append(task)
+        return task
+
+    @property
+    def active(self) -> int:
+        """Число машин, ожидающих порцию."""
+        return len(self._ready)
+
+    def _finish(self, task: VMTask, status: str):
+        task.status = status
+        task.finished = time.perf_counter()
+        self.finished[status] += 1
+        if self.on_finish is not None:
+            self.on_finish(task)
+
+    def step(self) -> Optional[VMTask]:
+        """
+        Выполняет одну порцию следующей машины.
+
+        Returns:
+            Машину, получившую порцию, или None, если готовых машин нет
+        """
+        if not self._ready:
+            return None
+        task = self._ready.popleft()
+        executor, memory = task.executor, task.memory
+        before = executor.instruction_count
+        stop = before + self.budget * task.priority
+        if task.limit is not None:
+            stop = min(stop, task.limit)
+        started = time.perf_counter()
+        if before < stop:
+            executor.run(max_instructions=stop)
+        self.seconds += time.perf_counter() - started
+        self.instructions += executor.instruction_count - before
+        self.switches += 1
+        task.slices += 1
+
+        if executor.error is not None:
+            self._finish(task, ERROR)
+        elif not executor.running or memory.pc >= len(memory.code):
+            self._finish(task, DONE)
+        elif task.limit is not None and executor.instruction_count >= task.limit:
+            self._finish(task, LIMIT)
+        else:
+            self._ready.append(task)
+        return task
+
+    def run(self) -> List[VMTask]:
+        """Выполняет машины до завершения всех; возвращает их в порядке завершения."""
+        finished = []
+        while self._ready:
+            task = self.step()
+            if task.status != READY:
+                finished.append(task)
+        return finished
+
+    def stats(self) -> Dict[str, Any]:
+        """Сводка: машины по состояниям, переключения, команды и скорость."""
+        return {
+            'vms': self.added,
+            READY: len(self._ready),
+            **self.finished,
+            'switches': self.switches,
+            'instructions': self.instructions,
+            'seconds': self.seconds,
+            'ips': self.instructions / self.seconds if self.seconds else 0.0
+        }
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Обратный срез программ УВМ (Вариант 5)
+Вычисляет по декодированной программе подмножество команд, которые могут
+повлиять на ячейки памяти из заданного диапазона или на итоговый стек.
+Остальные команды можно не выполнять: срез дает тот же дамп диапазона и стек.
+"""
+
+from typing import List, Dict, Any, Optional
+
+from interpreter import UVMDecoder
+
+# Значения, читаемые из памяти и получаемые ROL, всегда в диапазоне 0-255
+_BYTE_RANGE = (0, 255)
+
+# Размер корзины для индексации записей по неточному адресу
+_BUCKET_BITS = 8
+
+
+class _MemoryModel:
+    """Последние записи в память с точным или интервальным адресом."""
+
+    def __init__(self):
+        self.exact = {}      # Адрес -> индекс последней точной записи
+        self.imprecise = {}  # Корзина -> [(индекс, lo, hi)] записей по интервалу
+
+    def store(self, index: int, lo: int, hi: int):
+        if lo == hi:
+            self.exact[lo] = index
+            return
+        for bucket in range(lo >> _BUCKET_BITS, (hi >> _BUCKET_BITS) + 1):
+            self.imprecise.setdefault(bucket, []).append((index, lo, hi))
+
+    def readers_deps(self, lo: int, hi: int) -> List[int]:
+        """Записи, от которых может зависеть чтение интервала [lo, hi]."""
+        deps = set()
+        if lo == hi:
+            last = self.exact.get(lo, -1)
+            if last >= 0:
+                deps.add(last)
+        else:
+            last = -1
+            for address in range(lo, hi + 1):
+                index = self.exact.get(address)
+                if index is not None:
+                    deps.add(index)
+
+        for bucket in range(lo >> _BUCKET_BITS, (hi >> _BUCKET_BITS) + 1):
+            for index, store_lo, store_hi in self.imprecise.get(bucket, ()):
+                # Точная запись после интервальной перекрывает ее
+                if index > last and store_lo <= hi and lo <= store_hi:
+                    deps.add(index)
+        return sorted(deps)
+
+
+def compute_slice(program: List[Dict[str, Any]], start: int, end: int,
+                  data_size=65536) -> Optional[List[int]]:
+    """
+    Вычисляет обратный срез программы.
+
+    Args:
+        program: Декодированная программа (UVMDecoder.decode_program)
+        start: Начальный адрес интересующего диапазона памяти
+        end: Конечный адрес диапазона (включительно)
+        data_size: Размер памяти данных
+
+    Returns:
+        Отсортированные индексы команд среза или None, если какая-либо
+        команда может завершиться ошибкой (тогда срез не эквивалентен
+        полной программе и ее нужно выполнить целиком)
+    """
+    stack = []  # (индекс команды-источника, lo, hi)
+    memory = _MemoryModel()
+    deps = []
+
+    for index, instr in enumerate(program):
+        opcode = instr['opcode']
+        b_value = instr['B']
+
+        if opcode == 'LOAD_CONST':
+            deps.append(())
+            stack.append((index, b_value, b_value))
+
+        elif opcode == 'LOAD_MEM':
+            if b_value >= data_size:
+                return None
+            deps.append(tuple(memory.readers_deps(b_value, b_value)))
+            stack.append((index,) + _BYTE_RANGE)
+
+        elif opcode == 'STORE_MEM':
+            if not stack:
+                return None
+            source, lo, hi = stack.pop()
+            if hi > 255 or lo + b_value < 0 or hi + b_value >= data_size:
+                return None
+            deps.append((source,))
+            memory.store(index, lo + b_value, hi + b_value)
+
+        elif opcode == 'ROL':
+            if len(stack) < 2:
+                return None
+            address_source, lo, hi = stack.pop()
+            value_source = stack.pop()[0]
+            if lo < 0 or hi >= data_size:
+                return None
+            deps.append((address_source, value_source) + tuple(memory.readers_deps(lo, hi)))
+            stack.append((index,) + _BYTE_RANGE)
+
+        else:
+            return None
+
+    # Корни: записи, видимые в диапазоне дампа, и источники итогового стека
+    roots = set(source for source, _, _ in stack)
+    if start <= end:
+        roots.update(memory.readers_deps(max(start, 0), min(end, data_size - 1)))
+
+    relevant = set()
+    pending = list(roots)
+    while pending:
+        index = pending.pop()
+        if index in relevant:
+            continue
+        relevant.add(index)
+        pending.extend(deps[index])
+
+    return sorted(relevant)
+
+
+def slice_code(code: bytes, start: int, end: int, data_size=65536) -> Optional[bytes]:
+    """
+    Строит машинный код среза для диапазона памяти [start, end].
+
+    Returns:
+        Машинный код, составленный из команд среза в исходном порядке,
+        или None, если программу нужно выполнять целиком
+    """
+    try:
+        program = UVMDecoder.decode_program(code)
+    except ValueError:
+        return None
+
+    indices = compute_slice(program, start, end, data_size)
+    if indices is None:
+        return None
+
+    sliced = bytearray()
+    for index in indices:
+        instr = program[index]
+        sliced += code[instr['offset']:instr['offset'] + instr['size']]
+    return bytes(sliced)
@@ -0,0 +1,160 @@
+"""
+Карты исходного кода УВМ (Вариант 5)
+Сопоставляют смещения команд в машинном коде строкам исходного .asm.
+Карта - два отсортированных массива (смещения начала команд и номера
+строк), поиск строки по pc - двоичный поиск за O(log n), без повторного
+ассемблирования.
+
+Смещения отсчитываются от начала кода (как memory.pc), секция данных не
+учитывается. Формат файла (little-endian):
+    b'UVMS', версия (1 байт), длина имени исходного файла (2 байта), имя
+    (UTF-8), число команд (4 байта), смещения и номера строк (по 4 байта).
+Карта записывается рядом с машинным кодом: <файл>.map, либо секцией SMAP
+контейнера (container.py).
+"""
+
+import os
+import sys
+import struct
+from array import array
+from bisect import bisect_right
+from typing import List, Dict, Any, Optional
+
+MAGIC = b'UVMS'
+VERSION = 1
+SUFFIX = '.map'
+
+_HEADER = struct.Struct('<4sBH')
+_COUNT = struct.Struct('<I')
+
+
+class SourceMap:
+    """Соответствие смещений команд строкам исходного текста."""
+
+    def __init__(self, offsets, lines, source: str = ''):
+        """
+        Args:
+            offsets: Смещения начала команд по возрастанию
+            lines: Номера строк исходного текста для каждой команды
+            source: Имя исходного файла
+        """
+        if len(offsets) != len(lines):
+            raise ValueError("Число смещений и строк карты исходного кода не совпадает")
+        self.offsets = array('I', offsets)
+        self.lines = array('I', lines)
+        self.source = source
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def index_of(self, offset: int) -> Optional[int]:
+        """Номер команды, содержащей байт offset, или None."""
+        if offset < 0:
+            return None
+        index = bisect_right(self.offsets, offset) - 1
+        return index if index >= 0 else None
+
+    def lookup(self, offset: int) -> Optional[int]:
+        """Номер строки команды, содержащей байт offset, или None."""
+        index = self.index_of(offset)
+        return None if index is None else self.lines[index]
+
+    def location(self, offset: int) -> str:
+        """Место в исходном тексте для сообщений: 'файл:строка'."""
+        line = self.lookup(offset)
+        if line is None:
+            return f"смещение {offset}"
+        return f"{self.source}:{line}" if self.source else f"строка {line}"
+
+    def to_bytes(self) -> bytes:
+        name = self.source.encode('utf-8')
+        offsets, lines = array('I', self.offsets), array('I', self.lines)
+        if sys.byteorder == 'big':
+            offsets.byteswap()
+            lines.byteswap()
+        return b''.join([_HEADER.pack(MAGIC, VERSION, len(name)), name,
+                         _COUNT.pack(len(offsets)), offsets.tobytes(), lines.tobytes()])
+
+    @classmethod
+    def from_bytes(cls, raw) -> 'SourceMap':
+        """Разбирает карту; поврежденная карта - ValueError."""
+        raw = bytes(raw)
+        if len(raw) < _HEADER.size + _COUNT.size or raw[:4] != MAGIC:
+            raise ValueError("Не карта исходного кода УВМ")
+        _, version, name_length = _HEADER.unpack_from(raw)
+        if version != VERSION:
+            raise ValueError(f"Неподдерживаемая версия карты исходного кода: {version}")
+        position = _HEADER.size + name_length
+        source = raw[_HEADER.size:position].decode('utf-8')
+        (count,) = _COUNT.unpack_from(raw, position)
+        position += _COUNT.size
+        if len(raw) != position + 8 * count:
+            raise ValueError("Карта исходного кода обрезана")
+        offsets, lines = array('I'), array('I')
+        offsets.frombytes(raw[position:position + 4 * count])
+        lines.frombytes(raw[position + 4 * count:])
+        if sys.byteorder == 'big':
+            offsets.byteswap()
+            lines.byteswap()
+        return cls(offsets, lines, source)
+
+
+def error_offset(pc: int, error: BaseException) -> int:
+    """
+    Смещение команды, на которой произошла ошибка.
+
+    Ошибка декодирования (ValueError) оставляет pc на начале команды,
+    ошибка выполнения - за командой.
+    """
+    return pc if isinstance(error, ValueError) else max(pc - 1, 0)
+
+
+def build_source_map(intermediate: List[Dict[str, Any]], source: str = '') -> SourceMap:
+    """
+    Карта для промежуточного представления (encode_to_intermediate).
+
+    Смещения вычисляются по размерам команд так же, как их раскладывает
+    encode_to_binary; директивы .data/.fill в коде места не занимают.
+    """
+    offsets, lines = array('I'), array('I')
+    offset = 0
+    for instr in intermediate:
+        if instr['opcode'] == '.DATA':
+            continue
+        offsets.append(offset)
+        lines.append(instr['line'])
+        offset += instr['size']
+    return SourceMap(offsets, lines, source)
+
+
+def map_path(binary_path: str) -> str:
+    """Путь карты рядом с файлом машинного кода."""
+    return binary_path + SUFFIX
+
+
+def write_source_map(path: str, source_map: SourceMap):
+    with open(path, 'wb') as f:
+        f.write(source_map.to_bytes())
+
+
+def load_source_map(path: str) -> SourceMap:
+    with open(path, 'rb') as f:
+        return SourceMap.from_bytes(f.read())
+
+
+def find_source_map(binary_path: str, binary: Optional[bytes] = None) -> Optional[SourceMap]:
+    """
+    Карта программы: секция SMAP контейнера или файл <binary_path>.map.
+
+    Returns:
+        SourceMap или None, если карты нет
+    """
+    if binary is not None and binary[:1] == b'\xff':
+        from container import is_container, read_container
+        raw = read_container(binary)['source_map'] if is_container(binary) else None
+        if raw:
+            return SourceMap.from_bytes(raw)
+    path = map_path(binary_path)
+    if not os.path.exists(path):
+        return None
+    return load_source_map(path)
@@ -0,0 +1,90 @@
+import unittest
+import io
+import sys
+import os
+import tempfile
+import contextlib
+import importlib.util
+from unittest import mock
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import uvm
+import aot
+from interpreter import UVMMemory
+
+SOURCE = "\n".join(["LOAD_MEM 133", "LOAD_CONST 1000", "ROL", "STORE_MEM 7"] * 300 + ["ROL"])
+
+
+def loaded(binary):
+    memory = UVMMemory()
+    memory.write_data(1000, 3)
+    memory.load_code(binary)
+    return memory
+
+
+class TestAot(unittest.TestCase):
+    """Тесты заблаговременной трансляции в кэш модулей."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.directory = self.tmp.name
+        self.binary = uvm.assemble(SOURCE)
+        aot._loaded.clear()
+
+    def test_translate_and_run_from_cache(self):
+        """Модуль и .pyc записываются по хешу; выполнение совпадает с reference."""
+        code = loaded(self.binary).code
+        info = aot.translate(code, self.directory)
+        self.assertFalse(info['cached'])
+        self.assertTrue(os.path.basename(info['path']).startswith('uvm_'))
+        self.assertTrue(os.path.exists(importlib.util.cache_from_source(info['path'])))
+        self.assertTrue(aot.translate(code, self.directory)['cached'])
+
+        memory = loaded(self.binary)
+        executor = aot.AotExecutor(memory, self.directory)
+        self.assertTrue(executor.cached)
+        executor.run()
+        expected = uvm.run(self.binary, initial={1000: 3})
+        self.assertEqual((executor.instruction_count, str(executor.error), memory.stack,
+                          bytes(memory.data)),
+                         (expected.instruction_count, str(expected.error), expected.stack,
+                          bytes(expected.data)))
+
+    def test_missing_and_mismatched_modules(self):
+        """Без модуля кэш не меняется; чужой модуль отвергается."""
+        memory = loaded(self.binary)
+        executor = aot.AotExecutor(memory, self.directory)
+        self.assertFalse(executor.cached)
+        self.assertEqual(os.listdir(self.directory), [])
+
+        other = uvm.assemble("LOAD_CONST 1")
+        source_path = aot.translate(other, self.directory)['path']
+        target = aot.module_path(memory.code, self.directory)
+        os.replace(source_path, target)
+        aot._loaded.clear()
+        with self.assertRaises(ValueError):
+            aot.load(memory.code, self.directory)
+
+    def test_cli(self):
+        """uvm aot заполняет кэш из UVM_AOT_CACHE; --engine aot использует его."""
+        path = os.path.join(self.directory, 'prog.bin')
+        with open(path, 'wb') as f:
+            f.write(uvm.assemble("LOAD_CONST 5\nSTORE_MEM 10\nLOAD_MEM 15"))
+        output = io.StringIO()
+        with mock.patch.dict(os.environ, {aot.ENV_CACHE: os.path.join(self.directory, 'cache')}):
+            with contextlib.redirect_stdout(output):
+                self.assertEqual(uvm.main(['aot', path]), 0)
+                self.assertEqual(uvm.main(['aot', path]), 0)
+                self.assertEqual(uvm.main(['run', path, os.path.join(self.directory, 'out.json'),
+                                           '--engine', 'aot']), 0)
+            modules = [name for name in os.listdir(os.path.join(self.directory, 'cache'))
+                       if name.endswith('.py')]
+        text = output.getvalue()
+        self.assertEqual(len(modules), 1)
+        self.assertIn("уже в кэше", text)
+        self.assertIn("Состояние стека: [5]", text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from parser import parse_assembly
+from encoder import encode_to_intermediate, encode_to_binary
+from interpreter import UVMMemory, UVMExecutor
+from predecode import predecode
+from vectorize import find_vector_runs, MIN_RUN_LENGTH
+from benchmarks.generators import GENERATORS
+from benchmarks.run_benchmarks import (run_suite, compare_results, measure_startup,
+                                      check_startup, UVM_SCRIPT)
+
+
+class TestBenchmarks(unittest.TestCase):
+    """Тесты генераторов нагрузок и сравнения с базовыми результатами."""
+
+    def test_generators_run_without_errors(self):
+        """Все сгенерированные программы выполняются без ошибок."""
+        for name, generator in GENERATORS.items():
+            source = generator(50)
+            binary = encode_to_binary(encode_to_intermediate(parse_assembly(source)))
+            memory = UVMMemory()
+            memory.load_code(binary)
+            executor = UVMExecutor(memory)
+            executor.run()
+            self.assertIsNone(executor.error, name)
+            self.assertEqual(memory.pc, len(binary), name)
+
+    def test_run_suite_structure(self):
+        """Набор бенчмарков содержит все этапы для каждого исполнителя."""
+        results = run_suite([20], ['reference', 'predecoded'], 1, ['vector_rol'])
+        self.assertEqual(results['format'], 'uvm-benchmarks')
+        stages = results['results']['vector_rol_20']
+        self.assertEqual(stages['instructions'], 80)
+        for stage in ('parse', 'encode', 'decode'):
+            self.assertGreater(stages[stage]['seconds'], 0)
+        self.assertEqual(set(stages['execute']), {'reference', 'predecoded'})
+        for engine, metric in stages['run'].items():
+            self.assertLessEqual(metric['seconds'], stages['execute'][engine]['seconds'])
+
+    def test_vector_rol_has_vector_runs(self):
+        """Нагрузка vector_rol целиком состоит из серий не короче MIN_RUN_LENGTH."""
+        size = 4 * MIN_RUN_LENGTH
+        binary = encode_to_binary(encode_to_intermediate(parse_assembly(GENERATORS['vector_rol'](size))))
+        runs = find_vector_runs(predecode(binary))
+        self.assertTrue(runs)
+        self.assertTrue(all(length >= MIN_RUN_LENGTH for _, length, _ in runs))
+        self.assertEqual(sum(length for _, length, _ in runs), size)
+
+    def test_compare_results_flags_regressions(self):
+        """Замедление выше порога отмечается как регрессия."""
+        baseline = run_suite([10], ['reference'], 1, ['store_heavy'])
+        current = {'results': {'store_heavy_10': dict(baseline['results']['store_heavy_10'])}}
+        stages = current['results']['store_heavy_10']
+        stages['parse'] = dict(stages['parse'], seconds=stages['parse']['seconds'] * 2)
+        stages['decode'] = dict(stages['decode'], seconds=stages['decode']['seconds'] * 1.05)
+
+        regressions = compare_results(current, baseline, threshold=0.10)
+        self.assertEqual([r['benchmark'] for r in regressions], ['store_heavy_10/parse'])
+        self.assertAlmostEqual(regressions[0]['change'], 1.0)
+        self.assertEqual(compare_results(baseline, baseline), [])
+
+    def test_startup(self):
+        """Запуск uvm.py замеряется; typing и исполнители при запуске не загружаются."""
+        import subprocess
+        startup = measure_startup(1)
+        self.assertEqual(set(startup['commands']), {'help', 'disasm'})
+        self.assertGreater(startup['python'], 0)
+        self.assertEqual(check_startup({'python': 0.01, 'commands': {'help': 0.01, 'disasm': 0.05}}),
+                         ['disasm'])
+        script = (f"import sys; sys.path.insert(0, {os.path.dirname(UVM_SCRIPT)!r}); "
+                  "import uvm, interpreter; print(sorted({'typing', 'predecode'} & set(sys.modules)))")
+        loaded = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True,
+                                check=True).stdout
+        self.assertEqual(loaded.strip(), '[]')
+
+
+if __name__ == '__main__':
+    unittest.main()
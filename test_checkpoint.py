@@ -0,0 +1,106 @@
+import unittest
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import uvm
+import checkpoint
+from interpreter import UVMMemory
+from engines import ENGINES, get_engine
+
+
+def make_program(count=300):
+    """Программа с записями в разные страницы памяти."""
+    lines = []
+    for i in range(count):
+        lines += [f"LOAD_CONST {i % 256}", f"STORE_MEM {(i * 37) % 4000}",
+                  f"LOAD_MEM {(i * 997) % 60000}", "LOAD_CONST 1000", "ROL", "STORE_MEM 7"]
+    return uvm.assemble("\n".join(lines))
+
+
+class TestCheckpoint(unittest.TestCase):
+    """Тесты контрольных точек."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.binary = make_program()
+        self.expected = uvm.run(self.binary, {1000: 3, 50000: 9})
+
+    def memory(self):
+        memory = UVMMemory()
+        memory.write_data(1000, 3)
+        memory.write_data(50000, 9)
+        memory.load_code(self.binary)
+        return memory
+
+    def test_encode_decode(self):
+        """Точка разбирается обратно, поврежденная отклоняется."""
+        raw = checkpoint.encode_checkpoint(b'\x01' * 32, b'\x02' * 32, 12, 34, [5, -7], 5000,
+                                           {1: bytes([9]) * 904})
+        state = checkpoint.decode_checkpoint(raw)
+        self.assertEqual((state['instruction_count'], state['pc'], state['stack']), (12, 34, [5, -7]))
+        self.assertEqual(state['image'], b'\x02' * 32)
+        self.assertEqual(state['pages'], {1: bytes([9]) * 904})
+        damaged = raw[:20] + bytes([raw[20] ^ 1]) + raw[21:]
+        with self.assertRaises(ValueError):
+            checkpoint.decode_checkpoint(damaged)
+
+    def test_resume_matches_uninterrupted_run(self):
+        """Продолжение с любой сохраненной точки любым исполнителем дает тот же результат."""
+        memory = self.memory()
+        checkpointer = checkpoint.Checkpointer(self.tmp.name, every=250, keep=100,
+                                               max_overhead=float('inf'))
+        executor = get_engine('predecoded')(memory)
+        checkpointer.run(executor, memory)
+        self.assertEqual(executor.instruction_count, self.expected.instruction_count)
+        self.assertGreater(checkpointer.stats()['saved'], 3)
+
+        for path in checkpoint.checkpoint_paths(self.tmp.name)[::3]:
+            with open(path, 'rb') as f:
+                state = checkpoint.decode_checkpoint(f.read())
+            for name in ENGINES:
+                with self.subTest(path=os.path.basename(path), engine=name):
+                    memory = self.memory()
+                    checkpoint.restore_memory(memory, state)
+                    executor = get_engine(name)(memory)
+                    executor.instruction_count = state['instruction_count']
+                    executor.run()
+                    self.assertEqual(executor.instruction_count, self.expected.instruction_count)
+                    self.assertEqual(memory.data, self.expected.data)
+                    self.assertEqual(memory.stack, self.expected.stack)
+
+    def test_pages_differ_from_image(self):
+        """В точку попадают только измененные страницы; другой образ отклоняется."""
+        memory = self.memory()
+        checkpointer = checkpoint.Checkpointer(self.tmp.name, every=500, keep=1,
+                                               max_overhead=float('inf'))
+        checkpointer.run(get_engine('reference')(memory), memory)
+        path, state = checkpoint.load_latest(self.tmp.name, self.binary)
+        # Страница 12 с ячейкой 50000 образа не записывается программой
+        self.assertEqual(sorted(state['pages']), [0, 1])
+        other = self.memory()
+        other.write_data(50000, 8)
+        with self.assertRaises(ValueError):
+            checkpoint.restore_memory(other, state)
+        self.assertIsNone(checkpoint.load_latest(self.tmp.name, self.binary, 0,
+                                                 checkpoint.image_digest(other.snapshot())))
+
+    def test_load_latest_skips_damaged(self):
+        """Поврежденная последняя точка пропускается, старые удаляются."""
+        memory = self.memory()
+        checkpointer = checkpoint.Checkpointer(self.tmp.name, every=400, keep=2,
+                                               max_overhead=float('inf'))
+        checkpointer.run(get_engine('reference')(memory), memory)
+        paths = checkpoint.checkpoint_paths(self.tmp.name)
+        self.assertEqual(len(paths), 2)
+        with open(paths[0], 'r+b') as f:
+            f.write(b'XXXX')
+        path, state = checkpoint.load_latest(self.tmp.name, self.binary)
+        self.assertEqual(path, paths[1])
+        self.assertIsNone(checkpoint.load_latest(self.tmp.name, b'\x80'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+import random
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import uvm
+from interpreter import UVMMemory, UVMExecutor
+from compiler import CompiledExecutor, CompiledProgram, compile_program, generate_source
+
+
+def random_program(rng, count):
+    """Случайная программа с редкими ошибками: пустой стек, адрес вне памяти."""
+    lines = []
+    for _ in range(count):
+        choice = rng.random()
+        if choice < 0.3:
+            lines.append(f"LOAD_CONST {rng.randrange(300)}")
+        elif choice < 0.55:
+            lines.append(f"LOAD_MEM {rng.randrange(600)}")
+        elif choice < 0.8:
+            lines.append(f"STORE_MEM {rng.randrange(-300, 300)}")
+        else:
+            lines.append("ROL")
+    return uvm.assemble("\n".join(lines))
+
+
+def outcome(executor_class, binary, data_size, **kwargs):
+    memory = UVMMemory(data_size=data_size)
+    memory.load_image({address: address * 7 % 256 for address in range(0, 300, 3)})
+    memory.load_code(binary)
+    executor = executor_class(memory, **kwargs)
+    executor.run()
+    error = None if executor.error is None else (type(executor.error), str(executor.error))
+    return (executor.instruction_count, memory.pc, list(memory.stack), error,
+            bytes(memory.data), sorted(set(memory.dirty)))
+
+
+class TestCompiler(unittest.TestCase):
+    """Тесты трансляции программ в Python."""
+
+    def test_matches_reference(self):
+        """Состояние, ошибки и записанные ячейки совпадают с reference."""
+        rng = random.Random(5)
+        for case in range(60):
+            binary = random_program(rng, rng.randrange(1, 120))
+            data_size = rng.choice([600, 1024])
+            with self.subTest(case=case):
+                memory = UVMMemory(data_size=data_size)
+                memory.load_code(binary)
+                program = compile_program(memory.code, block_size=rng.choice([1, 7, 256]))
+                self.assertEqual(outcome(CompiledExecutor, binary, data_size, program=program),
+                                 outcome(UVMExecutor, binary, data_size))
+        # Ошибка декодирования после последнего блока
+        binary = uvm.assemble("LOAD_CONST 5\nSTORE_MEM 0") + b'\xe0'
+        self.assertEqual(outcome(CompiledExecutor, binary, 1024),
+                         outcome(UVMExecutor, binary, 1024))
+
+    def test_resumable_and_start_inside_block(self):
+        """run(max_instructions) продолжается; выполнение с середины блока."""
+        binary = uvm.assemble("\n".join(["LOAD_MEM 1", "LOAD_CONST 2", "ROL", "STORE_MEM 9"] * 100))
+        memory = UVMMemory()
+        memory.load_code(binary)
+        program = compile_program(memory.code, block_size=16)
+        executor = CompiledExecutor(memory, program)
+        executor.run(max_instructions=50)
+        # Граница внутри блока: остановка ровно на ней
+        self.assertEqual((executor.instruction_count, memory.pc),
+                         (50, memory.instruction_offset(50)))
+        self.assertTrue(executor.running)
+        executor.run()
+        self.assertEqual(executor.instruction_count, 400)
+
+        expected = UVMMemory()
+        expected.load_code(binary)
+        expected.pc = expected.instruction_offset(36)
+        UVMExecutor(expected).run()
+        memory = UVMMemory()
+        memory.load_code(binary)
+        memory.pc = memory.instruction_offset(36)
+        executor = CompiledExecutor(memory, program)
+        executor.run()
+        self.assertEqual(executor.instruction_count, 364)
+        self.assertEqual((bytes(memory.data), memory.stack), (bytes(expected.data), expected.stack))
+
+    def test_generated_module_is_self_contained(self):
+        """Исходный текст выполняется без модулей проекта; константы подставлены."""
+        memory = UVMMemory()
+        memory.load_code(uvm.assemble("LOAD_CONST 7\nSTORE_MEM 3\nLOAD_CONST 1\nLOAD_MEM 10"))
+        source = generate_source(memory.code)
+        self.assertIn("data[10] = 7; mark(10)", source)
+        self.assertNotIn("import", source)
+        namespace = {}
+        exec(compile(source, 'generated', 'exec'), namespace)
+        program = CompiledProgram.from_namespace(namespace)
+        self.assertEqual((program.lengths, program.code_size, program.error), ((4,), 10, None))
+        CompiledExecutor(memory, program).run()
+        self.assertEqual((memory.data[10], memory.stack), (7, [1, 7]))
+        other = UVMMemory()
+        other.load_code(uvm.assemble("ROL"))
+        with self.assertRaises(ValueError):
+            CompiledExecutor(other, program)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+import random
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from predecode import PredecodedExecutor, OP_CONST_STORE
+from conformance import (random_case, check_case, shrink_case, run_conformance,
+                         format_case, MIN_DATA_SIZE)
+
+
+class BrokenConstStore(PredecodedExecutor):
+    """Исполнитель с ошибкой: LOAD_CONST / STORE_MEM пишет значение + 1."""
+
+    def __init__(self, memory):
+        super().__init__(memory)
+        self.ops = [(kind, x + 1 if x < 255 else x, y, z, parts)
+                    if kind == OP_CONST_STORE else (kind, x, y, z, parts)
+                    for kind, x, y, z, parts in self.ops]
+
+
+class TestConformance(unittest.TestCase):
+    """Тесты дифференциальной проверки исполнителей."""
+
+    def test_random_case_is_deterministic(self):
+        """Один seed - одна и та же программа и память."""
+        first = random_case(random.Random(7), 30)
+        second = random_case(random.Random(7), 30)
+        self.assertEqual(first, second)
+        self.assertEqual(len(first[0]), 30)
+
+    def test_all_engines_conform(self):
+        """Все зарегистрированные исполнители совпадают с эталоном."""
+        report = run_conformance(cases=60, length=40, seed=1)
+        self.assertEqual(report['failures'], [])
+        for metric in report['throughput'].values():
+            self.assertGreater(metric['instructions'], 0)
+
+    def test_vector_runs_are_covered(self):
+        """Часть программ содержит серии, которые vectorized выполняет векторно."""
+        report = run_conformance(cases=30, length=80, seed=3,
+                                 engines=['reference', 'vectorized'])
+        self.assertGreater(report['vectorized'], 0)
+        self.assertEqual(report['failures'], [])
+        with self.assertRaises(ValueError):
+            run_conformance(cases=1, data_size=MIN_DATA_SIZE - 1)
+
+    def test_paged_memory_conforms(self):
+        """Исполнители на страничной памяти совпадают с эталоном на списке."""
+        report = run_conformance(cases=40, length=40, seed=2, paged=True)
+        self.assertTrue(report['paged'])
+        self.assertEqual(report['failures'], [])
+        # Размер 1024 не кратен странице: адрес за концом памяти на выделенной странице
+        program = [('LOAD_CONST', 5), ('STORE_MEM', 1000), ('LOAD_MEM', 1030)]
+        engines = {'predecoded': PredecodedExecutor}
+        self.assertEqual(check_case(program, {}, engines, paged=True), {})
+
+    def test_mismatch_detected_and_shrunk(self):
+        """Расхождение находится и уменьшается до минимальной программы."""
+        program = [('LOAD_MEM', 133), ('LOAD_CONST', 10), ('ROL', None),
+                   ('LOAD_CONST', 7), ('STORE_MEM', 100), ('LOAD_MEM', 500)]
+        image = {300: 1, 301: 2}
+        engines = {'broken': BrokenConstStore}
+
+        mismatches = check_case(program, image, engines)
+        self.assertIn('data', mismatches['broken'])
+
+        small_program, small_image = shrink_case(program, image, 'broken', BrokenConstStore)
+        self.assertEqual(format_case(small_program), "LOAD_CONST 7\nSTORE_MEM 100")
+        self.assertEqual(small_image, {})
+
+    def test_fault_behaviour_compared(self):
+        """Ошибки выполнения совпадают: тип, pc, счетчик и частичный стек."""
+        program = [('LOAD_CONST', 5), ('LOAD_CONST', 1000), ('ROL', None),
+                   ('LOAD_CONST', 300), ('STORE_MEM', 0), ('LOAD_CONST', 1)]
+        self.assertEqual(check_case(program, {}, {'broken': BrokenConstStore}), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
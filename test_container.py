@@ -0,0 +1,105 @@
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import uvm
+import container
+from interpreter import UVMMemory
+from engines import ENGINES, get_engine
+
+
+PROGRAM = """.data 3000 5, 6
+LOAD_MEM 3001
+LOAD_CONST 1000
+ROL
+STORE_MEM 100
+LOAD_MEM 3000
+LOAD_CONST 7"""
+
+
+class TestContainer(unittest.TestCase):
+    """Тесты контейнера программы."""
+
+    def setUp(self):
+        self.binary = uvm.assemble(PROGRAM)
+
+    def test_round_trip(self):
+        """Контейнер распаковывается в исходный код, индекс указывает на команды."""
+        packed = container.build_container(self.binary, entry=2)
+        self.assertTrue(container.is_container(packed))
+        self.assertFalse(container.is_container(self.binary))
+        program = container.read_container(packed)
+        self.assertEqual(program['data'] + program['code'], self.binary)
+        self.assertEqual(list(program['index']), [0, 4, 6, 7, 9, 13])
+        self.assertEqual(container.entry_offset(program), 6)
+        self.assertEqual(container.unwrap(packed), self.binary)
+        self.assertIsNone(container.read_container(
+            container.build_container(self.binary, index=False))['index'])
+
+    def test_rejects_damaged(self):
+        """Повреждение, другая версия или вариант - ValueError."""
+        packed = bytearray(container.build_container(self.binary))
+        for position in (4, 5, len(packed) - 10):
+            damaged = bytearray(packed)
+            damaged[position] ^= 1
+            with self.assertRaises(ValueError):
+                container.read_container(damaged)
+        with self.assertRaises(ValueError):
+            container.build_container(self.binary, entry=6)
+        with self.assertRaises(ValueError):
+            container.build_container(b'\x4a')
+
+    def test_engines_run_container(self):
+        """Все исполнители выполняют контейнер с начальной команды."""
+        expected = uvm.run(self.binary)
+        packed = container.build_container(self.binary)
+        for name in ENGINES:
+            with self.subTest(engine=name):
+                result = uvm.run(packed, engine=name)
+                self.assertEqual(result.data, expected.data)
+                self.assertEqual(result.stack, expected.stack)
+                memory = UVMMemory()
+                memory.load_code(container.build_container(self.binary, entry=4))
+                self.assertEqual(memory.program_bytes(), self.binary)
+                self.assertEqual(memory.instruction_offset(5), 13)
+                executor = get_engine(name)(memory)
+                executor.run()
+                self.assertEqual((memory.stack, executor.instruction_count), ([5, 7], 2))
+
+    def test_artifacts_keyed_by_entry(self):
+        """Артефакт, журнал и контрольная точка сырого кода не подходят контейнеру с точкой входа."""
+        import tempfile
+        import checkpoint
+        from evaluator import evaluate_static, apply_evaluation
+        from replay import record
+        packed = container.build_container(self.binary, entry=4)
+
+        def loaded(binary):
+            memory = UVMMemory()
+            memory.load_code(binary)
+            return memory
+
+        memory = loaded(packed)
+        self.assertEqual((memory.entry, memory.pc), (9, 9))
+        self.assertFalse(apply_evaluation(memory, evaluate_static(self.binary)))
+        self.assertEqual((memory.data[100], memory.pc), (0, 9))
+        self.assertTrue(apply_evaluation(memory, evaluate_static(packed)))
+        self.assertEqual((memory.data[100], memory.stack), (0, [5, 7]))
+
+        with self.assertRaises(ValueError):
+            record(loaded(self.binary)).replay(loaded(packed))
+        memory = loaded(packed)
+        self.assertTrue(record(loaded(packed)).replay(memory))
+        self.assertEqual(memory.stack, [5, 7])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            memory = loaded(self.binary)
+            checkpoint.Checkpointer(tmp, every=1).save(memory, 0)
+            program = memory.program_bytes()
+            self.assertIsNotNone(checkpoint.load_latest(tmp, program))
+            self.assertIsNone(checkpoint.load_latest(tmp, program, loaded(packed).entry))
+
+
+if __name__ == '__main__':
+    unittest.main()
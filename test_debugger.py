@@ -0,0 +1,112 @@
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import uvm
+from interpreter import UVMMemory, UVMExecutor
+from engines import ENGINES
+from debugger import DebugSession, execute_command, repl
+
+
+def program(count=300):
+    lines = []
+    for i in range(count):
+        lines += [f"LOAD_CONST {i % 256}", f"STORE_MEM {(i * 7) % 3000}",
+                  "LOAD_MEM 133", "LOAD_CONST 1000", "ROL", f"STORE_MEM {i % 50}"]
+    return uvm.assemble("\n".join(lines))
+
+
+def loaded(binary):
+    memory = UVMMemory()
+    memory.write_data(1000, 3)
+    memory.load_code(binary)
+    return memory
+
+
+def state_after(binary, count):
+    """Эталон: память, стек и pc после count команд без отладчика."""
+    memory = loaded(binary)
+    executor = UVMExecutor(memory)
+    executor.run(max_instructions=count)
+    return bytes(memory.data), list(memory.stack), memory.pc
+
+
+class TestDebugger(unittest.TestCase):
+    """Тесты сеанса отладки с перемещением назад."""
+
+    def setUp(self):
+        self.binary = program()
+
+    def assertAt(self, session, count):
+        memory = session.memory
+        self.assertEqual(session.position, count)
+        self.assertEqual((bytes(memory.data), memory.stack, memory.pc),
+                         state_after(self.binary, count))
+
+    def test_goto_and_step_back_restore_exact_state(self):
+        """Переход назад и вперед дает то же состояние, что и прямое выполнение."""
+        session = DebugSession(loaded(self.binary), every=50)
+        session.goto(1000)
+        self.assertAt(session, 1000)
+        for target in (999, 437, 0, 1, 1500):
+            session.goto(target)
+            self.assertAt(session, target)
+        session.step_back(3)
+        self.assertAt(session, 1497)
+        session.step(2)
+        self.assertAt(session, 1499)
+        # Повторно выполняется не больше интервала на каждое восстановление
+        stats = session.stats()
+        self.assertLessEqual(session.replayed, stats['restores'] * stats['every'])
+
+    def test_budget_bounds_checkpoints(self):
+        """Число точек не превышает бюджет, интервал удваивается."""
+        session = DebugSession(loaded(self.binary), every=10, budget=8)
+        session.goto(1800)
+        stats = session.stats()
+        self.assertLessEqual(stats['checkpoints'], 8)
+        self.assertGreaterEqual(stats['every'], 1800 // 8)
+        session.goto(1234)
+        self.assertAt(session, 1234)
+        for name in ENGINES:
+            with self.subTest(engine=name):
+                session = DebugSession(loaded(self.binary), every=100, budget=4, engine=name)
+                self.assertEqual(session.continue_(), 1800)
+                self.assertTrue(session.finished)
+                self.assertLessEqual(session.stats()['checkpoints'], 4)
+                session.goto(777)
+                self.assertAt(session, 777)
+                session.continue_()
+                self.assertAt(session, 1800)
+
+    def test_repl_commands(self):
+        """Команды REPL: шаги, возврат, память и выход."""
+        session = DebugSession(loaded(self.binary), every=16)
+        commands = iter(["step 10", "back 4", "goto 0x20", "mem 0 1", "stack", "nonsense",
+                         "quit", "step"])
+        output = []
+        repl(session, read=lambda prompt: next(commands), write=output.append)
+        self.assertTrue(output[1].startswith("[10]"))
+        self.assertTrue(output[2].startswith("[6]"))
+        self.assertTrue(output[3].startswith("[32]"))
+        data = state_after(self.binary, 32)[0]
+        self.assertEqual(output[4], f"0: {data[0]}\n1: {data[1]}")
+        self.assertIn("Неизвестная команда", output[6])
+        self.assertAt(session, 32)
+        self.assertEqual(execute_command(session, "goto"), "Укажите номер команды: goto N")
+
+    def test_repl_rejects_negative_position(self):
+        """goto -1 и step за начало программы не завершают REPL."""
+        session = DebugSession(loaded(self.binary), every=16)
+        commands = iter(["step 5", "goto -1", "step -10", "step 2", "quit"])
+        output = []
+        repl(session, read=lambda prompt: next(commands), write=output.append)
+        self.assertEqual(output[2], "Номер команды не может быть отрицательным: -1")
+        self.assertEqual(output[3], "Номер команды не может быть отрицательным: -5")
+        self.assertTrue(output[4].startswith("[7]"))
+        self.assertAt(session, 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from parser import parse_assembly
+from encoder import encode_to_intermediate, encode_to_binary
+from interpreter import UVMMemory, UVMExecutor, create_memory_dump
+from evaluator import evaluate_static, apply_evaluation, save_evaluation, load_evaluation
+
+
+def assemble(source):
+    return encode_to_binary(encode_to_intermediate(parse_assembly(source)))
+
+
+PROGRAM = """LOAD_CONST 7
+STORE_MEM 100
+LOAD_MEM 133
+LOAD_CONST 107
+ROL
+STORE_MEM 200
+LOAD_MEM 500"""
+
+
+class TestEvaluator(unittest.TestCase):
+
+    def run_reference(self, binary):
+        memory = UVMMemory()
+        memory.load_code(binary)
+        executor = UVMExecutor(memory)
+        executor.run()
+        return memory, executor
+
+    def test_matches_execution(self):
+        """Применение артефакта дает то же состояние, что и выполнение."""
+        binary = assemble(PROGRAM)
+        reference, executor = self.run_reference(binary)
+
+        evaluation = evaluate_static(binary)
+        self.assertEqual(evaluation['instruction_count'], executor.instruction_count)
+
+        memory = UVMMemory()
+        memory.load_code(binary)
+        self.assertTrue(apply_evaluation(memory, evaluation))
+
+        self.assertEqual(memory.data, reference.data)
+        self.assertEqual(memory.stack, reference.stack)
+        self.assertEqual(memory.pc, reference.pc)
+        self.assertEqual(create_memory_dump(memory, 0, 1000),
+                         create_memory_dump(reference, 0, 1000))
+
+    def test_inputs_tracked(self):
+        """Входными считаются только ячейки, прочитанные до записи."""
+        evaluation = evaluate_static(assemble(PROGRAM))
+        # MEM[107] записывается до чтения командой ROL
+        self.assertEqual(evaluation['inputs'], {'133': 42, '500': 25})
+        self.assertIn('107', evaluation['writes'])
+
+    def test_fallback_on_changed_input(self):
+        """Артефакт не применяется, если входная ячейка отличается."""
+        binary = assemble(PROGRAM)
+        evaluation = evaluate_static(binary)
+
+        memory = UVMMemory()
+        memory.write_data(133, 1)
+        memory.load_code(binary)
+        before = list(memory.data)
+        self.assertFalse(apply_evaluation(memory, evaluation))
+        self.assertEqual(memory.data, before)
+        self.assertEqual(memory.stack, [])
+
+        # Изменение ячейки, от которой программа не зависит, допустимо
+        memory = UVMMemory()
+        memory.write_data(9000, 1)
+        memory.load_code(binary)
+        self.assertTrue(apply_evaluation(memory, evaluation))
+
+    def test_fallback_on_other_binary(self):
+        """Артефакт не применяется к другой программе."""
+        evaluation = evaluate_static(assemble(PROGRAM))
+        memory = UVMMemory()
+        memory.load_code(assemble("LOAD_CONST 1"))
+        self.assertFalse(apply_evaluation(memory, evaluation))
+
+    def test_custom_image_and_error(self):
+        """Пользовательский образ памяти и фиксация ошибки выполнения."""
+        binary = assemble("LOAD_MEM 10\nLOAD_CONST 11\nROL\nROL")
+        evaluation = evaluate_static(binary, {10: 3, 11: 1})
+        self.assertEqual(evaluation['inputs'], {'10': 3, '11': 1})
+        # 3 ROL 1 = 6; второй ROL останавливается на пустом стеке
+        self.assertEqual(evaluation['stack'], [6])
+        self.assertIsNotNone(evaluation['error'])
+        self.assertEqual(evaluation['instruction_count'], 4)
+        # Артефакт с ошибкой не применяется: ее воспроизводит только выполнение
+        memory = UVMMemory()
+        memory.write_data(10, 3)
+        memory.write_data(11, 1)
+        memory.load_code(binary)
+        before = list(memory.data)
+        self.assertFalse(apply_evaluation(memory, evaluation))
+        self.assertEqual((memory.data, memory.stack, memory.pc), (before, [], 0))
+
+    def test_save_load(self):
+        """Сохранение и загрузка артефакта."""
+        evaluation = evaluate_static(assemble(PROGRAM))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'prog.json')
+            save_evaluation(evaluation, path)
+            self.assertEqual(load_evaluation(path), evaluation)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import uvm
+from heatmap import AccessHeatmap
+
+
+PROGRAM = """LOAD_MEM 3000
+LOAD_MEM 3000
+LOAD_CONST 20
+STORE_MEM 5
+LOAD_MEM 133
+LOAD_CONST 1000
+ROL"""
+
+
+class TestHeatmap(unittest.TestCase):
+    """Тесты тепловой карты обращений к памяти."""
+
+    def test_counters_cover_touched_range(self):
+        """Массивы растут в обе стороны и покрывают только затронутый диапазон."""
+        heatmap = AccessHeatmap()
+        heatmap.write(5000)
+        heatmap.read(5003)
+        heatmap.read(4990)
+        heatmap.read(4990)
+        self.assertLessEqual(heatmap.base, 4990)
+        self.assertLessEqual(len(heatmap), 30)
+        self.assertEqual(heatmap.counts(4990), (2, 0))
+        self.assertEqual(heatmap.counts(5000), (0, 1))
+        self.assertEqual(heatmap.touched(), [4990, 5000, 5003])
+        self.assertEqual(heatmap.histogram(8), [(4984, 2, 0), (5000, 1, 1)])
+
+    def test_collected_by_reference_executor(self):
+        """Исполнитель reference считает чтения LOAD_MEM и ROL и записи STORE_MEM."""
+        for ir in (False, True):
+            result = uvm.asm_run(PROGRAM, ir=ir, heatmap=True)
+            self.assertEqual(result.heatmap.counts(3000), (2, 0))
+            self.assertEqual(result.heatmap.counts(25), (0, 1))
+            self.assertEqual(result.heatmap.counts(1000), (1, 0))
+            self.assertEqual(result.heatmap.stats()['reads'], 4)
+        self.assertIsNone(uvm.asm_run(PROGRAM).heatmap)
+        with self.assertRaises(ValueError):
+            uvm.asm_run(PROGRAM, engine='predecoded', heatmap=True)
+
+    def test_export(self):
+        """Двоичный формат разбирается обратно, CSV содержит затронутые адреса."""
+        heatmap = uvm.asm_run(PROGRAM, heatmap=True).heatmap
+        restored = AccessHeatmap.from_bytes(heatmap.to_bytes())
+        self.assertEqual((restored.base, restored.reads, restored.writes),
+                         (heatmap.base, heatmap.reads, heatmap.writes))
+        with self.assertRaises(ValueError):
+            AccessHeatmap.from_bytes(heatmap.to_bytes()[:-1])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'heat.csv')
+            heatmap.save(path)
+            with open(path, encoding='utf-8') as f:
+                lines = f.read().splitlines()
+        self.assertEqual(lines[0], 'address,reads,writes')
+        self.assertIn('3000,2,0', lines)
+        self.assertEqual(len(lines), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
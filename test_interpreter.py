@@ -5,7 +5,8 @@ import tempfile
 import json
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from interpreter import UVMMemory, UVMDecoder, UVMExecutor
+from interpreter import (UVMMemory, UVMDecoder, UVMExecutor, PagedData, ADDRESS_SPACE,
+                         PAGE_SIZE, load_memory_image)
 from parser import parse_assembly
 from encoder import encode_to_intermediate, encode_to_binary
 
@@ -210,6 +211,227 @@ class TestUVMExecutor(unittest.TestCase):
         self.assertEqual(memory.stack[0], 0b00011110)
 
 
+class TestMemorySnapshot(unittest.TestCase):
+    
+    def setUp(self):
+        # Префикс записывает MEM[15]; вариант задает число сдвигов MEM[1000]
+        source = """LOAD_CONST 5
+STORE_MEM 10
+LOAD_MEM 133
+LOAD_CONST 1000
+ROL
+STORE_MEM 0"""
+        self.memory = UVMMemory()
+        self.memory.load_code(encode_to_binary(encode_to_intermediate(parse_assembly(source))))
+        executor = UVMExecutor(self.memory)
+        executor.run(max_instructions=2)
+        self.assertEqual((executor.instruction_count, self.memory.pc), (2, 4))
+    
+    def test_restore_variants(self):
+        """Варианты выполняются от общего префикса без повторного запуска."""
+        snapshot = self.memory.snapshot()
+        results = {}
+        for shifts in (0, 1, 2):
+            self.memory.restore(snapshot)
+            self.memory.write_data(1000, shifts)
+            UVMExecutor(self.memory).run()
+            results[shifts] = [a for a in (42, 84, 168) if self.memory.read_data(a)]
+        self.assertEqual(results, {0: [42], 1: [84], 2: [168]})
+        self.memory.restore(snapshot)
+        self.assertEqual((self.memory.pc, self.memory.stack), (4, []))
+        self.assertEqual(self.memory.read_data(1000), 0)
+        self.assertEqual(self.memory.read_data(15), 5)
+    
+    def test_snapshots_share_unchanged_pages(self):
+        """Повторный снимок копирует только записанные страницы."""
+        first = self.memory.snapshot()
+        self.memory.write_data(5000, 1)
+        second = self.memory.snapshot()
+        self.assertIs(first.pages[0], second.pages[0])
+        self.assertIsNot(first.pages[1], second.pages[1])
+        self.assertEqual((first.read_data(5000), second.read_data(5000)), (0, 1))
+    
+    def test_snapshots_share_code(self):
+        """Код копируется один раз; замена кода дает новую копию и восстанавливается."""
+        first = self.memory.snapshot()
+        code = self.memory.code
+        self.memory.restore(first)
+        self.assertIs(self.memory.code, code)
+        self.assertIs(self.memory.snapshot().code, first.code)
+        self.memory.load_code(b'\x80')
+        second = self.memory.snapshot()
+        self.assertEqual(second.code, b'\x80')
+        self.memory.restore(first)
+        self.assertEqual(bytes(self.memory.code), first.code)
+        self.assertIs(self.memory.snapshot().code, first.code)
+    
+    def test_fork_and_reset(self):
+        """Копия независима, reset возвращает стандартный образ."""
+        fork = self.memory.fork()
+        UVMExecutor(fork).run()
+        self.assertEqual(fork.read_data(42), 42)
+        self.assertEqual(self.memory.read_data(42), 0)
+        self.assertEqual(self.memory.pc, 4)
+        fork.reset()
+        self.assertEqual(fork.data, UVMMemory().data)
+    
+    def test_dirty_is_bounded(self):
+        """Повторные записи не увеличивают dirty; снимок начинает его заново."""
+        for value in range(256):
+            self.memory.write_data(7000, value)
+        self.assertEqual(self.memory.dirty, {15, 7000})
+        self.memory.snapshot()
+        self.assertEqual(self.memory.dirty, set())
+        self.memory.write_data(9000, 1)
+        self.assertEqual(self.memory._changed_pages(), {2})
+        self.assertEqual(self.memory.reset(), 3)
+        self.assertEqual(self.memory.data, UVMMemory().data)
+
+
+class TestPagedData(unittest.TestCase):
+    
+    def test_lazy_pages(self):
+        """Чтение невыделенных страниц не выделяет память, запись нуля тоже."""
+        memory = UVMMemory(data_size=ADDRESS_SPACE)
+        self.assertIsInstance(memory.data, PagedData)
+        self.assertEqual(memory.read_data(ADDRESS_SPACE - 1), 0)
+        memory.write_data(10000000, 0)
+        self.assertEqual(sorted(memory.data.pages), [0])
+        memory.write_data(ADDRESS_SPACE - 1, 77)
+        self.assertEqual(memory.read_data(ADDRESS_SPACE - 1), 77)
+        self.assertEqual(len(memory.data.pages), 2)
+        with self.assertRaises(IndexError):
+            memory.read_data(ADDRESS_SPACE)
+    
+    def test_bulk_image_is_tracked_by_pages(self):
+        """Образ отмечается страницами, reset() восстанавливает их срезами."""
+        image = bytes(range(256)) * 4096
+        memory = UVMMemory(data_size=ADDRESS_SPACE, image=image)
+        self.assertEqual((memory.dirty, memory.dirty_pages), (set(), set()))
+        memory.load_image(b'\x07' * 10000, base=3 << 20)
+        self.assertEqual(memory.dirty, set())
+        self.assertEqual(memory.dirty_pages, {768, 769, 770})
+        memory.write_data(10, 0)
+        self.assertEqual(memory.reset(), 3 * PAGE_SIZE + 1)
+        self.assertEqual((memory.read_data(10), memory.read_data(3 << 20)), (10, 0))
+        self.assertEqual(memory.data[:len(image)], image)
+    
+    def test_bounds_on_allocated_page(self):
+        """Адрес за концом памяти на выделенной странице - IndexError."""
+        data = PagedData(5000)
+        data[4500] = 1
+        for address in (5000, 8191, -1):
+            with self.subTest(address=address):
+                with self.assertRaises(IndexError):
+                    data[address]
+                with self.assertRaises(IndexError):
+                    data[address] = 2
+        self.assertEqual(data[4500], 1)
+    
+    def test_high_address_program_and_dump(self):
+        """LOAD_MEM читает 24-битный адрес; дамп перебирает только выделенные страницы."""
+        from interpreter import create_memory_dump
+        source = "LOAD_MEM 16000000\nLOAD_CONST 0\nSTORE_MEM 4000"
+        binary = encode_to_binary(encode_to_intermediate(parse_assembly(source)))
+        memory = UVMMemory(data_size=ADDRESS_SPACE)
+        memory.write_data(16000000, 5)
+        memory.load_code(binary)
+        executor = UVMExecutor(memory)
+        executor.run()
+        self.assertIsNone(executor.error)
+        self.assertEqual(memory.stack, [5])
+        dump = create_memory_dump(memory, 0, ADDRESS_SPACE - 1)
+        self.assertEqual(dump['memory']['16000000'], 5)
+        self.assertEqual(dump['memory'], UVMMemory.get_memory_dump(memory, 0, ADDRESS_SPACE - 1))
+    
+    def test_slices_and_equality(self):
+        """Срезы через границы страниц и сравнение со списком."""
+        data = PagedData(10000)
+        data[4090:4100] = bytes(range(1, 11))
+        self.assertEqual(data[4088:4102], bytes([0, 0] + list(range(1, 11)) + [0, 0]))
+        dense = [0] * 10000
+        dense[4090:4100] = range(1, 11)
+        self.assertEqual(data, dense)
+        copy = data.copy()
+        copy[4095] = 0
+        self.assertNotEqual(copy, data)
+
+
+class TestBackingFile(unittest.TestCase):
+    
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, 'mem.img')
+        source = "LOAD_MEM 133\nLOAD_CONST 7\nSTORE_MEM 0"
+        self.binary = encode_to_binary(encode_to_intermediate(parse_assembly(source)))
+    
+    def run_backed(self, persistent):
+        memory = UVMMemory(backing=self.path, persistent=persistent)
+        memory.load_code(self.binary)
+        UVMExecutor(memory).run()
+        return memory
+    
+    def test_private_copy_on_write(self):
+        """Новый файл получает стандартный образ, записи не попадают в файл."""
+        memory = self.run_backed(persistent=False)
+        self.assertEqual(memory.read_data(7), 7)
+        self.assertEqual(memory.get_memory_dump(0, 1000), UVMMemory().get_memory_dump(0, 1000) | {'7': 7})
+        memory.reset()
+        self.assertEqual(memory.read_data(7), 0)
+        memory.close()
+        with open(self.path, 'rb') as f:
+            image = f.read()
+        self.assertEqual((len(image), image[7], image[133]), (65536, 0, 42))
+    
+    def test_persistent_mode(self):
+        """В постоянном режиме записи сохраняются в файл и видны следующему запуску."""
+        self.run_backed(persistent=True).close()
+        memory = UVMMemory(backing=self.path)
+        self.assertEqual(memory.read_data(7), 7)
+        memory.close()
+
+
+class TestMemoryImage(unittest.TestCase):
+    
+    def test_image_replaces_test_data(self):
+        """Образ загружается вместо тестовых данных, reset восстанавливает его."""
+        memory = UVMMemory(image=bytes([0, 7, 9]))
+        self.assertEqual(memory.get_memory_dump(0, 1000), {'1': 7, '2': 9})
+        memory.write_data(2, 1)
+        memory.write_data(40, 1)
+        memory.reset()
+        self.assertEqual(memory.get_memory_dump(0, 1000), {'1': 7, '2': 9})
+        
+        memory.load_image([5, 6], base=65534)
+        self.assertEqual(memory.read_data(65535), 6)
+        with self.assertRaises(IndexError):
+            memory.load_image(b'\x01\x02', base=65535)
+        with self.assertRaises(ValueError):
+            memory.load_image([256])
+    
+    def test_image_files(self):
+        """Сырые, JSON (в том числе дамп) и .npy образы дают одну память."""
+        with tempfile.TemporaryDirectory() as tmp:
+            raw = os.path.join(tmp, 'mem.bin')
+            with open(raw, 'wb') as f:
+                f.write(bytes(100) + bytes([3, 4]))
+            sparse = os.path.join(tmp, 'mem.json')
+            with open(sparse, 'w') as f:
+                json.dump({'memory': {'100': 3, '101': 4}, 'stack': []}, f)
+            paths = [raw, sparse]
+            try:
+                import numpy as np
+                npy = os.path.join(tmp, 'mem.npy')
+                np.save(npy, np.array([0] * 100 + [3, 4], dtype=np.int32))
+                paths.append(npy)
+            except ImportError:
+                pass
+            for path in paths:
+                memory = UVMMemory(image=load_memory_image(path))
+                self.assertEqual(memory.get_memory_dump(0, 1000), {'100': 3, '101': 4}, path)
+
+
 class TestEndToEnd(unittest.TestCase):
     
     def test_simple_program(self):
@@ -68,6 +68,18 @@ ROL"""
         program = parse_assembly(source)
         self.assertEqual(len(program), 1)
         self.assertEqual(program[0]['opcode'], 'ROL')
+    
+    def test_data_directives(self):
+        """Директивы .data и .fill"""
+        program = parse_assembly(".data 100 1, 2 0x10\n.FILL 5000 3, 7\n.fill 9 2\nROL")
+        self.assertEqual(len(program), 4)
+        self.assertEqual((program[0]['opcode'], program[0]['operand'], program[0]['values']),
+                         ('.DATA', 100, [1, 2, 16]))
+        self.assertEqual((program[1]['operand'], program[1]['values']), (5000, [7, 7, 7]))
+        self.assertEqual(program[2]['values'], [0, 0])
+        for source in (".data 100", ".data 100 256", ".fill 0 0", ".data 16777215 1, 2", ".fill x 1"):
+            with self.assertRaises(ValueError):
+                parse_assembly(source)
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+import random
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from parser import parse_assembly
+from encoder import encode_to_intermediate, encode_to_binary
+from interpreter import UVMMemory, UVMExecutor
+from predecode import (PredecodedExecutor, predecode, record_ngram_profile,
+                       select_fusions, ROL_TABLE, OP_ROL_STORE, OP_CONST_STORE,
+                       OP_LOAD_CONST)
+
+
+def assemble(source):
+    return encode_to_binary(encode_to_intermediate(parse_assembly(source)))
+
+
+def run(executor_class, binary, **kwargs):
+    memory = UVMMemory()
+    memory.load_code(binary)
+    executor = executor_class(memory, **kwargs)
+    executor.run()
+    error = (type(executor.error).__name__, str(executor.error)) if executor.error else None
+    return memory.data, memory.stack, memory.pc, executor.instruction_count, error
+
+
+IDIOM = """LOAD_CONST 2
+STORE_MEM 198
+LOAD_MEM 133
+LOAD_CONST 200
+ROL
+STORE_MEM 300
+LOAD_MEM 500
+LOAD_CONST 200
+ROL
+STORE_MEM 301"""
+
+
+class TestPredecode(unittest.TestCase):
+
+    def test_rol_table(self):
+        """Таблица сдвигов совпадает с побитовым ROL."""
+        self.assertEqual(ROL_TABLE[0b10000001][1], 0b00000011)
+        self.assertEqual(ROL_TABLE[0b11001100][2], 0b00110011)
+        self.assertEqual(ROL_TABLE[240][0], 240)
+
+    def test_fusion(self):
+        """Идиомы сливаются в суперинструкции."""
+        ops = predecode(assemble(IDIOM))
+        self.assertEqual([op[0] for op in ops], [OP_CONST_STORE, OP_ROL_STORE, OP_ROL_STORE])
+        self.assertEqual(ops[1][1:4], (133, 200, 300))
+        # Последнее поле - смещение первой команды операции
+        self.assertEqual([op[4] for op in ops], [0, 4, 13])
+
+        ops = predecode(assemble(IDIOM), fusions=[])
+        self.assertEqual(len(ops), 10)
+        self.assertEqual(ops[0][0], OP_LOAD_CONST)
+
+    def test_matches_reference(self):
+        """Результат совпадает с эталонным исполнителем."""
+        binary = assemble(IDIOM)
+        self.assertEqual(run(PredecodedExecutor, binary), run(UVMExecutor, binary))
+
+    def test_faults_match_reference(self):
+        """Ошибки и частичное состояние совпадают с эталоном."""
+        sources = [
+            "LOAD_MEM 133\nLOAD_CONST 200\nROL\nSTORE_MEM -300",
+            "LOAD_CONST 300\nSTORE_MEM 0\nLOAD_CONST 1",
+            "LOAD_MEM 70000\nLOAD_CONST 1\nROL\nSTORE_MEM 0",
+            "LOAD_CONST 1\nROL\nLOAD_CONST 5",
+            "STORE_MEM 1",
+        ]
+        for source in sources:
+            binary = assemble(source)
+            self.assertEqual(run(PredecodedExecutor, binary), run(UVMExecutor, binary), source)
+
+        # Усеченная и неизвестная команды
+        for binary in (assemble("LOAD_CONST 5") + bytes([0x60, 0x00]), bytes([0x40, 0x01, 0xE0])):
+            self.assertEqual(run(PredecodedExecutor, binary), run(UVMExecutor, binary))
+
+    def test_random_programs(self):
+        """Случайные программы выполняются так же, как эталоном."""
+        rng = random.Random(28)
+        opcodes = ['LOAD_CONST', 'LOAD_MEM', 'STORE_MEM', 'ROL']
+        for _ in range(200):
+            lines = []
+            for _ in range(rng.randrange(1, 40)):
+                opcode = rng.choice(opcodes)
+                if opcode == 'LOAD_CONST':
+                    lines.append(f"LOAD_CONST {rng.randrange(0, 300)}")
+                elif opcode == 'LOAD_MEM':
+                    lines.append(f"LOAD_MEM {rng.randrange(0, 600)}")
+                elif opcode == 'STORE_MEM':
+                    lines.append(f"STORE_MEM {rng.randrange(-100, 600)}")
+                else:
+                    lines.append("ROL")
+            binary = assemble("\n".join(lines))
+            self.assertEqual(run(PredecodedExecutor, binary), run(UVMExecutor, binary))
+
+    def test_profile(self):
+        """Набор суперинструкций выбирается по профилю n-грамм."""
+        profile = record_ngram_profile([assemble(IDIOM)])
+        self.assertEqual(profile[('LOAD_MEM', 'LOAD_CONST', 'ROL', 'STORE_MEM')], 2)
+        fusions = select_fusions(profile)
+        self.assertEqual(fusions[0], ('LOAD_MEM', 'LOAD_CONST', 'ROL', 'STORE_MEM'))
+        self.assertNotIn(('LOAD_MEM', 'STORE_MEM'), fusions)
+
+        binary = assemble(IDIOM)
+        self.assertEqual(run(PredecodedExecutor, binary, fusions=fusions),
+                         run(UVMExecutor, binary))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import io
+import sys
+import os
+import tempfile
+import contextlib
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import uvm
+from parser import parse_assembly
+from encoder import encode_to_intermediate, encode_to_binary
+from interpreter import UVMMemory
+from engines import ENGINES, get_engine
+from profiler import Profiler
+from sourcemap import build_source_map
+
+
+SOURCE = "\n".join(["LOAD_MEM 133", "LOAD_CONST 1000", "ROL", "STORE_MEM 7"] * 50 + ["ROL"])
+
+
+def profile(every, engine='reference', source_map=True):
+    intermediate = encode_to_intermediate(parse_assembly(SOURCE))
+    memory = UVMMemory()
+    memory.load_code(encode_to_binary(intermediate))
+    executor = get_engine(engine)(memory)
+    profiler = Profiler(build_source_map(intermediate, 'p.asm') if source_map else None, every)
+    profiler.run(executor, memory)
+    return profiler, executor
+
+
+class TestProfiler(unittest.TestCase):
+    """Тесты профилировщика."""
+
+    def test_exact_counts_every_line(self):
+        """При every=1 каждой строке засчитана одна команда, ошибочной тоже."""
+        for name in ENGINES:
+            with self.subTest(engine=name):
+                profiler, executor = profile(1, name)
+                self.assertIsNotNone(executor.error)
+                self.assertEqual(profiler.counts, {line: 1 for line in range(1, 202)})
+                self.assertEqual(sum(profiler.counts.values()), executor.instruction_count)
+
+    def test_sampling(self):
+        """С выборкой число выполнений по строкам остается точным."""
+        profiler, executor = profile(40, 'predecoded')
+        self.assertEqual(sum(profiler.counts.values()), executor.instruction_count)
+        self.assertEqual(set(profiler.counts.values()), {1})
+        self.assertLessEqual(profiler.samples, 7)
+        rows = profiler.rows()
+        self.assertEqual(rows, sorted(rows, key=lambda row: -row['ns']))
+        self.assertIn('смещение', profile(40, source_map=False)[0].report())
+
+    def test_collapsed_and_cli(self):
+        """Свернутые стеки: 'программа;кадр значение' без лишних ';'."""
+        profiler, _ = profile(1)
+        lines = profiler.collapsed(SOURCE.split('\n'), weight='instructions').splitlines()
+        self.assertEqual(len(lines), 201)
+        self.assertIn('p.asm;3: ROL 1', lines)
+        for line in lines:
+            stack, value = line.rsplit(' ', 1)
+            self.assertEqual(stack.count(';'), 1)
+            self.assertTrue(value.isdigit())
+
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, 'p.asm')
+            collapsed = os.path.join(tmp, 'p.folded')
+            with open(source, 'w', encoding='utf-8') as f:
+                f.write(SOURCE)
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                code = uvm.main(['profile', source, '--exact', '--top', '5',
+                                 '--collapsed', collapsed])
+            self.assertEqual(code, 0)
+            self.assertIn('Выборок: 201', output.getvalue())
+            self.assertTrue(os.path.getsize(collapsed) > 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+import io
+import sys
+import os
+import tempfile
+import contextlib
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import uvm
+from interpreter import UVMMemory
+from engines import ENGINES, get_engine
+from replay import Recording, record, compare, first_divergence
+
+
+def program(count=200, tail="ROL"):
+    lines = []
+    for i in range(count):
+        lines += [f"LOAD_CONST {i % 256}", f"STORE_MEM {(i * 7) % 3000}",
+                  "LOAD_MEM 133", "LOAD_CONST 1000", "ROL", f"STORE_MEM {i % 50}"]
+    return uvm.assemble("\n".join(lines + [tail]))
+
+
+def loaded(binary):
+    memory = UVMMemory()
+    memory.write_data(1000, 3)
+    memory.load_code(binary)
+    return memory
+
+
+class TestReplay(unittest.TestCase):
+    """Тесты записи и воспроизведения выполнения."""
+
+    def setUp(self):
+        self.binary = program()
+        self.recording = record(loaded(self.binary))
+
+    def test_round_trip_is_compact(self):
+        """Журнал разбирается обратно; запись в память стоит несколько байт."""
+        raw = self.recording.to_bytes()
+        restored = Recording.from_bytes(raw)
+        self.assertEqual(len(restored), 400)
+        self.assertEqual((restored.instruction_count, restored.pc, restored.stack, restored.error),
+                         (self.recording.instruction_count, self.recording.pc,
+                          self.recording.stack, self.recording.error))
+        self.assertEqual(list(restored.addresses), list(self.recording.addresses))
+        self.assertEqual(restored.marks, self.recording.marks)
+        self.assertLess(len(raw), 101 + 5 * 400 + 100)
+        with self.assertRaises(ValueError):
+            Recording.from_bytes(raw[:-5] + bytes([raw[-5] ^ 1]) + raw[-4:])
+
+    def test_replay_matches_execution(self):
+        """Итоговое и промежуточные состояния совпадают с выполнением."""
+        self.assertTrue(self.recording.error)
+        for name in ENGINES:
+            with self.subTest(engine=name):
+                memory = loaded(self.binary)
+                executor = get_engine(name)(memory)
+                executor.run()
+                self.assertEqual(compare(self.recording, memory, executor.instruction_count,
+                                         executor.error), [])
+        memory = loaded(self.binary)
+        self.assertTrue(self.recording.replay(memory))
+        self.assertEqual(compare(self.recording, memory, self.recording.instruction_count,
+                                 RuntimeError(self.recording.error)), [])
+        marked = record(loaded(self.binary), every=100)
+        for at in (0, 1, 2, 6, 377, 1024, 1200):
+            expected = loaded(self.binary)
+            get_engine('reference')(expected).run(max_instructions=at)
+            for recording in (self.recording, marked):
+                with self.subTest(at=at, every=recording.every):
+                    memory = loaded(self.binary)
+                    self.assertFalse(recording.replay(memory, at=at))
+                    self.assertEqual((memory.data, memory.stack, memory.pc),
+                                     (expected.data, expected.stack, expected.pc))
+        with self.assertRaises(ValueError):
+            self.recording.replay(loaded(program(10)))
+        # Другой начальный образ памяти
+        memory = loaded(self.binary)
+        memory.write_data(1000, 4)
+        with self.assertRaises(ValueError):
+            self.recording.replay(memory, at=10)
+        with self.assertRaises(ValueError):
+            self.recording.replay(loaded(self.binary), at=-5)
+
+    def test_divergence_and_cli(self):
+        """Расхождение двух журналов находится до команды; CLI проверяет журнал."""
+        other = record(loaded(program(tail="LOAD_CONST 1")))
+        self.assertIsNone(first_divergence(self.recording, other))
+        memory = loaded(self.binary)
+        memory.write_data(133, 9)
+        changed = record(memory)
+        self.assertEqual(first_divergence(self.recording, changed), 6)
+        self.assertNotEqual(compare(self.recording, memory, changed.instruction_count, None), [])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, 'p.bin')
+            log = os.path.join(tmp, 'p.uvmr')
+            with open(source, 'wb') as f:
+                f.write(self.binary)
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                self.assertEqual(uvm.main(['record', source, log]), 0)
+                code = uvm.main(['replay', log, source, os.path.join(tmp, 'dump.json'),
+                                 '--verify', '--engine', 'vectorized'])
+            self.assertEqual(code, 0)
+            self.assertIn('Выполнение совпадает с журналом', output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+import io
+import sys
+import os
+import tempfile
+import contextlib
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import uvm
+from interpreter import UVMMemory, UVMExecutor
+from engines import ENGINES
+from scheduler import Scheduler, DONE, ERROR, LIMIT
+
+
+def program(groups, tail=""):
+    lines = ["LOAD_MEM 133", "LOAD_CONST 1000", "ROL", f"STORE_MEM {groups % 50}"] * groups
+    return uvm.assemble("\n".join(lines + ([tail] if tail else [])))
+
+
+def loaded(binary):
+    memory = UVMMemory()
+    memory.write_data(1000, 3)
+    memory.load_code(binary)
+    return memory
+
+
+class TestScheduler(unittest.TestCase):
+    """Тесты кругового планировщика машин."""
+
+    def test_interleaved_runs_match_sequential(self):
+        """Машины выполняются порциями по кругу; итог совпадает с отдельным запуском."""
+        binaries = [program(100), program(30, "ROL"), program(250)]
+        for name in ENGINES:
+            with self.subTest(engine=name):
+                scheduler = Scheduler(budget=64, engine=name)
+                tasks = [scheduler.add(loaded(binary)) for binary in binaries]
+                order = []
+                while scheduler.active:
+                    order.append(scheduler.step().name)
+                # Короткая программа завершается раньше, остальные чередуются
+                self.assertEqual(order[:3], ['vm0', 'vm1', 'vm2'])
+                self.assertEqual([task.status for task in tasks], [DONE, ERROR, DONE])
+                for task, binary in zip(tasks, binaries):
+                    expected = uvm.run(binary, initial={1000: 3})
+                    self.assertEqual((task.executor.instruction_count, task.memory.stack,
+                                      bytes(task.memory.data)),
+                                     (expected.instruction_count, expected.stack,
+                                      bytes(expected.data)))
+                stats = scheduler.stats()
+                self.assertEqual((stats['vms'], stats['done'], stats['error'], stats['ready']),
+                                 (3, 2, 1, 0))
+                self.assertEqual(stats['instructions'], 400 + 121 + 1000)
+
+    def test_priorities_and_limits(self):
+        """Приоритет умножает порцию; лимит останавливает машину."""
+        scheduler = Scheduler(budget=40, engine='reference')
+        low = scheduler.add(loaded(program(200)), name='low')
+        high = scheduler.add(loaded(program(200)), name='high', priority=3)
+        capped = scheduler.add(loaded(program(200)), name='capped', limit=100)
+        for _ in range(3):
+            scheduler.step()
+        self.assertEqual((low.executor.instruction_count, high.executor.instruction_count,
+                          capped.executor.instruction_count), (40, 120, 40))
+        finished = scheduler.run()
+        self.assertEqual([task.name for task in finished], ['capped', 'high', 'low'])
+        self.assertEqual(capped.status, LIMIT)
+        self.assertEqual(capped.executor.instruction_count, 100)
+        self.assertEqual(capped.result().instruction_count, 100)
+        self.assertGreater(high.turnaround, 0)
+        with self.assertRaises(ValueError):
+            scheduler.add(loaded(program(1)), priority=0)
+
+    def test_limits_are_exact(self):
+        """Порция и лимит не превышаются серией или блоком; состояние совпадает с эталоном."""
+        binary = program(600)
+        for name in ENGINES:
+            for budget, limit in ((7, 1001), (1, 30), (300, 2399)):
+                with self.subTest(engine=name, budget=budget, limit=limit):
+                    scheduler = Scheduler(budget=budget, engine=name)
+                    task = scheduler.add(loaded(binary), limit=limit)
+                    while scheduler.active:
+                        before = task.executor.instruction_count
+                        scheduler.step()
+                        after = task.executor.instruction_count
+                        self.assertEqual(after - before, min(budget, limit - before))
+                    self.assertEqual(task.status, LIMIT)
+                    expected = loaded(binary)
+                    UVMExecutor(expected).run(max_instructions=limit)
+                    self.assertEqual((task.memory.pc, task.memory.stack, bytes(task.memory.data)),
+                                     (expected.pc, expected.stack, bytes(expected.data)))
+
+    def test_batch_budget(self):
+        """uvm batch --budget выполняет программы вперемежку через планировщик."""
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = []
+            for number, binary in enumerate([program(10), program(500), program(3, "ROL")]):
+                path = os.path.join(tmp, f"p{number}.bin")
+                with open(path, 'wb') as f:
+                    f.write(binary)
+                paths.append(path)
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                code = uvm.main(['batch', *paths, '--budget', '100', '--max-active', '2',
+                                 '--engine', 'predecoded', '--output-dir', tmp])
+            self.assertEqual(code, 1)
+            self.assertTrue(os.path.exists(os.path.join(tmp, 'p1.json')))
+        lines = output.getvalue().splitlines()
+        self.assertTrue(lines[0].startswith(paths[0]))
+        self.assertIn("ошибка", lines[1])
+        self.assertTrue(lines[2].startswith(paths[1]))
+        self.assertIn("Машин: 3", lines[3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+import random
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from parser import parse_assembly
+from encoder import encode_to_intermediate, encode_to_binary
+from interpreter import UVMMemory, UVMExecutor, UVMDecoder, create_memory_dump
+from slicer import compute_slice, slice_code
+
+
+def assemble(source):
+    return encode_to_binary(encode_to_intermediate(parse_assembly(source)))
+
+
+def run(binary):
+    memory = UVMMemory()
+    memory.load_code(binary)
+    executor = UVMExecutor(memory)
+    executor.run()
+    return memory
+
+
+def random_program(rng, length):
+    """Случайная программа без гарантированных ошибок стека."""
+    lines = []
+    depth = 0
+    for _ in range(length):
+        choice = rng.random()
+        if depth >= 2 and choice < 0.25:
+            lines.append("ROL")
+            depth -= 1
+        elif depth >= 1 and choice < 0.5:
+            lines.append(f"STORE_MEM {rng.randrange(0, 400)}")
+            depth -= 1
+        elif choice < 0.75:
+            lines.append(f"LOAD_CONST {rng.randrange(0, 300)}")
+            depth += 1
+        else:
+            lines.append(f"LOAD_MEM {rng.randrange(0, 700)}")
+            depth += 1
+    return "\n".join(lines)
+
+
+VECTOR = """LOAD_CONST 1
+STORE_MEM 199
+LOAD_CONST 2
+STORE_MEM 198
+LOAD_MEM 133
+LOAD_CONST 200
+ROL
+STORE_MEM 300
+LOAD_MEM 520
+LOAD_CONST 200
+ROL
+STORE_MEM 1000
+LOAD_MEM 501"""
+
+
+class TestSlicer(unittest.TestCase):
+
+    def assert_equivalent(self, binary, start, end):
+        sliced = slice_code(binary, start, end)
+        if sliced is None:
+            return False
+        full = run(binary)
+        part = run(sliced)
+        self.assertEqual(create_memory_dump(part, start, end)['memory'],
+                         create_memory_dump(full, start, end)['memory'])
+        self.assertEqual(part.stack, full.stack)
+        return True
+
+    def test_irrelevant_code_removed(self):
+        """Команды, не влияющие на диапазон и стек, исключаются."""
+        binary = assemble(VECTOR)
+        program = UVMDecoder.decode_program(binary)
+        indices = compute_slice(program, 300, 560)
+        # Вторая группа (запись в 1000-1255) не влияет на диапазон
+        self.assertNotIn(8, indices)
+        self.assertNotIn(11, indices)
+        # Последний LOAD_MEM остается на стеке
+        self.assertIn(12, indices)
+        # Первая запись в MEM[200] перекрыта второй (2 + 198)
+        self.assertNotIn(0, indices)
+        self.assertNotIn(1, indices)
+        self.assertTrue(self.assert_equivalent(binary, 300, 560))
+
+    def test_slice_smaller(self):
+        """Срез диапазона результатов меньше полной программы."""
+        binary = assemble(VECTOR)
+        self.assertLess(len(slice_code(binary, 1000, 1300)), len(binary))
+        self.assertTrue(self.assert_equivalent(binary, 1000, 1300))
+
+    def test_possible_fault_falls_back(self):
+        """Программа с возможной ошибкой не срезается."""
+        self.assertIsNone(slice_code(assemble("STORE_MEM 0"), 0, 10))
+        self.assertIsNone(slice_code(assemble("LOAD_CONST 300\nSTORE_MEM 0"), 0, 10))
+        self.assertIsNone(slice_code(assemble("LOAD_MEM 1\nSTORE_MEM -5"), 0, 10))
+        self.assertIsNone(slice_code(bytes([0xE0]), 0, 10))
+
+    def test_random_programs(self):
+        """Срез эквивалентен полной программе на случайных программах."""
+        rng = random.Random(27)
+        checked = 0
+        for _ in range(200):
+            binary = assemble(random_program(rng, rng.randrange(1, 60)))
+            start = rng.randrange(0, 700)
+            if self.assert_equivalent(binary, start, start + rng.randrange(0, 300)):
+                checked += 1
+        self.assertGreater(checked, 30)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import io
+import sys
+import os
+import tempfile
+import contextlib
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import uvm
+import container
+from parser import parse_assembly
+from encoder import encode_to_intermediate, encode_to_binary
+from interpreter import UVMDecoder, split_data_section
+from sourcemap import SourceMap, build_source_map, find_source_map, error_offset
+
+
+PROGRAM = """; таблица
+.data 3000 5, 6
+
+LOAD_MEM 3001
+LOAD_CONST 1000   ; сдвиг
+ROL
+STORE_MEM 100
+ROL"""
+
+
+class TestSourceMap(unittest.TestCase):
+    """Тесты карт исходного кода."""
+
+    def setUp(self):
+        self.intermediate = encode_to_intermediate(parse_assembly(PROGRAM))
+        self.binary = encode_to_binary(self.intermediate)
+        self.map = build_source_map(self.intermediate, 'program.asm')
+
+    def test_offsets_match_encoding(self):
+        """Смещения карты совпадают с раскладкой закодированных команд."""
+        _, start = split_data_section(self.binary)
+        decoded = UVMDecoder.decode_program(self.binary[start:])
+        self.assertEqual(list(self.map.offsets), [instr['offset'] for instr in decoded])
+        self.assertEqual(list(self.map.lines), [4, 5, 6, 7, 8])
+        self.assertEqual(self.map.lookup(0), 4)
+        self.assertEqual(self.map.lookup(3), 4)
+        self.assertEqual(self.map.lookup(4), 5)
+        self.assertEqual(self.map.lookup(100), 8)
+        self.assertIsNone(self.map.lookup(-1))
+        self.assertEqual(self.map.location(7), 'program.asm:7')
+
+    def test_round_trip_and_container(self):
+        """Карта сохраняется в файл и в секцию контейнера."""
+        restored = SourceMap.from_bytes(self.map.to_bytes())
+        self.assertEqual((restored.offsets, restored.lines, restored.source),
+                         (self.map.offsets, self.map.lines, 'program.asm'))
+        with self.assertRaises(ValueError):
+            SourceMap.from_bytes(self.map.to_bytes()[:-1])
+        packed = container.build_container(self.binary, source_map=self.map.to_bytes())
+        self.assertEqual(list(find_source_map('missing.bin', packed).lines), [4, 5, 6, 7, 8])
+        self.assertIsNone(find_source_map('missing.bin', self.binary))
+
+    def test_error_location(self):
+        """Ошибка выполнения сообщается со строкой исходного текста."""
+        result = uvm.run(self.binary)
+        self.assertFalse(result.ok)
+        self.assertEqual(self.map.lookup(error_offset(result.pc, result.error)), 8)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, 'program.asm')
+            binary = os.path.join(tmp, 'program.bin')
+            with open(source, 'w', encoding='utf-8') as f:
+                f.write(PROGRAM)
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                uvm.main(['asm', source, binary, '--source-map'])
+                uvm.main(['run', binary, os.path.join(tmp, 'dump.json')])
+            self.assertTrue(os.path.exists(binary + '.map'))
+            self.assertIn('(program.asm:8)', output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
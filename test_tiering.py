@@ -0,0 +1,89 @@
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import uvm
+from interpreter import UVMMemory
+from tiering import TierManager, TieredExecutor
+
+SOURCE = "\n".join(["LOAD_MEM 1", "LOAD_CONST 2", "ROL", "STORE_MEM 9"] * 20)
+
+
+def run_tiered(binary, manager):
+    memory = UVMMemory()
+    memory.load_code(binary)
+    executor = TieredExecutor(memory, manager)
+    executor.run()
+    return executor, memory
+
+
+class TestTiering(unittest.TestCase):
+    """Тесты многоуровневого выполнения."""
+
+    def test_promotion_and_cache(self):
+        """Уровень растет с числом запусков; подготовленный код строится один раз."""
+        binary = uvm.assemble(SOURCE)
+        manager = TierManager(predecode_after=2, compile_after=4)
+        tiers, states = [], set()
+        for _ in range(6):
+            executor, memory = run_tiered(binary, manager)
+            tiers.append(executor.tier)
+            states.add((executor.instruction_count, executor.error, tuple(memory.stack),
+                        bytes(memory.data)))
+        self.assertEqual(tiers, ['reference', 'predecoded', 'predecoded',
+                                 'compiled', 'compiled', 'compiled'])
+        self.assertEqual(len(states), 1)
+        stats = manager.stats()
+        self.assertEqual(stats['runs'], {'reference': 1, 'predecoded': 2, 'compiled': 3})
+        self.assertEqual((stats['promotions'], stats['compiled'], stats['predecoded']), (2, 1, 0))
+        # Другая программа начинает с нижнего уровня
+        executor, _ = run_tiered(uvm.assemble("LOAD_CONST 1"), manager)
+        self.assertEqual(executor.tier, 'reference')
+
+    def test_runner_reports_tier(self):
+        """Runner с исполнителем tiered показывает уровень в result.stats()."""
+        import tiering
+        saved = tiering.default_manager
+        tiering.default_manager = TierManager(predecode_after=2, compile_after=3)
+        try:
+            runner = uvm.Runner(engine='tiered')
+            binary = uvm.assemble(SOURCE + "\nSTORE_MEM 0")
+            results = [runner.run(binary) for _ in range(3)]
+            runner.close()
+        finally:
+            tiering.default_manager = saved
+        self.assertEqual([r.stats()['tier'] for r in results],
+                         ['reference', 'predecoded', 'compiled'])
+        self.assertEqual(results[-1].stats()['engine'], 'tiered')
+        self.assertIn("tier='compiled'", repr(results[-1]))
+        self.assertEqual(results[-1].instruction_count, 81)
+        self.assertIsNotNone(results[-1].error)
+
+    def test_limits(self):
+        """Кэш уровней ограничен емкостью; пороги проверяются."""
+        manager = TierManager(predecode_after=1, compile_after=1, capacity=2)
+        for value in range(4):
+            run_tiered(uvm.assemble(f"LOAD_CONST {value}"), manager)
+        self.assertEqual(manager.stats()['compiled'], 2)
+        with self.assertRaises(ValueError):
+            TierManager(predecode_after=5, compile_after=2)
+
+    def test_index_on_reference_tier(self):
+        """У эталонного уровня index читается как None и не записывается."""
+        binary = uvm.assemble(SOURCE)
+        manager = TierManager(predecode_after=2, compile_after=4)
+        executor, _ = run_tiered(binary, manager)
+        self.assertEqual(executor.tier, 'reference')
+        self.assertIsNone(executor.index)
+        executor.index = 3
+        self.assertIsNone(executor.index)
+        self.assertFalse(hasattr(executor.inner, 'index'))
+        executor, _ = run_tiered(binary, manager)
+        self.assertEqual(executor.tier, 'predecoded')
+        executor.index = None
+        self.assertIsNone(executor.inner.index)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,193 @@
+import unittest
+import io
+import sys
+import os
+import json
+import tempfile
+import subprocess
+import contextlib
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import uvm
+from engines import ENGINES
+
+
+PROGRAM = """LOAD_MEM 133
+LOAD_CONST 1000
+ROL
+STORE_MEM 100
+LOAD_MEM 520"""
+
+
+class TestUVMApi(unittest.TestCase):
+    """Тесты программного интерфейса uvm."""
+
+    def test_assemble(self):
+        """assemble возвращает машинный код."""
+        self.assertEqual(uvm.assemble("LOAD_CONST 343"), bytes([0x4A, 0x17]))
+        self.assertEqual(uvm.assemble("ROL"), bytes([0x80]))
+
+    def test_run_with_initial_memory(self):
+        """run применяет начальные значения и возвращает состояние."""
+        result = uvm.run(uvm.assemble(PROGRAM), initial={1000: 1})
+        self.assertTrue(result.ok)
+        self.assertEqual(result.instruction_count, 5)
+        # 42 ROL 1 = 84, запись по адресу 84 + 100
+        self.assertEqual(result.read(184), 84)
+        self.assertEqual(result.stack, [100])
+        self.assertEqual(result.dump(180, 190)['memory'], {'184': 84})
+
+    def test_run_does_not_print(self):
+        """Выполнение не печатает ничего, в том числе при ошибке."""
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            result = uvm.run(uvm.assemble("ROL"))
+        self.assertEqual(output.getvalue(), '')
+        self.assertFalse(result.ok)
+        self.assertIsInstance(result.error, RuntimeError)
+        self.assertEqual(result.pc, 1)
+
+    def test_engines_agree(self):
+        """Все исполнители дают одинаковый результат."""
+        binary = uvm.assemble(PROGRAM)
+        results = [uvm.run(binary, {1000: 3}, engine=name) for name in ENGINES]
+        for result in results[1:]:
+            self.assertEqual(result.data, results[0].data)
+            self.assertEqual(result.stack, results[0].stack)
+            self.assertEqual(result.instruction_count, results[0].instruction_count)
+
+    def test_asm_run_ir_matches_binary(self):
+        """Выполнение из промежуточного представления совпадает с машинным кодом."""
+        for source in (PROGRAM, "LOAD_CONST 5\nROL\nLOAD_CONST 1", "LOAD_CONST 300\nSTORE_MEM 0"):
+            binary = uvm.asm_run(source, {1000: 2})
+            ir = uvm.asm_run(source, {1000: 2}, ir=True)
+            self.assertEqual(ir.data, binary.data)
+            self.assertEqual(ir.stack, binary.stack)
+            self.assertEqual(ir.pc, binary.pc)
+            self.assertEqual(ir.instruction_count, binary.instruction_count)
+            self.assertEqual(type(ir.error), type(binary.error))
+
+    def test_asm_run_ir_validates_operands(self):
+        """Операнды вне диапазона отклоняются и без кодирования."""
+        with self.assertRaises(ValueError):
+            uvm.asm_run("LOAD_CONST 2000", ir=True)
+        with self.assertRaises(ValueError):
+            uvm.asm_run("LOAD_CONST 1", ir=True, engine='predecoded')
+
+    def test_runner_reuses_buffers(self):
+        """Runner восстанавливает память между запусками."""
+        runner = uvm.Runner()
+        memory = runner.memory
+        first = runner.asm_run(PROGRAM, {1000: 1})
+        self.assertEqual(first.read(184), 84)
+        second = runner.asm_run("LOAD_MEM 184\nLOAD_MEM 1000", engine='predecoded')
+        self.assertIs(runner.memory, memory)
+        self.assertEqual(second.stack, [0, 0])
+        third = runner.run(uvm.assemble(PROGRAM), {1000: 1})
+        self.assertEqual(third.instruction_count, 5)
+        self.assertEqual(third.read(184), 84)
+
+    def test_data_section(self):
+        """Директивы .data/.fill загружаются в память перед выполнением любым способом."""
+        source = ".data 3000 5, 6\n.fill 70000 4, 9\nLOAD_MEM 3001\nLOAD_MEM 70003\nLOAD_MEM 3000"
+        binary = uvm.assemble(source)
+        self.assertEqual(binary[0], 0)
+        self.assertEqual(len(binary), 6 + 2 + 6 + 4 + 3 * 4)
+        for name in ENGINES:
+            with self.subTest(engine=name):
+                result = uvm.run(binary, {3000: 1}, engine=name, data_size=1 << 24)
+                self.assertEqual(result.stack, [6, 9, 1])
+                self.assertEqual(result.pc, 12)
+        ir = uvm.asm_run(source, data_size=1 << 24, ir=True)
+        self.assertEqual(ir.stack, [6, 9, 5])
+        runner = uvm.Runner(engine='vectorized')
+        self.assertEqual(runner.asm_run(".data 10 8\nLOAD_MEM 10").stack, [8])
+        self.assertEqual(runner.asm_run("LOAD_MEM 10").stack, [0])
+        from encoder import decode_from_binary
+        self.assertEqual([instr['offset'] for instr in decode_from_binary(binary)], [0, 4, 8])
+
+    def test_unknown_engine(self):
+        """Неизвестный исполнитель - ValueError."""
+        with self.assertRaises(ValueError):
+            uvm.run(b'', engine='missing')
+
+
+
+class TestUVMCli(unittest.TestCase):
+    """Тесты единой командной строки uvm."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.asm = self.path('program.asm')
+        with open(self.asm, 'w', encoding='utf-8') as f:
+            f.write(PROGRAM)
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def cli(self, *argv):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            code = uvm.main(list(argv))
+        return code, output.getvalue()
+
+    def test_asm_run_disasm(self):
+        """asm, run и disasm работают с файлами."""
+        binary = self.path('program.bin')
+        dump = self.path('dump.json')
+        self.assertEqual(self.cli('asm', self.asm, binary)[0], 0)
+        with open(binary, 'rb') as f:
+            self.assertEqual(f.read(), uvm.assemble(PROGRAM))
+
+        code, output = self.cli('run', binary, dump, '--start', '130', '--end', '140')
+        self.assertEqual(code, 0)
+        self.assertIn('Выполнено инструкций: 5', output)
+        with open(dump, encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['memory'], {'133': 42})
+
+        code, output = self.cli('disasm', binary)
+        self.assertEqual(code, 0)
+        self.assertEqual(output.splitlines()[0].split()[-2:], ['LOAD_MEM', '133'])
+        self.assertEqual(len(output.splitlines()), 5)
+
+        with open(self.asm, 'w', encoding='utf-8') as f:
+            f.write(".fill 7 2, 4\n" + PROGRAM)
+        self.assertEqual(self.cli('asm', self.asm, binary)[0], 0)
+        code, output = self.cli('disasm', binary)
+        self.assertEqual(output.splitlines()[0], '.data 7 4, 4')
+        self.assertTrue(output.splitlines()[1].startswith('000000:'))
+
+    def test_asm_run_and_batch(self):
+        """asm-run не создает .bin, batch выполняет несколько программ."""
+        dump = self.path('dump.json')
+        code, _ = self.cli('asm-run', self.asm, dump, '--engine', 'predecoded')
+        self.assertEqual(code, 0)
+        self.assertFalse(os.path.exists(self.path('program.bin')))
+
+        bad = self.path('bad.asm')
+        with open(bad, 'w', encoding='utf-8') as f:
+            f.write("ROL")
+        code, output = self.cli('batch', self.asm, bad, '--output-dir', self.tmp.name)
+        self.assertEqual(code, 1)
+        self.assertIn('ok', output.splitlines()[0])
+        self.assertIn('ошибка', output.splitlines()[1])
+        self.assertTrue(os.path.exists(self.path('bad.json')))
+
+    def test_subcommands_import_only_needed_modules(self):
+        """disasm не загружает ассемблер и быстрые исполнители."""
+        binary = self.path('program.bin')
+        with open(binary, 'wb') as f:
+            f.write(uvm.assemble(PROGRAM))
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uvm.py')
+        result = subprocess.run([sys.executable, '-X', 'importtime', script, 'disasm', binary],
+                                capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0)
+        imported = {line.rsplit('|', 1)[-1].strip() for line in result.stderr.splitlines()}
+        self.assertIn('interpreter', imported)
+        for module in ('parser', 'encoder', 'predecode', 'vectorize', 'json'):
+            self.assertNotIn(module, imported)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from parser import parse_assembly
+from encoder import encode_to_intermediate, encode_to_binary
+from interpreter import UVMMemory, UVMExecutor
+from predecode import predecode, OP_VECTOR, OP_ROL_STORE
+import vectorize
+from vectorize import VectorizedExecutor, find_vector_runs
+
+
+def vectorized(memory):
+    """Исполнитель, векторизующий и короткие серии тестовых программ."""
+    return VectorizedExecutor(memory, min_length=4)
+
+
+def assemble(source):
+    return encode_to_binary(encode_to_intermediate(parse_assembly(source)))
+
+
+def rol_program(count, source=100, shift=200, offset=300, shift_step=1, offset_step=1):
+    lines = []
+    for i in range(count):
+        lines += [f"LOAD_MEM {source + i}", f"LOAD_CONST {shift + i * shift_step}",
+                  "ROL", f"STORE_MEM {offset + i * offset_step}"]
+    return "\n".join(lines)
+
+
+def run(executor_class, binary, image=None):
+    memory = UVMMemory()
+    for address, value in (image or {}).items():
+        memory.write_data(address, value)
+    memory.load_code(binary)
+    executor = executor_class(memory)
+    executor.run()
+    error = type(executor.error).__name__ if executor.error else None
+    return memory.data, memory.stack, memory.pc, executor.instruction_count, error
+
+
+IMAGE = {100 + i: v for i, v in enumerate([129, 204, 170, 240, 15, 7, 1, 255])}
+IMAGE.update({200 + i: v for i, v in enumerate([1, 2, 3, 0, 4, 9, 7, 5])})
+
+
+class TestVectorize(unittest.TestCase):
+
+    def test_runs_detected(self):
+        """Серия с постоянным шагом адресов распознается."""
+        init = "\n".join(f"LOAD_CONST {v}\nSTORE_MEM {400 + i}" for i, v in enumerate([5, 9, 1, 3]))
+        ops = predecode(assemble(init + "\n" + rol_program(8)))
+        runs = find_vector_runs(ops, min_length=4)
+        self.assertEqual([(start, length) for start, length, _ in runs], [(0, 4), (4, 8)])
+        # Короче минимальной длины серии не векторизуются, длинные делятся
+        self.assertEqual(find_vector_runs(ops), [])
+        runs = find_vector_runs(ops, min_length=3, max_length=3)
+        self.assertEqual([(start, length) for start, length, _ in runs],
+                         [(0, 3), (4, 3), (7, 3)])
+
+        # Нарушение шага разбивает серию
+        ops = predecode(assemble(rol_program(4) + "\n" + rol_program(4, source=150)))
+        self.assertEqual([length for _, length, _ in find_vector_runs(ops, min_length=4)], [4, 4])
+
+    def test_matches_sequential(self):
+        """Векторное выполнение совпадает с последовательным."""
+        binary = assemble(rol_program(8))
+        self.assertEqual(run(vectorized, binary, IMAGE), run(UVMExecutor, binary, IMAGE))
+        memory = UVMMemory()
+        memory.load_code(binary)
+        # Векторная операция стоит перед суперинструкциями серии
+        self.assertEqual([op[0] for op in vectorized(memory).ops],
+                         [OP_VECTOR] + [OP_ROL_STORE] * 8)
+
+    def test_aliasing_falls_back(self):
+        """Запись, влияющая на чтение следующего элемента, выполняется последовательно."""
+        # Результат первого элемента (129 ROL 1 = 3) пишется в 3 + 98 = 101 -
+        # исходное значение второго элемента
+        binary = assemble(rol_program(4, offset=98, offset_step=0))
+        self.assertEqual(run(vectorized, binary, IMAGE), run(UVMExecutor, binary, IMAGE))
+        # Совпадающие адреса записи: побеждает последняя
+        binary = assemble(rol_program(6, offset=1000, offset_step=0))
+        self.assertEqual(run(vectorized, binary, IMAGE), run(UVMExecutor, binary, IMAGE))
+
+    def test_fallback_uses_superinstructions(self):
+        """При отказе проверки серия выполняется суперинструкциями, а не по одной команде."""
+        memory = UVMMemory()
+        for address, value in IMAGE.items():
+            memory.write_data(address, value)
+        memory.load_code(assemble(rol_program(4, offset=98, offset_step=0)))
+        executor = vectorized(memory)
+        slow = []
+        executor._slow = lambda op: slow.append(op) or 0
+        executor.run()
+        self.assertEqual((slow, executor.instruction_count, executor.error), ([], 16, None))
+    def test_fault_falls_back(self):
+        """Выход за границы памяти дает ту же ошибку и частичное состояние."""
+        binary = assemble(rol_program(6, offset=-300, offset_step=20))
+        self.assertEqual(run(vectorized, binary, IMAGE), run(UVMExecutor, binary, IMAGE))
+        binary = assemble(rol_program(6, source=65533))
+        self.assertEqual(run(vectorized, binary, IMAGE), run(UVMExecutor, binary, IMAGE))
+
+    def test_without_numpy(self):
+        """Без NumPy используется реализация на списках."""
+        saved = vectorize.np
+        vectorize.np = None
+        try:
+            for source in (rol_program(8), rol_program(4, offset=98, offset_step=0)):
+                binary = assemble(source)
+                self.assertEqual(run(vectorized, binary, IMAGE),
+                                 run(UVMExecutor, binary, IMAGE))
+        finally:
+            vectorize.np = saved
+
+
+if __name__ == '__main__':
+    unittest.main()
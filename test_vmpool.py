@@ -0,0 +1,85 @@
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import uvm
+from vmpool import VMPool
+from interpreter import UVMMemory
+from engines import ENGINES, get_engine
+
+
+# Записи через все быстрые пути: STORE_MEM, серии ROL и констант
+PROGRAM = """LOAD_CONST 7
+STORE_MEM 0
+LOAD_CONST 200
+STORE_MEM 1
+LOAD_CONST 201
+STORE_MEM 2
+LOAD_CONST 202
+STORE_MEM 3
+LOAD_MEM 1
+LOAD_CONST 1000
+ROL
+STORE_MEM 300
+LOAD_MEM 2
+LOAD_CONST 1000
+ROL
+STORE_MEM 301
+LOAD_MEM 3
+LOAD_CONST 1000
+ROL
+STORE_MEM 302
+LOAD_MEM 133
+STORE_MEM 0"""
+
+
+class TestVMPool(unittest.TestCase):
+    """Тесты пула памяти УВМ."""
+
+    def test_reset_restores_only_dirty_cells(self):
+        """После выполнения любым исполнителем reset возвращает стандартный образ."""
+        pristine = UVMMemory(data_size=4096)
+        binary = uvm.assemble(PROGRAM)
+        for name in ENGINES:
+            with self.subTest(engine=name):
+                memory = UVMMemory(data_size=4096)
+                memory.write_data(1000, 3)
+                memory.load_code(binary)
+                executor = get_engine(name)(memory)
+                executor.run()
+                self.assertIsNone(executor.error)
+                self.assertNotEqual(memory.data, pristine.data)
+                memory.reset()
+                self.assertEqual(memory.data, pristine.data)
+                self.assertEqual((memory.stack, memory.pc, len(memory.code)), ([], 0, 0))
+                self.assertEqual(memory.dirty, set())
+
+    def test_pool_reuses_instances(self):
+        """Возвращенная память выдается повторно в исходном состоянии."""
+        pool = VMPool(data_size=4096)
+        pool.prefill(2)
+        with pool.checkout() as memory:
+            memory.load_code(uvm.assemble(PROGRAM))
+            get_engine('vectorized')(memory).run()
+            self.assertEqual(memory.stack, [])
+        with pool.checkout() as again:
+            self.assertEqual(again.data, UVMMemory(data_size=4096).data)
+        stats = pool.stats()
+        self.assertEqual(stats['created'], 2)
+        self.assertEqual(stats['reused'], 2)
+        self.assertGreater(stats['restored_cells'], 0)
+
+    def test_release_after_error(self):
+        """Память возвращается в пул и при исключении в блоке with."""
+        pool = VMPool(data_size=1024, max_idle=1)
+        with self.assertRaises(RuntimeError):
+            with pool.checkout() as memory:
+                memory.write_data(5, 9)
+                raise RuntimeError("сбой")
+        self.assertEqual(pool.stats()['idle'], 1)
+        self.assertEqual(pool.acquire().data[5], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
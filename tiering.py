@@ -0,0 +1,161 @@
+"""
+Многоуровневое выполнение УВМ (Вариант 5)
+Менеджер считает запуски каждой программы (по SHA-256 кода) и выбирает
+исполнителя по числу запусков: разовые программы выполняет reference без
+подготовки, повторяющиеся - predecoded, а частые - compiled (compiler.py).
+Предекодированные операции и скомпилированные программы хранятся в кэше
+менеджера и при следующих запусках не строятся заново.
+
+    manager = TierManager(predecode_after=2, compile_after=16)
+    runner = uvm.Runner(engine='tiered')    # менеджер по умолчанию
+    result = runner.run(binary)
+    result.tier                              # 'reference', 'predecoded' или 'compiled'
+"""
+
+import time
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+TIERS = ('reference', 'predecoded', 'compiled')
+
+
+class TierManager:
+    """Счетчики запусков программ и кэш подготовленного кода для уровней."""
+
+    def __init__(self, predecode_after=2, compile_after=16, capacity=64, max_tracked=4096):
+        """
+        Args:
+            predecode_after: С какого запуска программы использовать predecoded
+            compile_after: С какого запуска использовать compiled
+            capacity: Наибольшее число программ в кэше каждого уровня
+            max_tracked: Наибольшее число программ со счетчиками запусков
+                (давно не запускавшиеся забываются)
+        """
+        if not 1 <= predecode_after <= compile_after:
+            raise ValueError(f"Пороги уровней должны расти: predecode_after={predecode_after}, "
+                             f"compile_after={compile_after}")
+        if capacity <= 0:
+            raise ValueError(f"Емкость кэша должна быть положительной: {capacity}")
+        self.predecode_after = predecode_after
+        self.compile_after = compile_after
+        self.capacity = capacity
+        self.max_tracked = max(max_tracked, capacity)
+        self.runs: 'OrderedDict[str, int]' = OrderedDict()
+        self._ops: 'OrderedDict[str, list]' = OrderedDict()
+        self._compiled: 'OrderedDict[str, Any]' = OrderedDict()
+        self.tier_runs = {tier: 0 for tier in TIERS}
+        self.promotions = 0
+        self.prepare_ns = 0              # Время предекодирования и компиляции
+
+    def _count(self, digest: str) -> int:
+        runs = self.runs.get(digest, 0) + 1
+        self.runs[digest] = runs
+        self.runs.move_to_end(digest)
+        if len(self.runs) > self.max_tracked:
+            self.runs.popitem(last=False)
+        return runs
+
+    @staticmethod
+    def _cached(cache: OrderedDict, digest: str):
+        value = cache.get(digest)
+        if value is not None:
+            cache.move_to_end(digest)
+        return value
+
+    def _store(self, cache: OrderedDict, digest: str, value):
+        cache[digest] = value
+        if len(cache) > self.capacity:
+            cache.popitem(last=False)
+
+    def tier_for(self, runs: int) -> str:
+        """Уровень для запуска с номером runs."""
+        if runs >= self.compile_after:
+            return 'compiled'
+        if runs >= self.predecode_after:
+            return 'predecoded'
+        return 'reference'
+
+    def executor(self, memory) -> Tuple[Any, str]:
+        """
+        Исполнитель для программы, загруженной в память.
+
+        Returns:
+            (исполнитель, уровень)
+        """
+        digest = hashlib.sha256(memory.code).hexdigest()
+        tier = self.tier_for(self._count(digest))
+        if tier == 'compiled':
+            from compiler import CompiledExecutor, compile_program
+            program = self._cached(self._compiled, digest)
+            if program is None:
+                started = time.perf_counter_ns()
+                program = compile_program(memory.code)
+                self.prepare_ns += time.perf_counter_ns() - started
+                self._store(self._compiled, digest, program)
+                self._ops.pop(digest, None)
+                self.promotions += 1
+            executor = CompiledExecutor(memory, program)
+        elif tier == 'predecoded':
+            from predecode import PredecodedExecutor, predecode
+            ops = self._cached(self._ops, digest)
+            if ops is None:
+                started = time.perf_counter_ns()
+                ops = predecode(memory.code)
+                self.prepare_ns += time.perf_counter_ns() - started
+                self._store(self._ops, digest, ops)
+                self.promotions += 1
+            executor = PredecodedExecutor(memory, ops=ops)
+        else:
+            from interpreter import UVMExecutor
+            executor = UVMExecutor(memory)
+        self.tier_runs[tier] += 1
+        return executor, tier
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'programs': len(self.runs),
+            'runs': dict(self.tier_runs),
+            'predecoded': len(self._ops),
+            'compiled': len(self._compiled),
+            'promotions': self.promotions,
+            'prepare_ms': self.prepare_ns / 1e6
+        }
+
+
+# Менеджер для исполнителя 'tiered' из реестра engines
+default_manager = TierManager()
+
+
+def _forward(name: str, optional=False):
+    """
+    Атрибут, читаемый и записываемый у выбранного исполнителя; optional -
+    атрибут есть не у всех уровней: без него читается None, запись пропускается.
+    """
+    if not optional:
+        return property(lambda self: getattr(self.inner, name),
+                        lambda self, value: setattr(self.inner, name, value))
+
+    def set_value(self, value):
+        if hasattr(self.inner, name):
+            setattr(self.inner, name, value)
+
+    return property(lambda self: getattr(self.inner, name, None), set_value)
+
+
+class TieredExecutor:
+    """Исполнитель, уровень которого выбирает TierManager; атрибут tier - выбранный уровень."""
+
+    instruction_count = _forward('instruction_count')
+    running = _forward('running')
+    error = _forward('error')
+    # Номер текущей операции; у эталонного UVMExecutor его нет
+    index = _forward('index', optional=True)
+
+    def __init__(self, memory, manager: Optional[TierManager] = None):
+        self.memory = memory
+        self.manager = manager or default_manager
+        self.inner, self.tier = self.manager.executor(memory)
+
+    def run(self, max_instructions: Optional[int] = None):
+        self.inner.run(max_instructions=max_instructions)
@@ -38,3 +38,8 @@ def format_binary_for_spec(binary_data):
         grouped = ' '.join([bin_str[i:i+4] for i in range(0, len(bin_str), 4)])
         result.append(f"{grouped} (0x{byte:02X})")
     return '\n'.join(result)
+
+def binary_digest(binary_data):
+    """Возвращает SHA-256 (hex) машинного кода - ключ для кэшей и артефактов."""
+    import hashlib
+    return hashlib.sha256(bytes(binary_data)).hexdigest()
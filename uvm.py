@@ -0,0 +1,728 @@
+#!/usr/bin/env python3
+"""
+Программный интерфейс и единая командная строка УВМ (Вариант 5)
+Ассемблирование и выполнение программ в одном процессе, без запуска
+main.py / interpreter.py и без промежуточных файлов:
+
+    binary = uvm.assemble(source)
+    result = uvm.run(binary, initial={1000: 3})
+    result.dump(0, 1000)   # Тот же формат, что у interpreter.py
+
+Командная строка: python uvm.py {asm,run,asm-run,disasm,batch} ...
+
+Модули ассемблера и интерпретатора импортируются при первом вызове:
+каждая подкоманда загружает только то, что ей нужно (проверяется через
+python -X importtime uvm.py ... или ключ --timings). Даже typing
+загружается только при проверке типов: аннотации не вычисляются.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Dict, Any, Optional
+
+
+class Result:
+    """Результат выполнения программы."""
+
+    def __init__(self, memory, executor, engine: str):
+        self.memory = memory
+        self.engine = engine
+        self.instruction_count = executor.instruction_count
+        self.error = executor.error
+        self.pc = memory.pc
+        self.heatmap = getattr(executor, 'heatmap', None)   # heatmap.AccessHeatmap
+        self.tier = getattr(executor, 'tier', engine)       # Уровень, выбранный исполнителем tiered
+
+    @property
+    def ok(self) -> bool:
+        """Программа выполнена без ошибок."""
+        return self.error is None
+
+    @property
+    def stack(self):
+        return self.memory.stack
+
+    @property
+    def data(self):
+        return self.memory.data
+
+    def read(self, address: int) -> int:
+        """Значение ячейки памяти данных."""
+        return self.memory.read_data(address)
+
+    def stats(self) -> Dict[str, Any]:
+        """Сводка выполнения: исполнитель, уровень, число команд, ошибка."""
+        return {
+            'engine': self.engine,
+            'tier': self.tier,
+            'instructions': self.instruction_count,
+            'stack_depth': len(self.memory.stack),
+            'error': None if self.error is None else str(self.error)
+        }
+
+    def dump(self, start=0, end=1000) -> Dict[str, Any]:
+        """Дамп памяти в формате interpreter.py."""
+        from interpreter import create_memory_dump
+        return create_memory_dump(self.memory, start, end)
+
+    def __repr__(self):
+        status = 'ok' if self.ok else f'error={self.error!r}'
+        tier = f", tier={self.tier!r}" if self.tier != self.engine else ''
+        return (f"Result(engine={self.engine!r}{tier}, instructions={self.instruction_count}, "
+                f"stack={self.memory.stack}, {status})")
+
+
+def assemble(source: str) -> bytes:
+    """Ассемблирует исходный текст в машинный код."""
+    from parser import parse_assembly
+    from encoder import encode_to_intermediate, encode_to_binary
+    return encode_to_binary(encode_to_intermediate(parse_assembly(source)))
+
+
+def run(binary: bytes, initial: Optional[Dict[int, int]] = None, engine='reference',
+        data_size=65536, image=None, heatmap=False) -> Result:
+    """
+    Выполняет машинный код.
+
+    Args:
+        binary: Машинный код программы
+        initial: Дополнительные значения памяти {адрес: значение}, записываемые
+            поверх начального образа и секции данных программы
+        engine: Имя исполнителя из engines.ENGINES
+        data_size: Размер памяти данных
+        image: Начальный образ памяти вместо стандартного (буфер, массив NumPy
+            или словарь, см. UVMMemory.load_image)
+        heatmap: Собрать счетчики обращений к памяти в result.heatmap
+            (только исполнитель reference)
+
+    Returns:
+        Result; ошибка выполнения не выбрасывается, а сохраняется в result.error
+    """
+    memory = _new_memory(data_size, image)
+    memory.load_code(binary)
+    _write_initial(memory, initial)
+    return _execute(memory, None, engine, heatmap)
+
+
+def _new_memory(data_size: int, image=None):
+    from interpreter import UVMMemory
+    return UVMMemory(data_size=data_size, image=image)
+
+
+def _write_initial(memory, initial: Optional[Dict[int, int]]):
+    for address, value in (initial or {}).items():
+        memory.write_data(address, value)
+
+
+def _encode_into(memory, intermediate):
+    """Кодирует программу прямо в буфер кода; секция данных переносится в память."""
+    from encoder import encode_to_binary
+    encode_to_binary(intermediate, out=memory.code)
+    if memory.code[:1] == b'\x00':
+        memory.load_code(bytes(memory.code))
+
+
+def _execute(memory, intermediate, engine: str, heatmap=False) -> Result:
+    """Выполняет код из памяти или, если задано, промежуточное представление."""
+    if heatmap and engine != 'reference':
+        raise ValueError("Тепловую карту собирает только исполнитель reference")
+    if intermediate is not None:
+        if engine != 'reference':
+            raise ValueError("Выполнение из промежуточного представления "
+                             "поддерживает только исполнитель reference")
+        from interpreter import UVMExecutor
+        executor = UVMExecutor(memory)
+    else:
+        from engines import get_engine
+        executor = get_engine(engine)(memory)
+    if heatmap:
+        from heatmap import AccessHeatmap
+        executor.heatmap = AccessHeatmap()
+    if intermediate is not None:
+        executor.run_intermediate(intermediate)
+    else:
+        executor.run()
+    return Result(memory, executor, engine)
+
+
+def asm_run(source: str, initial: Optional[Dict[int, int]] = None, engine='reference',
+            ir=False, data_size=65536, image=None, heatmap=False) -> Result:
+    """
+    Ассемблирует и сразу выполняет программу, не создавая файлов.
+
+    Args:
+        ir: Выполнять промежуточное представление без кодирования в машинный
+            код (только исполнитель reference)
+    """
+    from parser import parse_assembly
+    from encoder import encode_to_intermediate, validate_intermediate
+
+    intermediate = encode_to_intermediate(parse_assembly(source))
+    memory = _new_memory(data_size, image)
+    if ir:
+        validate_intermediate(intermediate)
+        _apply_data(memory, intermediate)
+        _write_initial(memory, initial)
+        return _execute(memory, intermediate, engine, heatmap)
+    _encode_into(memory, intermediate)
+    _write_initial(memory, initial)
+    return _execute(memory, None, engine, heatmap)
+
+
+def _apply_data(memory, intermediate):
+    """Директивы .data/.fill промежуточного представления - в память данных."""
+    for instr in intermediate:
+        if instr['opcode'] == '.DATA':
+            memory.load_image(instr['values'], base=instr['B'])
+
+
+class Runner:
+    """
+    Повторное ассемблирование и выполнение с одними и теми же буферами.
+
+    Память берется из пула VMPool один раз; перед каждым запуском
+    восстанавливаются только ячейки, записанные предыдущей программой.
+    Result ссылается на память исполнителя и действителен до следующего запуска.
+    """
+
+    def __init__(self, data_size=65536, engine='reference', pool=None):
+        from vmpool import VMPool
+        self.pool = pool or VMPool(data_size=data_size)
+        self.memory = self.pool.acquire()
+        self.engine = engine
+
+    def close(self):
+        """Возвращает память в пул."""
+        if self.memory is not None:
+            self.pool.release(self.memory)
+            self.memory = None
+
+    def run(self, binary: bytes, initial: Optional[Dict[int, int]] = None,
+            engine: Optional[str] = None, heatmap=False) -> Result:
+        """Выполняет машинный код."""
+        self.memory.reset()
+        self.memory.load_code(binary)
+        _write_initial(self.memory, initial)
+        return _execute(self.memory, None, engine or self.engine, heatmap)
+
+    def asm_run(self, source: str, initial: Optional[Dict[int, int]] = None,
+                engine: Optional[str] = None, ir=False, heatmap=False) -> Result:
+        """Ассемблирует и выполняет программу; код кодируется прямо в буфер памяти."""
+        from parser import parse_assembly
+        from encoder import encode_to_intermediate, validate_intermediate
+
+        intermediate = encode_to_intermediate(parse_assembly(source))
+        self.memory.reset()
+        if ir:
+            validate_intermediate(intermediate)
+            _apply_data(self.memory, intermediate)
+            _write_initial(self.memory, initial)
+            return _execute(self.memory, intermediate, engine or self.engine, heatmap)
+        _encode_into(self.memory, intermediate)
+        _write_initial(self.memory, initial)
+        return _execute(self.memory, None, engine or self.engine, heatmap)
+
+
+# Модули проекта, загрузку которых показывает --timings
+_PROJECT_MODULES = ('parser', 'encoder', 'interpreter', 'engines', 'predecode', 'vectorize',
+                    'vmpool', 'container', 'sourcemap', 'profiler', 'heatmap',
+                    'replay', 'debugger', 'compiler', 'tiering', 'aot',
+                    'scheduler')
+
+
+def _read_program(path: str) -> bytes:
+    """Машинный код из .asm (ассемблируется) или бинарного файла."""
+    if path.endswith('.asm'):
+        with open(path, 'r', encoding='utf-8') as f:
+            return assemble(f.read())
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _read_image(path: Optional[str]):
+    """Начальный образ памяти из файла --init-mem."""
+    if path is None:
+        return None
+    from interpreter import load_memory_image
+    return load_memory_image(path)
+
+
+def _write_dump(result: Result, path: str, start: int, end: int):
+    import json
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(result.dump(start, end), f, indent=2, ensure_ascii=False)
+
+
+def _print_result(result: Result, source_map=None):
+    if not result.ok:
+        where = ''
+        if source_map is not None:
+            from sourcemap import error_offset
+            where = f" ({source_map.location(error_offset(result.pc, result.error))})"
+        print(f"Ошибка выполнения на инструкции {result.instruction_count}{where}: {result.error}")
+    print(f"Выполнено инструкций: {result.instruction_count}")
+    if result.tier != result.engine:
+        print(f"Уровень исполнителя: {result.tier}")
+    print(f"Состояние стека: {result.stack}")
+
+
+def _cmd_asm(args) -> int:
+    from parser import parse_assembly
+    from encoder import encode_to_intermediate, encode_to_binary
+    with open(args.input, 'r', encoding='utf-8') as f:
+        intermediate = encode_to_intermediate(parse_assembly(f.read()))
+    binary = encode_to_binary(intermediate)
+    source_map = b''
+    if args.source_map:
+        import os
+        from sourcemap import build_source_map
+        source_map = build_source_map(intermediate, os.path.basename(args.input))
+    if args.container:
+        from container import build_container
+        binary = build_container(binary, entry=args.entry,
+                                 source_map=source_map and source_map.to_bytes())
+    elif source_map:
+        from sourcemap import write_source_map, map_path
+        write_source_map(map_path(args.output), source_map)
+        print(f"Карта исходного кода сохранена: {map_path(args.output)}")
+    with open(args.output, 'wb') as f:
+        f.write(binary)
+    print(f"Бинарный файл сохранен: {args.output} ({len(binary)} байт)")
+    return 0
+
+
+def _cmd_run(args) -> int:
+    with open(args.input, 'rb') as f:
+        binary = f.read()
+    result = run(binary, engine=args.engine, data_size=args.data_size,
+                 image=_read_image(args.init_mem))
+    _write_dump(result, args.output, args.start, args.end)
+    source_map = None
+    if not result.ok:
+        from sourcemap import find_source_map
+        source_map = find_source_map(args.input, binary)
+    _print_result(result, source_map)
+    return 0
+
+
+def _cmd_asm_run(args) -> int:
+    import os
+    with open(args.input, 'r', encoding='utf-8') as f:
+        source = f.read()
+    result = asm_run(source, engine=args.engine, ir=args.ir, data_size=args.data_size,
+                     image=_read_image(args.init_mem))
+    _write_dump(result, args.output, args.start, args.end)
+    source_map = None
+    if not result.ok:
+        from parser import parse_assembly
+        from encoder import encode_to_intermediate
+        from sourcemap import build_source_map
+        source_map = build_source_map(encode_to_intermediate(parse_assembly(source)),
+                                      os.path.basename(args.input))
+    _print_result(result, source_map)
+    return 0
+
+
+def _cmd_disasm(args) -> int:
+    from interpreter import UVMDecoder, split_data_section
+    with open(args.input, 'rb') as f:
+        binary = f.read()
+    if binary[:1] == b'\xff':
+        from container import unwrap
+        binary = unwrap(binary)
+    try:
+        segments, start = split_data_section(binary)
+    except ValueError as e:
+        print(f"; {e}")
+        return 1
+    for address, cells in segments:
+        print(f".data {address} " + ', '.join(str(value) for value in cells))
+    code = binary[start:]
+    pc = 0
+    while pc < len(code):
+        try:
+            instr = UVMDecoder.decode_at(code, pc)
+        except ValueError as e:
+            print(f"{pc:06X}: ; {e}")
+            return 1
+        raw = ' '.join(f'{b:02X}' for b in code[pc:pc + instr['size']])
+        text = instr['opcode'] if instr['B'] is None else f"{instr['opcode']} {instr['B']}"
+        print(f"{pc:06X}: {raw:<12} {text}")
+        pc += instr['size']
+    return 0
+
+
+def _cmd_batch(args) -> int:
+    import os
+    from vmpool import VMPool
+    if args.budget is not None:
+        return _batch_interleaved(args)
+    # Программы выполняются по очереди в одной памяти из пула
+    pool = VMPool(data_size=args.data_size, max_idle=1, image=_read_image(args.init_mem))
+    failed = 0
+    for path in args.inputs:
+        try:
+            binary = _read_program(path)
+        except Exception as e:
+            print(f"{path}: ошибка: {e}")
+            failed += 1
+            continue
+        with pool.checkout() as memory:
+            memory.load_code(binary)
+            result = _execute(memory, None, args.engine)
+            status = 'ok' if result.ok else f"ошибка: {result.error}"
+            if result.tier != result.engine:
+                status += f", уровень {result.tier}"
+            print(f"{path}: {result.instruction_count} инструкций, стек {len(result.stack)}, {status}")
+            if not result.ok:
+                failed += 1
+            if args.output_dir:
+                name = os.path.splitext(os.path.basename(path))[0] + '.json'
+                _write_dump(result, os.path.join(args.output_dir, name), args.start, args.end)
+    return 1 if failed else 0
+
+
+def _read_with_source_map(path: str):
+    """
+    Программа и карта исходного кода: .asm ассемблируется с картой,
+    для бинарного файла ищется секция SMAP или файл <path>.map.
+
+    Returns:
+        (машинный код, SourceMap или None, строки исходного текста или None)
+    """
+    import os
+    if path.endswith('.asm'):
+        from parser import parse_assembly
+        from encoder import encode_to_intermediate, encode_to_binary
+        from sourcemap import build_source_map
+        with open(path, 'r', encoding='utf-8') as f:
+            source = f.read()
+        intermediate = encode_to_intermediate(parse_assembly(source))
+        return (encode_to_binary(intermediate),
+                build_source_map(intermediate, os.path.basename(path)), source.split('\n'))
+    from sourcemap import find_source_map
+    with open(path, 'rb') as f:
+        binary = f.read()
+    return binary, find_source_map(path, binary), None
+
+
+def _batch_interleaved(args) -> int:
+    """Программы пакета выполняются вперемежку планировщиком по --budget команд."""
+    import os
+    from vmpool import VMPool
+    from scheduler import Scheduler, ERROR, LIMIT
+
+    pool = VMPool(data_size=args.data_size, max_idle=args.max_active,
+                  image=_read_image(args.init_mem))
+    pending = list(args.inputs)
+    failed = 0
+
+    def admit():
+        # Одновременно в памяти не больше --max-active машин
+        nonlocal failed
+        while pending and scheduler.active < args.max_active:
+            path = pending.pop(0)
+            try:
+                binary = _read_program(path)
+                memory = pool.acquire()
+                memory.load_code(binary)
+            except Exception as e:
+                print(f"{path}: ошибка: {e}")
+                failed += 1
+                continue
+            scheduler.add(memory, name=path, limit=args.limit)
+
+    def finished(task):
+        nonlocal failed
+        result = task.result()
+        if task.status == ERROR:
+            status = f"ошибка: {result.error}"
+            failed += 1
+        elif task.status == LIMIT:
+            status = "остановлена по лимиту команд"
+            failed += 1
+        else:
+            status = 'ok'
+        print(f"{task.name}: {result.instruction_count} инструкций, стек {len(result.stack)}, "
+              f"{status}, порций {task.slices}")
+        if args.output_dir:
+            name = os.path.splitext(os.path.basename(task.name))[0] + '.json'
+            _write_dump(result, os.path.join(args.output_dir, name), args.start, args.end)
+        pool.release(task.memory)
+        admit()
+
+    scheduler = Scheduler(budget=args.budget, engine=args.engine, on_finish=finished)
+    admit()
+    scheduler.run()
+    stats = scheduler.stats()
+    print(f"Машин: {stats['vms']}, переключений: {stats['switches']}, "
+          f"команд: {stats['instructions']}, {stats['ips']:,.0f} команд/с")
+    return 1 if failed else 0
+
+
+def _cmd_profile(args) -> int:
+    from engines import get_engine
+    from profiler import Profiler
+
+    binary, source_map, source_lines = _read_with_source_map(args.input)
+    if args.source:
+        with open(args.source, 'r', encoding='utf-8') as f:
+            source_lines = f.read().split('\n')
+
+    memory = _new_memory(args.data_size, _read_image(args.init_mem))
+    memory.load_code(binary)
+    executor = get_engine(args.engine)(memory)
+    profiler = Profiler(source_map, every=1 if args.exact else args.every)
+    profiler.run(executor, memory)
+    if executor.error is not None:
+        print(f"Ошибка выполнения на инструкции {executor.instruction_count}: {executor.error}")
+    print(profiler.report(source_lines, top=args.top))
+    if args.collapsed:
+        with open(args.collapsed, 'w', encoding='utf-8') as f:
+            f.write(profiler.collapsed(source_lines, weight=args.weight))
+        print(f"Свернутые стеки сохранены: {args.collapsed}")
+    return 0
+
+
+def _cmd_record(args) -> int:
+    from replay import record
+    memory = _new_memory(args.data_size, _read_image(args.init_mem))
+    memory.load_code(_read_program(args.input))
+    recording = record(memory)
+    raw = recording.to_bytes()
+    with open(args.output, 'wb') as f:
+        f.write(raw)
+    status = f", ошибка: {recording.error}" if recording.error else ''
+    print(f"Журнал сохранен: {args.output} ({recording.instruction_count} команд, "
+          f"{len(recording)} записей, {len(raw)} байт{status})")
+    return 0
+
+
+def _cmd_replay(args) -> int:
+    from replay import load_recording, compare
+    recording = load_recording(args.log)
+    binary = _read_program(args.program)
+    image = _read_image(args.init_mem)
+    memory = _new_memory(recording.data_size, image)
+    memory.load_code(binary)
+    started = time.perf_counter()
+    final = recording.replay(memory, at=args.at)
+    replayed = time.perf_counter() - started
+    count = recording.instruction_count if final else args.at
+    result = Result(memory, _Replayed(count, recording.error if final else ''), 'replay')
+    _write_dump(result, args.output, args.start, args.end)
+    print(f"Воспроизведено {'итоговое состояние' if final else f'состояние после команды {args.at}'}: "
+          f"{count} команд за {replayed * 1000:.2f} мс")
+    print(f"Глубина стека: {len(memory.stack)}"
+          + (f", вершина: {memory.stack[-1]}" if memory.stack else ''))
+    if not args.verify:
+        return 0
+
+    memory = _new_memory(recording.data_size, image)
+    memory.load_code(binary)
+    started = time.perf_counter()
+    executed = _execute(memory, None, args.engine)
+    print(f"Повторное выполнение ({args.engine}): {(time.perf_counter() - started) * 1000:.2f} мс")
+    problems = compare(recording, memory, executed.instruction_count, executed.error)
+    for problem in problems:
+        print(f"Расхождение: {problem}")
+    if not problems:
+        print("Выполнение совпадает с журналом")
+    return 1 if problems else 0
+
+
+def _cmd_aot(args) -> int:
+    from container import unwrap
+    from interpreter import split_data_section
+    from aot import translate
+
+    for path in args.inputs:
+        binary = unwrap(_read_program(path))
+        _, start = split_data_section(binary)
+        info = translate(binary[start:], args.cache_dir, force=args.force)
+        if info['cached']:
+            print(f"{path}: уже в кэше: {info['path']}")
+        else:
+            print(f"{path}: {info['path']} ({info['bytes']} байт, {info['ms']:.1f} мс)")
+    return 0
+
+
+def _cmd_debug(args) -> int:
+    from debugger import DebugSession, execute_command, repl
+
+    binary, source_map, _ = _read_with_source_map(args.input)
+    memory = _new_memory(args.data_size, _read_image(args.init_mem))
+    memory.load_code(binary)
+    session = DebugSession(memory, every=args.every, budget=args.budget,
+                           engine=args.engine, source_map=source_map)
+    if args.commands:
+        # Команды из аргумента выполняются без интерактивного ввода
+        for line in args.commands.split(';'):
+            reply = execute_command(session, line)
+            if reply is None:
+                break
+            if reply:
+                print(reply)
+        return 0
+    repl(session)
+    return 0
+
+
+class _Replayed:
+    """Результат воспроизведения в виде исполнителя для Result."""
+
+    def __init__(self, instruction_count: int, error: str):
+        self.instruction_count = instruction_count
+        self.error = RuntimeError(error) if error else None
+
+
+def _build_parser():
+    import argparse
+    from engines import ENGINES
+
+    parser = argparse.ArgumentParser(prog='uvm', description='УВМ (Вариант 5)')
+    parser.add_argument('--timings', action='store_true',
+                        help='Вывести в stderr время загрузки и выполнения команды')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    def add_run_options(command):
+        command.add_argument('--start', type=int, default=0,
+                             help='Начальный адрес для дампа памяти (по умолчанию: 0)')
+        command.add_argument('--end', type=int, default=1000,
+                             help='Конечный адрес для дампа памяти (по умолчанию: 1000)')
+        command.add_argument('--engine', default='reference', choices=list(ENGINES),
+                             help='Исполнитель программы (по умолчанию: reference)')
+        # const - interpreter.ADDRESS_SPACE: интерпретатор не загружается при разборе
+        command.add_argument('--paged', action='store_const', dest='data_size',
+                             const=1 << 24, default=65536,
+                             help='Память данных на все 24-битное адресное пространство')
+        command.add_argument('--init-mem', metavar='FILE',
+                             help='Начальный образ памяти: сырые байты, .npy или .json')
+
+    command = commands.add_parser('asm', help='Ассемблировать .asm в бинарный файл')
+    command.add_argument('input', help='Исходный файл .asm')
+    command.add_argument('output', help='Выходной бинарный файл')
+    command.add_argument('--container', action='store_true',
+                         help='Записать контейнер с заголовком, индексом команд и CRC32')
+    command.add_argument('--entry', type=int, default=0, metavar='N',
+                         help='Номер начальной команды контейнера (по умолчанию: 0)')
+    command.add_argument('--source-map', action='store_true',
+                         help='Записать карту исходного кода: <выход>.map или секцией контейнера')
+    command.set_defaults(handler=_cmd_asm)
+
+    command = commands.add_parser('run', help='Выполнить бинарный файл и сохранить дамп')
+    command.add_argument('input', help='Бинарный файл с программой')
+    command.add_argument('output', help='Файл дампа памяти (.json)')
+    add_run_options(command)
+    command.set_defaults(handler=_cmd_run)
+
+    command = commands.add_parser('asm-run', help='Ассемблировать и выполнить без записи .bin')
+    command.add_argument('input', help='Исходный файл .asm')
+    command.add_argument('output', help='Файл дампа памяти (.json)')
+    command.add_argument('--ir', action='store_true',
+                         help='Выполнять промежуточное представление без кодирования')
+    add_run_options(command)
+    command.set_defaults(handler=_cmd_asm_run)
+
+    command = commands.add_parser('disasm', help='Дизассемблировать бинарный файл')
+    command.add_argument('input', help='Бинарный файл с программой')
+    command.set_defaults(handler=_cmd_disasm)
+
+    command = commands.add_parser('batch', help='Выполнить несколько программ (.asm или .bin)')
+    command.add_argument('inputs', nargs='+', help='Программы')
+    command.add_argument('--output-dir', help='Каталог для дампов памяти (<имя>.json)')
+    command.add_argument('--budget', type=int, metavar='N',
+                         help='Выполнять программы вперемежку порциями по N команд')
+    command.add_argument('--limit', type=int, metavar='N',
+                         help='С --budget: остановить программу после N команд')
+    command.add_argument('--max-active', type=int, default=64, metavar='N',
+                         help='С --budget: машин в памяти одновременно (по умолчанию: 64)')
+    add_run_options(command)
+    command.set_defaults(handler=_cmd_batch)
+
+    command = commands.add_parser('profile', help='Профиль выполнения по строкам исходного текста')
+    command.add_argument('input', help='Программа (.asm или бинарный файл с картой исходного кода)')
+    command.add_argument('--every', type=int, default=1000, metavar='N',
+                         help='Интервал выборки в командах (по умолчанию: 1000)')
+    command.add_argument('--exact', action='store_true',
+                         help='Точный профиль: учитывать каждую команду')
+    command.add_argument('--top', type=int, default=20,
+                         help='Сколько строк показать в отчете (по умолчанию: 20)')
+    command.add_argument('--collapsed', metavar='FILE',
+                         help='Записать свернутые стеки для flamegraph')
+    command.add_argument('--weight', default='ns', choices=['ns', 'instructions'],
+                         help='Значение в свернутых стеках (по умолчанию: ns)')
+    command.add_argument('--source', metavar='FILE',
+                         help='Исходный .asm для текста строк в отчете')
+    add_run_options(command)
+    command.set_defaults(handler=_cmd_profile)
+
+    command = commands.add_parser('record', help='Записать журнал выполнения программы')
+    command.add_argument('input', help='Программа (.asm или бинарный файл)')
+    command.add_argument('output', help='Файл журнала (.uvmr)')
+    add_run_options(command)
+    command.set_defaults(handler=_cmd_record)
+
+    command = commands.add_parser('replay', help='Воспроизвести журнал и сохранить дамп')
+    command.add_argument('log', help='Файл журнала (.uvmr)')
+    command.add_argument('program', help='Программа, для которой записан журнал')
+    command.add_argument('output', help='Файл дампа памяти (.json)')
+    command.add_argument('--at', type=int, metavar='N',
+                         help='Состояние после команды N вместо итогового')
+    command.add_argument('--verify', action='store_true',
+                         help='Выполнить программу заново (--engine) и сравнить с журналом')
+    add_run_options(command)
+    command.set_defaults(handler=_cmd_replay)
+
+    command = commands.add_parser('aot', help='Транслировать программы в модули Python в кэше')
+    command.add_argument('inputs', nargs='+', help='Программы (.asm или бинарный файл)')
+    command.add_argument('--cache-dir', metavar='DIR',
+                         help='Каталог кэша (по умолчанию: $UVM_AOT_CACHE или ~/.cache/uvm/aot)')
+    command.add_argument('--force', action='store_true',
+                         help='Транслировать заново, даже если модуль уже в кэше')
+    command.set_defaults(handler=_cmd_aot)
+
+    command = commands.add_parser('debug', help='Отладчик с шагом назад и переходом к команде')
+    command.add_argument('input', help='Программа (.asm или бинарный файл)')
+    command.add_argument('--every', type=int, default=1000, metavar='K',
+                         help='Начальный интервал контрольных точек в командах (по умолчанию: 1000)')
+    command.add_argument('--budget', type=int, default=256, metavar='N',
+                         help='Наибольшее число контрольных точек (по умолчанию: 256)')
+    command.add_argument('--commands', metavar='CMDS',
+                         help="Команды отладчика через ';' вместо интерактивного ввода")
+    add_run_options(command)
+    command.set_defaults(handler=_cmd_debug)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    started = time.perf_counter()
+    args = _build_parser().parse_args(argv)
+    parsed = time.perf_counter()
+
+    try:
+        code = args.handler(args)
+    except FileNotFoundError as e:
+        print(f"Ошибка: файл '{e.filename}' не найден", file=sys.stderr)
+        code = 1
+    except Exception as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        code = 1
+
+    if args.timings:
+        finished = time.perf_counter()
+        loaded = sorted(name for name in _PROJECT_MODULES if name in sys.modules)
+        print(f"Разбор аргументов: {(parsed - started) * 1000:.1f} мс, "
+              f"команда: {(finished - parsed) * 1000:.1f} мс, "
+              f"загружены модули: {', '.join(loaded)}", file=sys.stderr)
+    return code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Автовекторизация развернутых поэлементных циклов УВМ (Вариант 5)
+Векторные программы развернуты вручную: одна и та же идиома повторяется
+с адресами, меняющимися с постоянным шагом. Анализ находит серии
+одинаковых суперинструкций с аффинными адресами и заменяет каждую серию
+одной операцией: сбор значений -> таблица сдвигов -> разброс результатов.
+
+Векторная операция ставится перед исходными суперинструкциями серии и при
+успехе перескакивает через них. При выходе за границы памяти или если
+запись одного элемента влияет на чтение последующего, серия выполняется
+этими скалярными суперинструкциями - результат совпадает с
+последовательным выполнением. NumPy используется, если установлен.
+
+Поиск серий - один линейный проход: адреса каждой следующей операции
+сравниваются с ожидаемыми, а серия длиннее MAX_RUN_LENGTH делится на части.
+"""
+
+import re
+from operator import itemgetter
+from typing import List, Optional
+
+from interpreter import UVMMemory
+from predecode import (PredecodedExecutor, predecode, ROL_TABLE,
+                       OP_ROL_STORE, OP_CONST_STORE, OP_VECTOR)
+
+try:
+    import numpy as np
+    _ROL_ARRAY = np.array(ROL_TABLE, dtype=np.int64)
+except ImportError:  # pragma: no cover - NumPy необязателен
+    np = None
+
+# Минимальная длина серии, которую имеет смысл векторизовать: короче -
+# суперинструкции быстрее сбора и разброса
+MIN_RUN_LENGTH = 16
+
+# Наибольшая длина серии: ограничивает работу, теряемую при отказе проверки
+MAX_RUN_LENGTH = 4096
+
+
+class RolStoreRun:
+    """Серия LOAD_MEM a+i*sa / LOAD_CONST c+i*sc / ROL / STORE_MEM off+i*so."""
+
+    def __init__(self, sources: List[int], shifts: List[int], offsets: List[int]):
+        self.length = len(sources)
+        self.sources = sources
+        self.shifts = shifts
+        self.offsets = offsets
+        self.read_max = max(max(sources), max(shifts))
+        self._get_sources = itemgetter(*sources)
+        self._get_shifts = itemgetter(*shifts)
+        # Адреса чтения - арифметические прогрессии (начало, шаг)
+        self._progressions = [(sources[0], sources[1] - sources[0]),
+                              (shifts[0], shifts[1] - shifts[0])]
+        if np is not None:
+            self._offsets = np.array(offsets, dtype=np.int64)
+            self._indices = np.arange(self.length, dtype=np.int64)
+        # Последний номер элемента, читающего каждый адрес (строится в _aliased)
+        self._last_read = None
+
+    def _aliased(self, addresses: List[int]) -> bool:
+        """Пишет ли элемент i в ячейку, читаемую элементом j > i."""
+        last_read = self._last_read
+        if last_read is None:
+            last_read = self._last_read = {}
+            for index, (source, shift) in enumerate(zip(self.sources, self.shifts)):
+                last_read[source] = index
+                last_read[shift] = index
+        return any(last_read.get(address, -1) > index
+                   for index, address in enumerate(addresses))
+
+    def _aliased_array(self, addresses) -> bool:
+        """Векторная проверка _aliased через арифметику прогрессий чтения."""
+        indices = self._indices
+        for base, step in self._progressions:
+            if step == 0:
+                # Адрес читается всеми элементами, последним - элементом length-1
+                if ((addresses == base) & (indices < self.length - 1)).any():
+                    return True
+                continue
+            delta = addresses - base
+            reader = delta // step
+            if ((delta % step == 0) & (reader > indices) & (reader < self.length)).any():
+                return True
+        return False
+
+    def execute(self, data, size: int, dirty: set) -> bool:
+        """Выполняет серию; False - нужно последовательное выполнение."""
+        if self.read_max >= size:
+            return False
+
+        if np is not None:
+            values = np.array(self._get_sources(data), dtype=np.int64)
+            shifts = np.array(self._get_shifts(data), dtype=np.int64) & 7
+            results = _ROL_ARRAY[values, shifts]
+            addresses = results + self._offsets
+            if addresses.min() < 0 or addresses.max() >= size:
+                return False
+            if self._aliased_array(addresses):
+                return False
+            results = results.tolist()
+            addresses = addresses.tolist()
+        else:
+            table = ROL_TABLE
+            results = [table[v][s & 7] for v, s in
+                       zip(self._get_sources(data), self._get_shifts(data))]
+            addresses = [r + o for r, o in zip(results, self.offsets)]
+            if min(addresses) < 0 or max(addresses) >= size:
+                return False
+            if self._aliased(addresses):
+                return False
+
+        # Разброс в исходном порядке: при совпадении адресов побеждает последняя запись
+        for address, value in zip(addresses, results):
+            data[address] = value
+        dirty.update(addresses)
+        return True
+
+
+class ConstStoreRun:
+    """Серия LOAD_CONST v_i / STORE_MEM off+i*so (инициализация вектора)."""
+
+    def __init__(self, values: List[int], offsets: List[int]):
+        self.length = len(values)
+        self.values = values
+        self.addresses = [v + o for v, o in zip(values, offsets)]
+        self.address_min = min(self.addresses)
+        self.address_max = max(self.addresses)
+
+    def execute(self, data, size: int, dirty: set) -> bool:
+        """Выполняет серию; False - нужно последовательное выполнение."""
+        if self.address_min < 0 or self.address_max >= size:
+            return False
+        for address, value in zip(self.addresses, self.values):
+            data[address] = value
+        dirty.update(self.addresses)
+        return True
+
+
+def _make_run(kind: int, group: List[tuple]):
+    if kind == OP_ROL_STORE:
+        return RolStoreRun([op[1] for op in group], [op[2] for op in group],
+                           [op[3] for op in group])
+    return ConstStoreRun([op[1] for op in group], [op[2] for op in group])
+
+
+def _rol_store_end(ops: List[tuple], start: int, stop: int) -> int:
+    """Конец серии OP_ROL_STORE с аффинными адресами a, c и off, начатой в start."""
+    _, source, shift, offset, _ = ops[start]
+    second = ops[start + 1]
+    if second[0] != OP_ROL_STORE:
+        return start + 1
+    source_step = second[1] - source
+    shift_step = second[2] - shift
+    offset_step = second[3] - offset
+    source, shift, offset = second[1], second[2], second[3]
+    end = start + 2
+    while end < stop:
+        source += source_step
+        shift += shift_step
+        offset += offset_step
+        op = ops[end]
+        if op[0] != OP_ROL_STORE or op[1] != source or op[2] != shift or op[3] != offset:
+            break
+        end += 1
+    return end
+
+
+def _const_store_end(ops: List[tuple], start: int, stop: int) -> int:
+    """Конец серии OP_CONST_STORE с аффинными смещениями, начатой в start."""
+    # Запись константы больше 255 завершается ошибкой
+    if ops[start][1] > 255:
+        return start + 1
+    offset = ops[start][2]
+    second = ops[start + 1]
+    if second[0] != OP_CONST_STORE or second[1] > 255:
+        return start + 1
+    step = second[2] - offset
+    offset = second[2]
+    end = start + 2
+    while end < stop:
+        offset += step
+        op = ops[end]
+        if op[0] != OP_CONST_STORE or op[1] > 255 or op[2] != offset:
+            break
+        end += 1
+    return end
+
+
+def find_vector_runs(ops: List[tuple], min_length=MIN_RUN_LENGTH,
+                     max_length=MAX_RUN_LENGTH) -> List[tuple]:
+    """
+    Находит серии одинаковых операций с аффинными адресами за один проход.
+
+    Returns:
+        Список (начальный индекс, длина, серия) для непересекающихся серий
+        длиной от min_length до max_length
+    """
+    min_length = max(min_length, 2)
+    max_length = max(max_length, min_length)
+    runs = []
+    # Участки из min_length и более подряд идущих операций одного вида
+    # ищутся регулярным выражением по байтам видов операций
+    kinds = bytes(map(itemgetter(0), ops))
+    blocks = re.compile(b'|'.join(re.escape(bytes([kind])) + b'{%d,}' % min_length
+                                  for kind in (OP_ROL_STORE, OP_CONST_STORE)))
+    for block in blocks.finditer(kinds):
+        start, block_end = block.span()
+        kind = ops[start][0]
+        extend = _rol_store_end if kind == OP_ROL_STORE else _const_store_end
+        while start + min_length <= block_end:
+            end = extend(ops, start, min(block_end, start + max_length))
+            if end - start >= min_length:
+                runs.append((start, end - start, _make_run(kind, ops[start:end])))
+                start = end
+            else:
+                # Операции до end - 1 продолжают ту же прогрессию и длиннее
+                # серию не начнут; новая может начаться с последней из них
+                start = max(start + 1, end - 1)
+    return runs
+
+
+def vectorize(ops: List[tuple], min_length=MIN_RUN_LENGTH,
+              max_length=MAX_RUN_LENGTH) -> List[tuple]:
+    """
+    Ставит векторную операцию перед каждой найденной серией.
+
+    Векторная операция (OP_VECTOR, серия, число команд, число операций
+    серии, смещение) при успехе пропускает следующие за ней операции серии.
+    """
+    runs = find_vector_runs(ops, min_length, max_length)
+    if not runs:
+        return ops
+
+    result = []
+    position = 0
+    for start, length, run in runs:
+        result.extend(ops[position:start])
+        commands = length * (4 if ops[start][0] == OP_ROL_STORE else 2)
+        result.append((OP_VECTOR, run, commands, length, ops[start][4]))
+        position = start
+    result.extend(ops[position:])
+    return result
+
+
+class VectorizedExecutor(PredecodedExecutor):
+    """Исполнитель с предварительным декодированием и векторизацией серий."""
+
+    def __init__(self, memory: UVMMemory, min_length=MIN_RUN_LENGTH,
+                 ops: Optional[List[tuple]] = None, max_length=MAX_RUN_LENGTH):
+        if ops is None:
+            ops = vectorize(predecode(memory.code), min_length, max_length)
+        super().__init__(memory, ops=ops)
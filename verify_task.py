@@ -4,49 +4,37 @@
 """
 
 import os
-import subprocess
-import json
 import sys
+import time
 
-def run_assembler_and_interpreter(asm_file, json_file, start_addr=0, end_addr=1000):
-    """Запускает ассемблер и интерпретатор для программы."""
+import uvm
+
+def run_assembler_and_interpreter(asm_file, start_addr=0, end_addr=1000):
+    """Ассемблирует и выполняет программу в текущем процессе, возвращает дамп памяти."""
     
-    # Генерируем имя бинарного файла
-    bin_file = asm_file.replace('.asm', '.bin')
+    try:
+        with open(asm_file, 'r', encoding='utf-8') as f:
+            source = f.read()
+    except OSError as e:
+        print(f"    Ошибка чтения программы: {e}")
+        return None
     
     # 1. Ассемблирование
     print(f"  Ассемблирование {asm_file}...")
-    result = subprocess.run(
-        ['python', 'main.py', asm_file, bin_file],
-        capture_output=True,
-        text=True
-    )
-    
-    if result.returncode != 0:
-        print(f"    Ошибка ассемблирования: {result.stderr}")
+    try:
+        binary = uvm.assemble(source)
+    except Exception as e:
+        print(f"    Ошибка ассемблирования: {e}")
         return None
     
     # 2. Выполнение интерпретатором
     print(f"  Выполнение программы...")
-    result = subprocess.run(
-        ['python', 'interpreter.py', bin_file, json_file, 
-         '--start', str(start_addr), '--end', str(end_addr)],
-        capture_output=True,
-        text=True
-    )
+    result = uvm.run(binary)
+    if not result.ok:
+        print(f"    Ошибка выполнения на инструкции {result.instruction_count}: {result.error}")
     
-    if result.returncode != 0:
-        print(f"    Ошибка выполнения: {result.stderr}")
-        return None
-    
-    # 3. Загрузка дампа памяти
-    try:
-        with open(json_file, 'r') as f:
-            dump = json.load(f)
-        return dump
-    except Exception as e:
-        print(f"    Ошибка чтения дампа: {e}")
-        return None
+    # 3. Дамп памяти
+    return result.dump(start_addr, end_addr)
 
 def verify_example_1(dump):
     """Проверка первого примера из test_task.asm."""
@@ -199,12 +187,7 @@ def main():
     print("ПРОВЕРКА ТЕСТОВОЙ ЗАДАЧИ ЭТАПА 5")
     print("=" * 70)
     
-    # Очистка старых файлов
-    for ext in ['.bin', '.json']:
-        for file in ['test_task', 'calc_demo']:
-            filename = file + ext
-            if os.path.exists(filename):
-                os.remove(filename)
+    started = time.perf_counter()
     
     all_tests_passed = True
     
@@ -218,7 +201,6 @@ def main():
     
     dump = run_assembler_and_interpreter(
         'test_task.asm', 
-        'test_task_dump.json',
         start_addr=0,
         end_addr=1000
     )
@@ -252,7 +234,6 @@ def main():
     
     dump2 = run_assembler_and_interpreter(
         'calc_demo.asm',
-        'calc_demo_dump.json',
         start_addr=0,
         end_addr=200
     )
@@ -287,20 +268,7 @@ def main():
     else:
         print("\n❌ ТЕСТОВАЯ ЗАДАЧА ИМЕЕТ ОШИБКИ")
     
-    # 4. Очистка временных файлов
-    print("\n" + "-" * 70)
-    print("ОЧИСТКА ВРЕМЕННЫХ ФАЙЛОВ")
-    print("-" * 70)
-    
-    temp_files = [
-        'test_task.bin', 'test_task_dump.json',
-        'calc_demo.bin', 'calc_demo_dump.json'
-    ]
-    
-    for file in temp_files:
-        if os.path.exists(file):
-            os.remove(file)
-            print(f"  Удален: {file}")
+    print(f"\nВремя проверки: {(time.perf_counter() - started) * 1000:.1f} мс")
     
     print("\n" + "=" * 70)
     return 0 if all_tests_passed else 1
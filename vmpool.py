@@ -0,0 +1,77 @@
+"""
+Пул заранее созданных экземпляров памяти УВМ (Вариант 5)
+Создание UVMMemory стоит O(размер памяти): выделение списка и запись
+стандартного образа. Пул выдает уже созданные экземпляры, а при возврате
+восстанавливает только ячейки, записанные последней программой
+(UVMMemory.reset), и сбрасывает стек и pc. Стоимость подготовки запуска
+пропорциональна тому, что затронула предыдущая программа.
+
+    pool = VMPool()
+    with pool.checkout() as memory:
+        memory.load_code(binary)
+        get_engine('predecoded')(memory).run()
+"""
+
+from contextlib import contextmanager
+from typing import Dict, Any, List
+
+
+class VMPool:
+    """Пул экземпляров UVMMemory одного размера."""
+
+    def __init__(self, data_size=65536, max_idle=16, image=None):
+        """
+        Args:
+            data_size: Размер памяти данных экземпляров
+            max_idle: Сколько свободных экземпляров хранить; лишние отбрасываются
+            image: Начальный образ памяти вместо стандартного (UVMMemory.load_image);
+                загружается один раз на экземпляр, возврат в пул восстанавливает его
+        """
+        self.data_size = data_size
+        self.max_idle = max_idle
+        self.image = image
+        self._idle: List[Any] = []
+        self.created = 0    # Создано экземпляров
+        self.reused = 0     # Выдано повторно
+        self.restored = 0   # Восстановлено ячеек при возврате
+
+    def _create(self):
+        from interpreter import UVMMemory
+        self.created += 1
+        return UVMMemory(data_size=self.data_size, image=self.image)
+
+    def prefill(self, count: int):
+        """Заранее создает экземпляры, чтобы первые запуски не платили за создание."""
+        while len(self._idle) < min(count, self.max_idle):
+            self._idle.append(self._create())
+
+    def acquire(self):
+        """Выдает память в исходном состоянии: начальный образ, пустые стек и код."""
+        if self._idle:
+            self.reused += 1
+            return self._idle.pop()
+        return self._create()
+
+    def release(self, memory):
+        """Возвращает память в пул, восстанавливая записанные ячейки."""
+        self.restored += memory.reset()
+        if len(self._idle) < self.max_idle:
+            self._idle.append(memory)
+
+    @contextmanager
+    def checkout(self):
+        """Память из пула на время блока with; возвращается и при исключении."""
+        memory = self.acquire()
+        try:
+            yield memory
+        finally:
+            self.release(memory)
+
+    def stats(self) -> Dict[str, int]:
+        """Статистика пула."""
+        return {
+            'created': self.created,
+            'reused': self.reused,
+            'restored_cells': self.restored,
+            'idle': len(self._idle)
+        }